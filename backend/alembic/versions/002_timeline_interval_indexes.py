@@ -0,0 +1,47 @@
+"""Interval indexes for the Gantt timeline
+
+Revision ID: 002_timeline_indexes
+Revises: 001_initial
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002_timeline_indexes'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GiST indexes over the scheduled interval. The expressions must match
+    # work_order_period() / maintenance_task_period() in app.models.
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_work_orders_period ON work_orders USING gist (
+            tstzrange(
+                start_date,
+                CASE WHEN coalesce(end_date, due_date) IS NULL THEN NULL
+                     ELSE greatest(start_date, coalesce(end_date, due_date)) END,
+                '[]'
+            )
+        ) WHERE start_date IS NOT NULL
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_maintenance_tasks_period ON maintenance_tasks USING gist (
+            tstzrange(
+                scheduled_start,
+                CASE WHEN scheduled_end IS NULL THEN NULL
+                     ELSE greatest(scheduled_start, scheduled_end) END,
+                '[]'
+            )
+        ) WHERE scheduled_start IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_maintenance_tasks_period', 'maintenance_tasks')
+    op.drop_index('ix_work_orders_period', 'work_orders')
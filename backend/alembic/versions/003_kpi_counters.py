@@ -0,0 +1,33 @@
+"""KPI counter table
+
+Revision ID: 003_kpi_counters
+Revises: 002_timeline_indexes
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003_kpi_counters'
+down_revision: Union[str, None] = '002_timeline_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are filled on application startup (or with
+    # `python -m app.services.kpi_counters reconcile`)
+    op.create_table(
+        'kpi_counters',
+        sa.Column('key', sa.String(100), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('kpi_counters')
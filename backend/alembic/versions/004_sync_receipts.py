@@ -0,0 +1,36 @@
+"""Offline sync idempotency receipts
+
+Revision ID: 004_sync_receipts
+Revises: 003_kpi_counters
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004_sync_receipts'
+down_revision: Union[str, None] = '003_kpi_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_receipts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('idempotency_key', sa.String(64), nullable=False),
+        sa.Column('entry_type', sa.String(30), nullable=False),
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('terminal_id', sa.String(50), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_sync_receipts_idempotency_key', 'sync_receipts', ['idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_receipts_idempotency_key', table_name='sync_receipts')
+    op.drop_table('sync_receipts')
@@ -0,0 +1,61 @@
+"""Alert engine table and latest-quality-checks index
+
+Revision ID: 005_alerts
+Revises: 004_sync_receipts
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005_alerts'
+down_revision: Union[str, None] = '004_sync_receipts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'alerts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('rule', sa.String(50), nullable=False),
+        sa.Column('dedup_key', sa.String(100), nullable=False),
+        sa.Column('machine_id', sa.String(20), nullable=True),
+        sa.Column('severity', sa.String(20), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('title', sa.String(100), nullable=False),
+        sa.Column('message', sa.String(300), nullable=False),
+        sa.Column('value', sa.Float(), nullable=True),
+        sa.Column('threshold', sa.Float(), nullable=True),
+        sa.Column('occurrences', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('first_seen_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('last_seen_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('acknowledged_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('acknowledged_by', sa.String(100), nullable=True),
+        sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_alerts_machine_id', 'alerts', ['machine_id'])
+    op.create_index(
+        'ix_alerts_open_dedup_key', 'alerts', ['dedup_key'],
+        unique=True, postgresql_where=sa.text('resolved_at IS NULL')
+    )
+    op.create_index(
+        'ix_alerts_open_last_seen', 'alerts', [sa.text('last_seen_at DESC')],
+        postgresql_where=sa.text('resolved_at IS NULL')
+    )
+    op.create_index('ix_alerts_dedup_key_resolved', 'alerts', ['dedup_key', 'resolved_at'])
+
+    op.create_index('ix_quality_checks_machine_timestamp', 'quality_checks', ['machine_id', 'timestamp'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_quality_checks_machine_timestamp', table_name='quality_checks')
+    op.drop_index('ix_alerts_dedup_key_resolved', table_name='alerts')
+    op.drop_index('ix_alerts_open_last_seen', table_name='alerts')
+    op.drop_index('ix_alerts_open_dedup_key', table_name='alerts')
+    op.drop_index('ix_alerts_machine_id', table_name='alerts')
+    op.drop_table('alerts')
@@ -0,0 +1,71 @@
+"""Generated search columns with full-text and trigram indexes
+
+Revision ID: 006_search_indexes
+Revises: 005_alerts
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '006_search_indexes'
+down_revision: Union[str, None] = '005_alerts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# See app.models.search
+ARABIC_FROM = "أإآٱىة" + "\u0640" + "".join(chr(c) for c in range(0x064B, 0x0653)) + "\u0670"
+ARABIC_TO = "اااايه"
+ARABIC_ARTICLE = r"(^|\s)ال(\S\S)"
+
+# Searchable columns per table; must match the search_columns() calls of the models
+DOCUMENTS = {
+    'work_orders': ['id', 'customer', 'product', 'product_code', 'notes'],
+    'maintenance_tasks': ['id', 'title', 'description', 'assignee', 'team', 'root_cause', 'resolution', 'notes'],
+    'downtime_logs': ['machine_id', 'reason', 'resolution'],
+    'machines': ['id', 'name', 'area'],
+    'employees': ['employee_number', 'name', 'name_ar', 'department', 'position'],
+    'plants': ['id', 'name', 'name_ar', 'description', 'location'],
+}
+
+
+def document(columns) -> str:
+    text = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return f"normalize_arabic({text})"
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION normalize_arabic(value text) RETURNS text
+        LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+        AS $$ SELECT regexp_replace(translate(value, '{ARABIC_FROM}', '{ARABIC_TO}'), '{ARABIC_ARTICLE}', '\\1\\2', 'g') $$
+    """)
+
+    # Adding stored generated columns rewrites each table once
+    for table, columns in DOCUMENTS.items():
+        op.execute(
+            f"ALTER TABLE {table} "
+            f"ADD COLUMN search_document text GENERATED ALWAYS AS ({document(columns)}) STORED, "
+            f"ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, {document(columns)})) STORED"
+        )
+        op.execute(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)")
+        op.execute(f"CREATE INDEX ix_{table}_search_document ON {table} USING gin (search_document gin_trgm_ops)")
+
+    # Substring filters of GET /production/work-orders and GET /maintenance/tasks
+    op.execute("CREATE INDEX ix_work_orders_customer_trgm ON work_orders USING gin (customer gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_maintenance_tasks_assignee_trgm ON maintenance_tasks USING gin (assignee gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_maintenance_tasks_assignee_trgm', 'maintenance_tasks')
+    op.drop_index('ix_work_orders_customer_trgm', 'work_orders')
+    for table in reversed(list(DOCUMENTS)):
+        op.drop_index(f'ix_{table}_search_document', table)
+        op.drop_index(f'ix_{table}_search_vector', table)
+        op.drop_column(table, 'search_vector')
+        op.drop_column(table, 'search_document')
+    op.execute("DROP FUNCTION IF EXISTS normalize_arabic(text)")
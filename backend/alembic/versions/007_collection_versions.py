@@ -0,0 +1,59 @@
+"""Collection versions for conditional GET
+
+Revision ID: 007_collection_versions
+Revises: 006_search_indexes
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007_collection_versions'
+down_revision: Union[str, None] = '006_search_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match VERSIONED_TABLES in app.models.version
+TABLES = ('machines', 'employees', 'plants', 'workforce_records', 'work_orders', 'maintenance_tasks')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'collection_versions',
+        sa.Column('name', sa.String(50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    # Deferred: runs at commit, once per table and transaction (see app.models.version)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF current_setting('collection_version.' || TG_TABLE_NAME, true) IS DISTINCT FROM 'bumped' THEN
+                PERFORM set_config('collection_version.' || TG_TABLE_NAME, 'bumped', true);
+                INSERT INTO collection_versions (name, version, changed_at)
+                VALUES (TG_TABLE_NAME, 1, clock_timestamp())
+                ON CONFLICT (name) DO UPDATE
+                SET version = collection_versions.version + 1, changed_at = excluded.changed_at;
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    for table in TABLES:
+        op.execute(
+            f"CREATE CONSTRAINT TRIGGER collection_version AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"DEFERRABLE INITIALLY DEFERRED FOR EACH ROW EXECUTE FUNCTION bump_collection_version()"
+        )
+        op.execute(f"INSERT INTO collection_versions (name, version) VALUES ('{table}', 0)")
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.execute(f"DROP TRIGGER IF EXISTS collection_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_collection_version()")
+    op.drop_table('collection_versions')
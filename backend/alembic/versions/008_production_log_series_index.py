@@ -0,0 +1,28 @@
+"""Covering index for per-machine production log ranges
+
+Revision ID: 008_production_log_series
+Revises: 007_collection_versions
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '008_production_log_series'
+down_revision: Union[str, None] = '007_collection_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Must match ix_production_logs_machine_timestamp in app.models.production
+    op.create_index(
+        'ix_production_logs_machine_timestamp', 'production_logs', ['machine_id', 'timestamp'],
+        postgresql_include=['id', 'speed', 'temperature']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_production_logs_machine_timestamp', 'production_logs')
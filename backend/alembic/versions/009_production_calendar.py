@@ -0,0 +1,39 @@
+"""Production calendar dimension
+
+Revision ID: 009_production_calendar
+Revises: 008_production_log_series
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009_production_calendar'
+down_revision: Union[str, None] = '008_production_log_series'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are written by app.services.plant_calendar (on startup, or its `fill` command)
+    op.create_table(
+        'production_calendar',
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('production_date', sa.Date(), nullable=False),
+        sa.Column('shift', sa.String(20), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('working_day', sa.Boolean(), nullable=False),
+        sa.Column('planned_minutes', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('bucket_start')
+    )
+    op.create_index('ix_production_calendar_production_date', 'production_calendar', ['production_date'])
+    op.create_index('ix_production_calendar_week_start', 'production_calendar', ['week_start'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_production_calendar_week_start', 'production_calendar')
+    op.drop_index('ix_production_calendar_production_date', 'production_calendar')
+    op.drop_table('production_calendar')
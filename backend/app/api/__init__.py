@@ -6,7 +6,12 @@ from app.api.routers import (
     production_router,
     quality_router,
     maintenance_router,
-    dashboard_router
+    dashboard_router,
+    scheduling_router,
+    system_router,
+    sync_router,
+    alerts_router,
+    search_router
 )
 
 __all__ = [
@@ -14,5 +19,10 @@ __all__ = [
     "production_router",
     "quality_router",
     "maintenance_router",
-    "dashboard_router"
+    "dashboard_router",
+    "scheduling_router",
+    "system_router",
+    "sync_router",
+    "alerts_router",
+    "search_router"
 ]
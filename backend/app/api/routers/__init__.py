@@ -6,11 +6,21 @@ from app.api.routers.production import router as production_router
 from app.api.routers.quality import router as quality_router
 from app.api.routers.maintenance import router as maintenance_router
 from app.api.routers.dashboard import router as dashboard_router
+from app.api.routers.scheduling import router as scheduling_router
+from app.api.routers.system import router as system_router
+from app.api.routers.sync import router as sync_router
+from app.api.routers.alerts import router as alerts_router
+from app.api.routers.search import router as search_router
 
 __all__ = [
     "machines_router",
     "production_router",
     "quality_router",
     "maintenance_router",
-    "dashboard_router"
+    "dashboard_router",
+    "scheduling_router",
+    "system_router",
+    "sync_router",
+    "alerts_router",
+    "search_router"
 ]
@@ -0,0 +1,83 @@
+"""
+Alerts API Router
+"""
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models import Alert, AlertStatus
+from app.schemas import AlertAcknowledge, AlertResponse, AlertSeverityEnum, AlertStatusEnum
+from app.services.dashboard_snapshot import dashboard_snapshot
+
+router = APIRouter(prefix="/alerts", tags=["Alerts"])
+
+
+@router.get("", response_model=List[AlertResponse])
+async def get_alerts(
+    status: Optional[AlertStatusEnum] = None,
+    machine_id: Optional[str] = None,
+    severity: Optional[AlertSeverityEnum] = None,
+    rule: Optional[str] = None,
+    limit: int = Query(default=100, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Get alerts, newest first.
+
+    - **status**: active, acknowledged or resolved; by default every open
+      (active or acknowledged) alert
+    - **machine_id** / **severity** / **rule**: optional filters
+    """
+    query = db.query(Alert)
+
+    if status is None:
+        query = query.filter(Alert.resolved_at.is_(None))
+    else:
+        query = query.filter(Alert.status == status.value)
+    if machine_id:
+        query = query.filter(Alert.machine_id == machine_id)
+    if severity:
+        query = query.filter(Alert.severity == severity.value)
+    if rule:
+        query = query.filter(Alert.rule == rule)
+
+    return query.order_by(Alert.last_seen_at.desc()).limit(limit).all()
+
+
+@router.get("/{alert_id}", response_model=AlertResponse)
+async def get_alert(alert_id: int, db: Session = Depends(get_db)):
+    """Get a specific alert by ID."""
+    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return alert
+
+
+@router.post("/{alert_id}/acknowledge", response_model=AlertResponse)
+async def acknowledge_alert(
+    alert_id: int,
+    acknowledgement: AlertAcknowledge,
+    db: Session = Depends(get_db)
+):
+    """
+    Acknowledge an open alert. It leaves the dashboard but stays open until
+    its condition clears, so it is not raised again in the meantime.
+    """
+    alert = db.query(Alert).filter(Alert.id == alert_id).with_for_update().first()
+    if not alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    if alert.resolved_at is not None:
+        raise HTTPException(status_code=400, detail="Alert is already resolved")
+
+    if alert.status != AlertStatus.ACKNOWLEDGED.value:
+        alert.status = AlertStatus.ACKNOWLEDGED.value
+        alert.acknowledged_at = datetime.now(timezone.utc)
+        alert.acknowledged_by = acknowledgement.acknowledged_by
+        db.commit()
+        db.refresh(alert)
+        dashboard_snapshot.invalidate()
+
+    return alert
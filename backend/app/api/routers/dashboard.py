@@ -1,160 +1,73 @@
 """
 Dashboard API Router - Overview and Analytics
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+import logging
+import time
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime, timedelta
 
+from app.api.routers.machines import list_machines
 from app.db import get_db
-from app.models import (
-    Machine, MachineStatus, WorkOrder, WorkOrderStatus,
-    MaintenanceTask, MaintenanceStatus, ScrapEntry, QualityCheck,
-    Plant, WorkforceRecord, DailyProduction
-)
+from app.db.database import with_session
+from app.models import Plant, WorkforceRecord, DailyProduction, ProductionCalendar, ProductionLog, ScrapEntry
 from app.schemas import (
     PlantCreate, PlantResponse, PlantCapacity,
     WorkforceRecordCreate, WorkforceRecordResponse, WorkforceSummary,
-    DashboardOverview, MachineOverview, KPIOverview, WorkforceOverview, ScrapOverview,
-    HourlyProduction, DailyProductionSummary, WeeklyTrend
+    DashboardOverview, DashboardSectionEnum, DashboardBundle,
+    HourlyProduction, DailyProductionSummary, WeeklyTrend,
+    SimulationRequest, SimulationResponse, ScenarioResult, StageStatistics
 )
 from app.core.config import settings
+from app.core.formats import JSON, negotiate, tabular_response, to_columns
+from app.core.http_cache import REVALIDATE, conditional, not_modified
+from app.core.singleflight import single_flight
+from app.services import plant_calendar, simulation
+from app.services.dashboard_snapshot import dashboard_snapshot
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
 @router.get("/overview", response_model=DashboardOverview)
-async def get_dashboard_overview(db: Session = Depends(get_db)):
+async def get_dashboard_overview(request: Request):
     """
     Get comprehensive dashboard overview with all key metrics.
     This is the main endpoint for the dashboard home page.
-    """
-    # Machine statistics
-    machines = db.query(Machine).all()
-    running = [m for m in machines if m.status == MachineStatus.RUNNING]
-    idle = [m for m in machines if m.status == MachineStatus.IDLE]
-    stopped = [m for m in machines if m.status == MachineStatus.STOPPED]
-    maintenance = [m for m in machines if m.status == MachineStatus.MAINTENANCE]
-
-    machine_overview = MachineOverview(
-        total=len(machines),
-        running=len(running),
-        idle=len(idle),
-        stopped=len(stopped),
-        maintenance=len(maintenance)
-    )
-
-    # Calculate overall OEE
-    overall_oee = sum(m.oee for m in running) / len(running) if running else 0
-
-    # Capacity utilization
-    plants = db.query(Plant).all()
-    if plants:
-        total_design = sum(p.design_capacity_mt for p in plants)
-        total_actual = sum(p.current_capacity_mt for p in plants)
-        capacity_util = (total_actual / total_design) * 100 if total_design > 0 else 0
-    else:
-        capacity_util = 25.0  # Default based on document analysis
-
-    # Work orders
-    active_orders = db.query(WorkOrder).filter(
-        WorkOrder.status == WorkOrderStatus.IN_PROGRESS.value
-    ).count()
-
-    # Maintenance
-    pending_maintenance = db.query(MaintenanceTask).filter(
-        MaintenanceTask.status.in_([
-            MaintenanceStatus.PENDING.value,
-            MaintenanceStatus.IN_PROGRESS.value
-        ])
-    ).count()
-
-    # Quality rate (last 24 hours)
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    quality_checks = db.query(QualityCheck).filter(
-        QualityCheck.timestamp >= yesterday
-    ).all()
-    quality_rate = (len([q for q in quality_checks if q.passed]) / len(quality_checks) * 100) if quality_checks else 98.5
-
-    kpi_overview = KPIOverview(
-        overall_oee=round(overall_oee, 2),
-        capacity_utilization=round(capacity_util, 2),
-        active_work_orders=active_orders,
-        pending_maintenance=pending_maintenance,
-        quality_rate=round(quality_rate, 2),
-        scrap_rate=1.5  # Would calculate from actual data
-    )
-
-    # Workforce
-    workforce_records = db.query(WorkforceRecord).order_by(
-        WorkforceRecord.date.desc()
-    ).first()
-
-    if workforce_records:
-        workforce_overview = WorkforceOverview(
-            total_on_shift=workforce_records.filled_positions,
-            total_vacancies=workforce_records.vacancies,
-            vacancy_rate=round((workforce_records.vacancies / workforce_records.total_positions) * 100, 2)
-        )
-    else:
-        # Default based on document analysis
-        workforce_overview = WorkforceOverview(
-            total_on_shift=137,
-            total_vacancies=114,
-            vacancy_rate=45.4
-        )
-
-    # Scrap today
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    scrap_entries = db.query(ScrapEntry).filter(
-        ScrapEntry.timestamp >= today_start
-    ).all()
-
-    scrap_overview = ScrapOverview(
-        weight_kg=sum(e.weight_kg for e in scrap_entries),
-        value_usd=sum(e.financial_value_usd or 0 for e in scrap_entries),
-        value_sar=sum(e.financial_value_sar or 0 for e in scrap_entries)
-    )
 
-    # Generate alerts
-    alerts = []
-
-    # Alert for stopped machines
-    for m in stopped:
-        alerts.append({
-            "type": "error",
-            "title": "Machine Down",
-            "message": f"{m.id} ({m.name}) is stopped",
-            "machine_id": m.id,
-            "timestamp": datetime.utcnow().isoformat()
-        })
-
-    # Alert for machines in maintenance
-    for m in maintenance:
-        alerts.append({
-            "type": "warning",
-            "title": "Under Maintenance",
-            "message": f"{m.id} ({m.name}) is under maintenance",
-            "machine_id": m.id,
-            "timestamp": datetime.utcnow().isoformat()
-        })
-
-    return DashboardOverview(
-        timestamp=datetime.utcnow(),
-        machines=machine_overview,
-        kpis=kpi_overview,
-        workforce=workforce_overview,
-        scrap_today=scrap_overview,
-        alerts=alerts[:10]  # Limit to 10 alerts
-    )
+    Served from a precomputed snapshot that a background task refreshes
+    periodically and after relevant writes; X-Snapshot-Version changes
+    whenever the content is rebuilt. Requests arriving before the first
+    snapshot exists share a single build. Send If-None-Match to get a 304
+    while the content is unchanged.
+    """
+    payload, etag, version, generated_at = await single_flight.run(("dashboard.overview",), dashboard_snapshot.get)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": REVALIDATE,
+        "X-Snapshot-Version": str(version),
+        "X-Snapshot-Generated-At": generated_at.isoformat()
+    }
+    if not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
 
 
 # ============== Capacity Endpoints ==============
 
-@router.get("/capacity", response_model=List[PlantCapacity])
+@router.get("/capacity", response_model=List[PlantCapacity], dependencies=[conditional("plants")])
 async def get_capacity_data(db: Session = Depends(get_db)):
     """Get capacity data for all plants."""
+    return capacity_data(db)
+
+
+def capacity_data(db: Session) -> List[PlantCapacity]:
     plants = db.query(Plant).all()
 
     if not plants:
@@ -207,15 +120,108 @@ async def create_plant(plant: PlantCreate, db: Session = Depends(get_db)):
     db.add(db_plant)
     db.commit()
     db.refresh(db_plant)
+    dashboard_snapshot.invalidate()
 
     return db_plant
 
 
+@router.post("/capacity/simulate", response_model=SimulationResponse)
+async def simulate_capacity(request: SimulationRequest, db: Session = Depends(get_db)):
+    """
+    Predict line throughput under what-if scenarios with a discrete-event simulation.
+
+    Machines, downtime distributions and staffing are fitted from the database;
+    each scenario then runs the requested number of replications on a process pool.
+    """
+    if request.replications > settings.SIMULATION_MAX_REPLICATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.SIMULATION_MAX_REPLICATIONS} replications per run"
+        )
+
+    started = time.perf_counter()
+    model = simulation.fit_line_model(
+        db,
+        area=request.area,
+        lookback_days=request.lookback_days,
+        shifts_per_day=request.scenarios[0].shifts_per_day
+    )
+
+    results = []
+    for scenario in request.scenarios:
+        stages = simulation.apply_scenario(
+            model,
+            shifts_per_day=scenario.shifts_per_day,
+            staffing_ratio=scenario.staffing_ratio,
+            fixed_machine_ids=scenario.fixed_machine_ids,
+            extra_machines=scenario.extra_machines,
+            speed_factor=scenario.speed_factor,
+            downtime_reduction=scenario.downtime_reduction,
+            setup_reduction=scenario.setup_reduction,
+            buffer_reels=scenario.buffer_reels
+        )
+        if not stages:
+            raise HTTPException(status_code=404, detail="No production machines found for this area")
+
+        horizon = simulation.horizon_for(request.working_days, scenario.shifts_per_day)
+        runs = await run_in_threadpool(
+            simulation.run_replications,
+            stages, horizon, request.reel_length_m, request.replications, request.seed
+        )
+
+        per_day = runs["finished_reels"] * request.reel_length_m / request.working_days
+        mt_per_year = per_day.mean() * model.kg_per_meter / 1000 * simulation.WORKING_DAYS_PER_YEAR
+        shares = runs["stage_shares"].mean(axis=0) * 100  # stage x (starved, busy, blocked, down)
+        bottleneck = int(np.argmax(shares[:, 1] + shares[:, 3]))
+
+        results.append(ScenarioResult(
+            scenario=scenario.name,
+            throughput_m_per_day=round(float(per_day.mean()), 1),
+            throughput_m_per_day_p5=round(float(np.percentile(per_day, 5)), 1),
+            throughput_m_per_day_p95=round(float(np.percentile(per_day, 95)), 1),
+            throughput_mt_per_year=round(float(mt_per_year), 1),
+            utilization_percent=round(mt_per_year / model.design_capacity_mt * 100, 2) if model.design_capacity_mt else None,
+            change_percent=(
+                round((mt_per_year / results[0].throughput_mt_per_year - 1) * 100, 2)
+                if results and results[0].throughput_mt_per_year else None
+            ),
+            bottleneck_stage=stages[bottleneck].name,
+            stages=[
+                StageStatistics(
+                    stage=stage.name,
+                    machines=len(stage.machines),
+                    crewed=stage.crewed,
+                    busy_percent=round(float(shares[k, 1]), 2),
+                    blocked_percent=round(float(shares[k, 2]), 2),
+                    starved_percent=round(float(shares[k, 0]), 2),
+                    down_percent=round(float(shares[k, 3]), 2)
+                )
+                for k, stage in enumerate(stages)
+            ]
+        ))
+
+    return SimulationResponse(
+        area=request.area,
+        working_days=request.working_days,
+        replications=request.replications,
+        kg_per_meter=round(model.kg_per_meter, 4),
+        staffing_ratio=round(model.staffing_ratio, 3),
+        design_capacity_mt=model.design_capacity_mt,
+        current_capacity_mt=model.current_capacity_mt,
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+        results=results
+    )
+
+
 # ============== Workforce Endpoints ==============
 
-@router.get("/workforce", response_model=List[WorkforceSummary])
+@router.get("/workforce", response_model=List[WorkforceSummary], dependencies=[conditional("workforce_records")])
 async def get_workforce_data(db: Session = Depends(get_db)):
     """Get workforce data for all plants."""
+    return workforce_data(db)
+
+
+def workforce_data(db: Session) -> List[WorkforceSummary]:
     # Get latest record for each plant
     subquery = db.query(
         WorkforceRecord.plant_id,
@@ -269,6 +275,7 @@ async def create_workforce_record(record: WorkforceRecordCreate, db: Session = D
     db.add(db_record)
     db.commit()
     db.refresh(db_record)
+    dashboard_snapshot.invalidate()
 
     return db_record
 
@@ -278,9 +285,16 @@ async def create_workforce_record(record: WorkforceRecordCreate, db: Session = D
 @router.get("/trends/hourly", response_model=List[HourlyProduction])
 async def get_hourly_production(
     date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
+    media_type: str = Depends(negotiate)
 ):
-    """Get hourly production data for the dashboard chart."""
+    """Get hourly production data for the dashboard chart (also as columnar JSON or Arrow)."""
+    hours = hourly_production(None, date)
+    if media_type != JSON:
+        return tabular_response(media_type, to_columns(hours, list(HourlyProduction.model_fields)))
+    return hours
+
+
+def hourly_production(db: Optional[Session], date: Optional[datetime] = None) -> List[HourlyProduction]:
     # This would aggregate production logs by hour
     # For now, return sample data
     base_date = date or datetime.utcnow()
@@ -302,25 +316,99 @@ async def get_hourly_production(
     return hours
 
 
+# Production target (tonnes) of a production date with all 24 hours planned
+DAILY_TARGET_TONNES = 400
+
+
 @router.get("/trends/weekly", response_model=List[WeeklyTrend])
 async def get_weekly_production(db: Session = Depends(get_db)):
-    """Get weekly production trend data."""
-    days = ["Sat", "Sun", "Mon", "Tue", "Wed", "Thu", "Fri"]
-    production_values = [320, 380, 420, 390, 410, 350, 0]  # Friday is off
-    scrap_values = [25, 18, 22, 30, 15, 28, 0]
-    target = 400
+    """
+    Production and scrap (tonnes) per production date of the current plant
+    week. The target follows the planned time, so weekend days get none.
+    """
+    week_start = plant_calendar.week_start_of(plant_calendar.current_production_date())
+    start, _ = plant_calendar.day_bounds(week_start)
+    _, end = plant_calendar.day_bounds(week_start + timedelta(days=6))
+
+    days = db.query(ProductionCalendar.production_date, func.sum(ProductionCalendar.planned_minutes)).filter(
+        ProductionCalendar.week_start == week_start
+    ).group_by(ProductionCalendar.production_date).order_by(ProductionCalendar.production_date).all()
+
+    def tonnes_by_date(model, weight_column):
+        return dict(
+            db.query(ProductionCalendar.production_date, func.sum(weight_column) / 1000)
+            .select_from(model)
+            .join(ProductionCalendar, plant_calendar.calendar_bucket(model.timestamp))
+            .filter(model.timestamp >= start, model.timestamp < end)
+            .group_by(ProductionCalendar.production_date)
+            .all()
+        )
+
+    production = tonnes_by_date(ProductionLog, ProductionLog.output_weight)
+    scrap = tonnes_by_date(ScrapEntry, ScrapEntry.weight_kg)
 
     return [
         WeeklyTrend(
-            day=day,
-            production=prod,
-            target=target if day != "Fri" else 0,
-            scrap=scrap
+            day=day.strftime("%a"),
+            production=round(production.get(day) or 0, 2),
+            target=round(DAILY_TARGET_TONNES * planned_minutes / (24 * 60), 2),
+            scrap=round(scrap.get(day) or 0, 2)
         )
-        for day, prod, scrap in zip(days, production_values, scrap_values)
+        for day, planned_minutes in days
     ]
 
 
+# ============== Bundle ==============
+
+# Sections read from the database, each called as fn(db)
+BUNDLE_SECTIONS = {
+    DashboardSectionEnum.CAPACITY: capacity_data,
+    DashboardSectionEnum.WORKFORCE: workforce_data,
+    DashboardSectionEnum.HOURLY: hourly_production,
+    DashboardSectionEnum.MACHINES: list_machines,
+}
+
+
+async def _load_section(section: DashboardSectionEnum, timings: dict):
+    started = time.perf_counter()
+    try:
+        if section is DashboardSectionEnum.OVERVIEW:
+            payload, *_ = await single_flight.run(("dashboard.overview",), dashboard_snapshot.get)
+            return DashboardOverview.model_validate_json(payload)
+        return await run_in_threadpool(with_session, BUNDLE_SECTIONS[section])
+    finally:
+        timings[section.value] = round((time.perf_counter() - started) * 1000, 2)
+
+
+@router.get("/bundle", response_model=DashboardBundle)
+async def get_dashboard_bundle(sections: Optional[List[DashboardSectionEnum]] = Query(default=None)):
+    """
+    Several dashboard sections in one round trip (the home page needs all of them).
+
+    - **sections**: sections to include (repeat the parameter); all by default
+
+    Database sections run concurrently, each in a worker thread with its own
+    session and connection, and the overview comes from the snapshot, so the
+    response takes about as long as the slowest section. A section that
+    fails is listed in `errors` and left null instead of failing the page.
+    """
+    requested = list(dict.fromkeys(sections or DashboardSectionEnum))
+    timings = {}
+    results = await asyncio.gather(
+        *(_load_section(section, timings) for section in requested), return_exceptions=True
+    )
+
+    content, errors = {}, {}
+    for section, result in zip(requested, results):
+        if isinstance(result, Exception):
+            logger.error("Dashboard bundle section %s failed", section.value, exc_info=result)
+            errors[section.value] = "Failed to load"
+        else:
+            content[section.value] = result
+
+    return DashboardBundle(generated_at=datetime.utcnow(), errors=errors, timings_ms=timings, **content)
+
+
 # ============== Health Check ==============
 
 @router.get("/health")
@@ -1,26 +1,40 @@
 """
 Machine API Router
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import time
+
+import numpy as np
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+from app.core.fieldsets import FIELDS_QUERY, load_only_fields, parse_fields, sparse_response
+from app.core.formats import JSON, negotiate, tabular_response
+from app.core.http_cache import conditional
 from app.db import get_db
 from app.models import Machine, Employee, MachineStatus
 from app.schemas import (
     MachineCreate, MachineUpdate, MachineResponse, MachineStatusUpdate,
-    MachineStats, AreaOEE, MachineStatusEnum
+    MachineStats, AreaOEE, MachineLiveWindow, MachineStatusEnum
 )
+from app.services import kpi_counters
+from app.services.alert_engine import alert_engine
+from app.services.dashboard_snapshot import dashboard_snapshot
+from app.services.downsampling import downsample_indices
+from app.services.telemetry_ring import telemetry_rings
 
 router = APIRouter(prefix="/machines", tags=["Machines"])
 
 
-@router.get("", response_model=List[MachineResponse])
+@router.get("", response_model=List[MachineResponse], dependencies=[conditional("machines", "employees")])
 async def get_all_machines(
+    response: Response,
     area: Optional[str] = None,
     status: Optional[MachineStatusEnum] = None,
     type: Optional[str] = None,
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db)
 ):
     """
@@ -29,8 +43,39 @@ async def get_all_machines(
     - **area**: Filter by plant area (e.g., PCP-1, PCP-2)
     - **status**: Filter by machine status
     - **type**: Filter by machine type
+    - **fields**: Only return these fields, e.g. `id,name` for dropdowns
+    """
+    names = parse_fields(fields, MachineResponse)
+    machines = list_machines(db, area, status, type, names)
+    if names:
+        return sparse_response(machines, MachineResponse, names, response)
+    return machines
+
+
+def _machine_field(machine: Machine, name: str):
+    if name == "operator_name":
+        return machine.operator.name if machine.operator else None
+    return getattr(machine, name)
+
+
+def list_machines(
+    db: Session,
+    area: Optional[str] = None,
+    status: Optional[MachineStatusEnum] = None,
+    type: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = None
+) -> List[dict]:
+    """
+    Machines as MachineResponse dicts (also used by the dashboard bundle).
+
+    With `fields`, only the columns behind those fields are loaded, and the
+    operator is joined only for operator_name.
     """
     query = db.query(Machine)
+    if fields is None or "operator_name" in fields:
+        query = query.options(joinedload(Machine.operator))
+    if fields is not None:
+        query = load_only_fields(query, Machine, fields)
 
     if area:
         query = query.filter(Machine.area == area)
@@ -39,41 +84,22 @@ async def get_all_machines(
     if type:
         query = query.filter(Machine.type == type)
 
-    machines = query.all()
-
-    # Enrich with operator names
-    result = []
-    for machine in machines:
-        machine_dict = {
-            "id": machine.id,
-            "name": machine.name,
-            "area": machine.area,
-            "type": machine.type.value,
-            "status": machine.status.value,
-            "speed": machine.speed,
-            "target_speed": machine.target_speed,
-            "temperature": machine.temperature,
-            "oee": machine.oee,
-            "operator_name": machine.operator.name if machine.operator else None,
-            "created_at": machine.created_at,
-            "updated_at": machine.updated_at
-        }
-        result.append(machine_dict)
-
-    return result
+    names = fields or tuple(MachineResponse.model_fields)
+    return [{name: _machine_field(machine, name) for name in names} for machine in query.all()]
 
 
 @router.get("/stats", response_model=MachineStats)
 async def get_machine_stats(db: Session = Depends(get_db)):
-    """Get summary statistics for all machines."""
-    machines = db.query(Machine).all()
+    """Get summary statistics for all machines (read from the KPI counters)."""
+    by_status = {status: kpi_counters.machine_status_key(status) for status in MachineStatus}
+    counters = kpi_counters.read(db, [kpi_counters.MACHINES_TOTAL, *by_status.values()])
 
     return MachineStats(
-        total=len(machines),
-        running=len([m for m in machines if m.status == MachineStatus.RUNNING]),
-        idle=len([m for m in machines if m.status == MachineStatus.IDLE]),
-        stopped=len([m for m in machines if m.status == MachineStatus.STOPPED]),
-        maintenance=len([m for m in machines if m.status == MachineStatus.MAINTENANCE])
+        total=int(counters[kpi_counters.MACHINES_TOTAL]),
+        running=int(counters[by_status[MachineStatus.RUNNING]]),
+        idle=int(counters[by_status[MachineStatus.IDLE]]),
+        stopped=int(counters[by_status[MachineStatus.STOPPED]]),
+        maintenance=int(counters[by_status[MachineStatus.MAINTENANCE]])
     )
 
 
@@ -96,7 +122,60 @@ async def get_area_oee(area: str, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/{machine_id}", response_model=MachineResponse)
+@router.get("/{machine_id}/live", response_model=MachineLiveWindow)
+async def get_machine_live(
+    machine_id: str,
+    seconds: Optional[float] = Query(None, gt=0, description="Only readings from the last N seconds"),
+    max_points: Optional[int] = Query(None, ge=10, description="Downsample the window to at most this many readings (LTTB)"),
+    media_type: str = Depends(negotiate)
+):
+    """
+    Latest speed / temperature readings for live charts.
+
+    Served from the machine's in-memory ring buffer without touching the
+    database. Machines that have not reported yet return an empty window.
+    With `Accept: application/vnd.apache.arrow.stream` the ring arrays are
+    sent as an Arrow stream without copying them.
+    """
+    ring = telemetry_rings.get(machine_id)
+    if ring is None:
+        empty = np.empty(0)
+        timestamps, speed, temperature = empty, empty, empty
+    else:
+        since_ms = (time.time() - seconds) * 1000 if seconds else None
+        timestamps, speed, temperature = ring.window(since_ms)
+        if max_points:
+            # The ring holds readings in arrival order; LTTB needs them by time
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, speed, temperature = timestamps[order], speed[order], temperature[order]
+            keep = downsample_indices(timestamps, (speed, temperature), max_points)
+            timestamps, speed, temperature = timestamps[keep], speed[keep], temperature[keep]
+
+    if media_type != JSON:
+        return tabular_response(
+            media_type,
+            {"timestamps": timestamps, "speed": speed, "temperature": temperature},
+            extra={"machine_id": machine_id, "capacity": telemetry_rings.capacity}
+        )
+
+    payload = {
+        "machine_id": machine_id,
+        "capacity": telemetry_rings.capacity,
+        "count": len(timestamps),
+        "memory_bytes": ring.nbytes if ring else 0,
+        "timestamps": timestamps,
+        "speed": speed,
+        "temperature": temperature
+    }
+    # orjson writes the NumPy arrays directly (NaN becomes null)
+    return Response(
+        content=orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        media_type="application/json",
+        headers={"Vary": "Accept"}
+    )
+
+
+@router.get("/{machine_id}", response_model=MachineResponse, dependencies=[conditional("machines", "employees")])
 async def get_machine(machine_id: str, db: Session = Depends(get_db)):
     """Get a specific machine by ID."""
     machine = db.query(Machine).filter(Machine.id == machine_id).first()
@@ -141,8 +220,11 @@ async def create_machine(machine: MachineCreate, db: Session = Depends(get_db)):
     )
 
     db.add(db_machine)
+    kpi_counters.machine_status_changed(db, None, db_machine.status)
     db.commit()
     db.refresh(db_machine)
+    alert_engine.machine_changed(db_machine)
+    dashboard_snapshot.invalidate()
 
     return db_machine
 
@@ -154,11 +236,12 @@ async def update_machine(
     db: Session = Depends(get_db)
 ):
     """Update a machine."""
-    machine = db.query(Machine).filter(Machine.id == machine_id).first()
+    machine = db.query(Machine).filter(Machine.id == machine_id).with_for_update().first()
 
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
 
+    old_status = machine.status
     update_data = machine_update.model_dump(exclude_unset=True)
 
     for field, value in update_data.items():
@@ -169,8 +252,11 @@ async def update_machine(
                 setattr(machine, field, value)
 
     machine.updated_at = datetime.utcnow()
+    kpi_counters.machine_status_changed(db, old_status, machine.status)
     db.commit()
     db.refresh(machine)
+    alert_engine.machine_changed(machine)
+    dashboard_snapshot.invalidate()
 
     return machine
 
@@ -182,11 +268,12 @@ async def update_machine_status(
     db: Session = Depends(get_db)
 ):
     """Update machine status and optionally speed/temperature."""
-    machine = db.query(Machine).filter(Machine.id == machine_id).first()
+    machine = db.query(Machine).filter(Machine.id == machine_id).with_for_update().first()
 
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
 
+    kpi_counters.machine_status_changed(db, machine.status, status_update.status)
     machine.status = status_update.status.value
 
     if status_update.speed is not None:
@@ -203,6 +290,8 @@ async def update_machine_status(
     machine.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(machine)
+    alert_engine.machine_changed(machine)
+    dashboard_snapshot.invalidate()
 
     return {
         "message": "Machine status updated successfully",
@@ -214,12 +303,16 @@ async def update_machine_status(
 @router.delete("/{machine_id}")
 async def delete_machine(machine_id: str, db: Session = Depends(get_db)):
     """Delete a machine."""
-    machine = db.query(Machine).filter(Machine.id == machine_id).first()
+    machine = db.query(Machine).filter(Machine.id == machine_id).with_for_update().first()
 
     if not machine:
         raise HTTPException(status_code=404, detail="Machine not found")
 
+    kpi_counters.machine_status_changed(db, machine.status, None)
     db.delete(machine)
     db.commit()
+    telemetry_rings.drop(machine_id)
+    alert_engine.machine_deleted(machine_id)
+    dashboard_snapshot.invalidate()
 
     return {"message": "Machine deleted successfully", "machine_id": machine_id}
@@ -1,12 +1,14 @@
 """
 Maintenance API Router
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime, timedelta
 
+from app.core.fieldsets import FIELDS_QUERY, load_only_fields, parse_fields, sparse_response
+from app.core.http_cache import conditional
 from app.db import get_db
 from app.models import MaintenanceTask, EmulsionLog, Machine, MaintenanceStatus, MaintenanceType
 from app.schemas import (
@@ -15,23 +17,36 @@ from app.schemas import (
     MaintenanceSummary,
     MaintenanceStatusEnum, MaintenanceTypeEnum
 )
+from app.core.singleflight import single_flight
+from app.services import kpi_counters
+from app.services.alert_engine import alert_engine
+from app.services.dashboard_snapshot import dashboard_snapshot
 
 router = APIRouter(prefix="/maintenance", tags=["Maintenance"])
 
 
 # ============== Maintenance Tasks ==============
 
-@router.get("/tasks", response_model=List[MaintenanceTaskResponse])
+@router.get("/tasks", response_model=List[MaintenanceTaskResponse], dependencies=[conditional("maintenance_tasks")])
 async def get_maintenance_tasks(
+    response: Response,
     machine_id: Optional[str] = None,
     status: Optional[MaintenanceStatusEnum] = None,
     type: Optional[MaintenanceTypeEnum] = None,
     assignee: Optional[str] = None,
     limit: int = Query(default=100, le=500),
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db)
 ):
-    """Get maintenance tasks with optional filtering."""
+    """
+    Get maintenance tasks with optional filtering.
+
+    - **fields**: Only return these fields, e.g. `id,title,status`
+    """
+    names = parse_fields(fields, MaintenanceTaskResponse)
     query = db.query(MaintenanceTask)
+    if names:
+        query = load_only_fields(query, MaintenanceTask, names)
 
     if machine_id:
         query = query.filter(MaintenanceTask.machine_id == machine_id)
@@ -43,10 +58,12 @@ async def get_maintenance_tasks(
         query = query.filter(MaintenanceTask.assignee.ilike(f"%{assignee}%"))
 
     tasks = query.order_by(MaintenanceTask.priority.asc(), MaintenanceTask.created_at.desc()).limit(limit).all()
+    if names:
+        return sparse_response(tasks, MaintenanceTaskResponse, names, response)
     return tasks
 
 
-@router.get("/tasks/{task_id}", response_model=MaintenanceTaskResponse)
+@router.get("/tasks/{task_id}", response_model=MaintenanceTaskResponse, dependencies=[conditional("maintenance_tasks")])
 async def get_maintenance_task(task_id: str, db: Session = Depends(get_db)):
     """Get a specific maintenance task."""
     task = db.query(MaintenanceTask).filter(MaintenanceTask.id == task_id).first()
@@ -83,8 +100,11 @@ async def create_maintenance_task(task: MaintenanceTaskCreate, db: Session = Dep
     )
 
     db.add(db_task)
+    kpi_counters.maintenance_status_changed(db, None, db_task.status)
     db.commit()
     db.refresh(db_task)
+    alert_engine.request_sweep()
+    dashboard_snapshot.invalidate()
 
     return db_task
 
@@ -96,10 +116,11 @@ async def update_maintenance_task(
     db: Session = Depends(get_db)
 ):
     """Update a maintenance task."""
-    task = db.query(MaintenanceTask).filter(MaintenanceTask.id == task_id).first()
+    task = db.query(MaintenanceTask).filter(MaintenanceTask.id == task_id).with_for_update().first()
     if not task:
         raise HTTPException(status_code=404, detail="Maintenance task not found")
 
+    old_status = task.status
     update_data = task_update.model_dump(exclude_unset=True)
 
     for field, value in update_data.items():
@@ -122,17 +143,23 @@ async def update_maintenance_task(
     task.total_cost = (task.labor_cost or 0) + (task.parts_cost or 0)
 
     task.updated_at = datetime.utcnow()
+    kpi_counters.maintenance_status_changed(db, old_status, task.status)
     db.commit()
     db.refresh(task)
 
     # Update machine status if task is completed
     if task.status == MaintenanceStatus.COMPLETED.value:
-        machine = db.query(Machine).filter(Machine.id == task.machine_id).first()
+        machine = db.query(Machine).filter(Machine.id == task.machine_id).with_for_update().first()
         if machine and machine.status.value == "maintenance":
             from app.models import MachineStatus
+            kpi_counters.machine_status_changed(db, machine.status, MachineStatus.IDLE)
             machine.status = MachineStatus.IDLE
             machine.updated_at = datetime.utcnow()
             db.commit()
+            alert_engine.machine_changed(machine)
+
+    alert_engine.request_sweep()
+    dashboard_snapshot.invalidate()
 
     return task
 
@@ -140,23 +167,24 @@ async def update_maintenance_task(
 @router.delete("/tasks/{task_id}")
 async def delete_maintenance_task(task_id: str, db: Session = Depends(get_db)):
     """Delete a maintenance task."""
-    task = db.query(MaintenanceTask).filter(MaintenanceTask.id == task_id).first()
+    task = db.query(MaintenanceTask).filter(MaintenanceTask.id == task_id).with_for_update().first()
     if not task:
         raise HTTPException(status_code=404, detail="Maintenance task not found")
 
+    kpi_counters.maintenance_status_changed(db, task.status, None)
     db.delete(task)
     db.commit()
+    alert_engine.request_sweep()
+    dashboard_snapshot.invalidate()
 
     return {"message": "Maintenance task deleted successfully", "task_id": task_id}
 
 
-@router.get("/summary", response_model=MaintenanceSummary)
-async def get_maintenance_summary(
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
-):
-    """Get maintenance summary with KPIs."""
+def _compute_maintenance_summary(
+    db: Session,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime]
+) -> MaintenanceSummary:
     query = db.query(MaintenanceTask)
 
     if start_date:
@@ -198,6 +226,22 @@ async def get_maintenance_summary(
     )
 
 
+@router.get("/summary", response_model=MaintenanceSummary)
+async def get_maintenance_summary(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """
+    Get maintenance summary with KPIs.
+
+    Concurrent requests for the same period share one computation.
+    """
+    return await single_flight.run_with_session(
+        ("maintenance.summary", start_date, end_date),
+        _compute_maintenance_summary, start_date, end_date
+    )
+
+
 # ============== Emulsion Logs ==============
 
 @router.get("/emulsion", response_model=List[EmulsionLogResponse])
@@ -264,5 +308,6 @@ async def create_emulsion_log(log: EmulsionLogCreate, db: Session = Depends(get_
     db.add(db_log)
     db.commit()
     db.refresh(db_log)
+    alert_engine.emulsion_logged(db_log.machine_id, is_within_spec, action_required, db_log.ph_level)
 
     return db_log
@@ -0,0 +1,40 @@
+"""
+Metrics API Router - Prometheus scrape endpoint
+"""
+from fastapi import APIRouter, Response
+
+from app.core.metrics import CONTENT_TYPE, counter, gauge, histogram, request_metrics, resident_memory_bytes
+from app.db import engine
+from app.db.pool import pool_stats
+from app.services.telemetry_ingest import ingest_buffer
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, connection pool, ingest and memory metrics of this worker in the Prometheus text format."""
+    lines = []
+    request_metrics.render(lines)
+
+    pool = engine.pool
+    gauge(lines, "db_pool_size", "Connections the pool keeps open.", pool.size())
+    gauge(lines, "db_pool_checked_out", "Connections in use.", pool.checkedout())
+    gauge(lines, "db_pool_overflow", "Connections open beyond the pool size.", max(pool.overflow(), 0))
+    counter(lines, "db_pool_checkouts_total", "Connection checkouts.", pool_stats.counters["checkouts"])
+    counter(lines, "db_pool_timeouts_total", "Checkouts that failed on an exhausted pool.", pool_stats.counters["timeouts"])
+    histogram(lines, "db_pool_wait_seconds", "Time to get a connection from the pool.", pool_stats.wait_ms, 1000)
+    histogram(lines, "db_pool_hold_seconds", "Time connections stay checked out.", pool_stats.hold_ms, 1000)
+
+    stats = ingest_buffer.snapshot()
+    counter(lines, "ingest_rows_accepted_total", "Telemetry readings accepted into the buffer.", stats["accepted"])
+    counter(lines, "ingest_rows_written_total", "Telemetry readings written to production_logs.", stats["rows_written"])
+    counter(lines, "ingest_rows_dropped_total", "Telemetry readings dropped (e.g. unknown machine).", stats["rows_dropped"])
+    gauge(lines, "ingest_rows_per_second", "Readings written per second over the last minute.", stats["rows_per_second"])
+    gauge(lines, "ingest_queue_depth", "Readings waiting to be written.", stats["queue_depth"])
+
+    rss = resident_memory_bytes()
+    if rss is not None:
+        gauge(lines, "process_resident_memory_bytes", "Resident memory of this worker process.", rss)
+
+    return Response(content="\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -1,41 +1,60 @@
 """
 Production API Router
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 
+from app.core.config import settings
+from app.core.fieldsets import FIELDS_QUERY, load_only_fields, parse_fields, sparse_response
+from app.core.formats import JSON, negotiate, tabular_response, to_columns
+from app.core.http_cache import conditional
 from app.db import get_db
 from app.models import (
-    WorkOrder, ProductionLog, DowntimeLog, Machine, Employee,
+    WorkOrder, ProductionLog, DowntimeLog, Machine,
     WorkOrderStatus, Priority, Shift, DowntimeType
 )
 from app.schemas import (
     WorkOrderCreate, WorkOrderUpdate, WorkOrderResponse,
     ProductionLogCreate, ProductionLogResponse,
+    TelemetryBatch, TelemetryIngestResponse,
     DowntimeLogCreate, DowntimeLogResponse,
     ProductionSummary, DowntimeSummary,
     ShiftEnum, PriorityEnum, WorkOrderStatusEnum, DowntimeTypeEnum
 )
+from app.services import kpi_counters, plant_calendar, shop_floor
+from app.services.alert_engine import alert_engine
+from app.services.dashboard_snapshot import dashboard_snapshot
+from app.services.downsampling import downsample_indices, epoch_ms, stream_columns
+from app.services.telemetry_ingest import ingest_buffer, reading_row
+from app.services.telemetry_ring import telemetry_rings
 
 router = APIRouter(prefix="/production", tags=["Production"])
 
 
 # ============== Work Orders ==============
 
-@router.get("/work-orders", response_model=List[WorkOrderResponse])
+@router.get("/work-orders", response_model=List[WorkOrderResponse], dependencies=[conditional("work_orders")])
 async def get_work_orders(
+    response: Response,
     priority: Optional[PriorityEnum] = None,
     status: Optional[WorkOrderStatusEnum] = None,
     machine_id: Optional[str] = None,
     customer: Optional[str] = None,
     limit: int = Query(default=100, le=500),
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db)
 ):
-    """Get work orders with optional filtering."""
+    """
+    Get work orders with optional filtering.
+
+    - **fields**: Only return these fields, e.g. `id,customer,status`
+    """
+    names = parse_fields(fields, WorkOrderResponse)
     query = db.query(WorkOrder)
+    if names:
+        query = load_only_fields(query, WorkOrder, names)
 
     if priority:
         query = query.filter(WorkOrder.priority == priority.value)
@@ -47,10 +66,12 @@ async def get_work_orders(
         query = query.filter(WorkOrder.customer.ilike(f"%{customer}%"))
 
     orders = query.order_by(WorkOrder.due_date.asc()).limit(limit).all()
+    if names:
+        return sparse_response(orders, WorkOrderResponse, names, response)
     return orders
 
 
-@router.get("/work-orders/{order_id}", response_model=WorkOrderResponse)
+@router.get("/work-orders/{order_id}", response_model=WorkOrderResponse, dependencies=[conditional("work_orders")])
 async def get_work_order(order_id: str, db: Session = Depends(get_db)):
     """Get a specific work order."""
     order = db.query(WorkOrder).filter(WorkOrder.id == order_id).first()
@@ -85,8 +106,10 @@ async def create_work_order(order: WorkOrderCreate, db: Session = Depends(get_db
     )
 
     db.add(db_order)
+    kpi_counters.work_order_status_changed(db, None, db_order.status)
     db.commit()
     db.refresh(db_order)
+    dashboard_snapshot.invalidate()
 
     return db_order
 
@@ -98,10 +121,11 @@ async def update_work_order(
     db: Session = Depends(get_db)
 ):
     """Update a work order."""
-    order = db.query(WorkOrder).filter(WorkOrder.id == order_id).first()
+    order = db.query(WorkOrder).filter(WorkOrder.id == order_id).with_for_update().first()
     if not order:
         raise HTTPException(status_code=404, detail="Work order not found")
 
+    old_status = order.status
     update_data = order_update.model_dump(exclude_unset=True)
 
     for field, value in update_data.items():
@@ -123,8 +147,10 @@ async def update_work_order(
             order.end_date = datetime.utcnow()
 
     order.updated_at = datetime.utcnow()
+    kpi_counters.work_order_status_changed(db, old_status, order.status)
     db.commit()
     db.refresh(order)
+    dashboard_snapshot.invalidate()
 
     return order
 
@@ -138,9 +164,26 @@ async def get_production_logs(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     limit: int = Query(default=100, le=1000),
+    max_points: Optional[int] = Query(
+        None, ge=10, le=settings.CHART_MAX_POINTS,
+        description="Downsample the whole date range to at most this many logs (instead of `limit`)"
+    ),
+    media_type: str = Depends(negotiate),
     db: Session = Depends(get_db)
 ):
-    """Get production logs with optional filtering."""
+    """
+    Get production logs with optional filtering.
+
+    - **max_points**: Pick at most this many logs of one machine over the
+      whole range with LTTB, keeping the shape of the speed and temperature
+      curves. Requires machine_id; `limit` is ignored.
+
+    Chart clients can send `Accept: application/vnd.columnar+json` or
+    `application/vnd.apache.arrow.stream` for one array per field.
+    """
+    if max_points and not machine_id:
+        raise HTTPException(status_code=400, detail="max_points requires machine_id")
+
     query = db.query(ProductionLog)
 
     if machine_id:
@@ -152,6 +195,15 @@ async def get_production_logs(
     if end_date:
         query = query.filter(ProductionLog.timestamp <= end_date)
 
+    if max_points:
+        series = query.with_entities(
+            ProductionLog.id, epoch_ms(ProductionLog.timestamp), ProductionLog.speed, ProductionLog.temperature
+        ).order_by(ProductionLog.timestamp)
+        ids, timestamps, speed, temperature = stream_columns(db, series.statement)
+        keep = downsample_indices(timestamps, (speed, temperature), max_points)
+        query = query.filter(ProductionLog.id.in_(ids[keep].astype(int).tolist()))
+        limit = None
+
     logs = query.order_by(ProductionLog.timestamp.desc()).limit(limit).all()
 
     # Enrich with operator names
@@ -174,47 +226,24 @@ async def get_production_logs(
         }
         result.append(log_dict)
 
+    if media_type != JSON:
+        return tabular_response(media_type, to_columns(result, list(ProductionLogResponse.model_fields)))
     return result
 
 
 @router.post("/logs", response_model=ProductionLogResponse)
 async def create_production_log(log: ProductionLogCreate, db: Session = Depends(get_db)):
     """Create a new production log entry."""
-    # Verify machine exists
-    machine = db.query(Machine).filter(Machine.id == log.machine_id).first()
-    if not machine:
+    try:
+        db_log = shop_floor.add_production_log(db, log)
+    except shop_floor.MachineNotFound:
         raise HTTPException(status_code=404, detail="Machine not found")
 
-    # Find operator by name if provided
-    operator_id = None
-    if log.operator_name:
-        operator = db.query(Employee).filter(Employee.name == log.operator_name).first()
-        if operator:
-            operator_id = operator.id
-
-    db_log = ProductionLog(
-        machine_id=log.machine_id,
-        operator_id=operator_id,
-        shift=log.shift.value,
-        timestamp=log.timestamp or datetime.utcnow(),
-        speed=log.speed,
-        target_speed=log.target_speed,
-        temperature=log.temperature,
-        pressure=log.pressure,
-        output_length=log.output_length,
-        output_weight=log.output_weight,
-        notes=log.notes
-    )
-
-    # Update machine status
-    machine.speed = log.speed
-    if log.temperature:
-        machine.temperature = log.temperature
-    machine.updated_at = datetime.utcnow()
-
-    db.add(db_log)
     db.commit()
     db.refresh(db_log)
+    row = reading_row(log, db_log.timestamp)
+    telemetry_rings.record([row])
+    alert_engine.readings([row])
 
     return {
         "id": db_log.id,
@@ -233,6 +262,29 @@ async def create_production_log(log: ProductionLogCreate, db: Session = Depends(
     }
 
 
+@router.post("/logs/ingest", response_model=TelemetryIngestResponse, status_code=202)
+async def ingest_production_logs(batch: TelemetryBatch):
+    """
+    Queue a batch of readings for group-commit ingest.
+
+    Rows are written within TELEMETRY_FLUSH_INTERVAL_MS together with other
+    pending readings. Returns 503 with Retry-After when the queue is full.
+    """
+    unknown = await ingest_buffer.unknown_machines({r.machine_id for r in batch.readings})
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Machine not found: {', '.join(sorted(unknown))}")
+
+    received_at = datetime.utcnow()
+    if not ingest_buffer.offer([reading_row(r, received_at) for r in batch.readings]):
+        raise HTTPException(
+            status_code=503,
+            detail="Telemetry ingest queue is full, retry later",
+            headers={"Retry-After": "1"}
+        )
+
+    return TelemetryIngestResponse(accepted=len(batch.readings), queue_depth=ingest_buffer.depth)
+
+
 @router.get("/logs/summary", response_model=ProductionSummary)
 async def get_production_summary(
     machine_id: Optional[str] = None,
@@ -245,13 +297,8 @@ async def get_production_summary(
     if machine_id:
         query = query.filter(ProductionLog.machine_id == machine_id)
 
-    # Default to today
-    if date:
-        start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-    else:
-        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-
-    end = start + timedelta(days=1)
+    # Default to the current production date
+    start, end = plant_calendar.day_bounds_of(date)
     query = query.filter(ProductionLog.timestamp >= start, ProductionLog.timestamp < end)
 
     logs = query.all()
@@ -307,23 +354,11 @@ async def get_downtime_logs(
 @router.post("/downtime", response_model=DowntimeLogResponse)
 async def create_downtime_log(log: DowntimeLogCreate, db: Session = Depends(get_db)):
     """Create a new downtime log entry."""
-    # Verify machine exists
-    machine = db.query(Machine).filter(Machine.id == log.machine_id).first()
-    if not machine:
+    try:
+        db_log = shop_floor.add_downtime_log(db, log)
+    except shop_floor.MachineNotFound:
         raise HTTPException(status_code=404, detail="Machine not found")
 
-    db_log = DowntimeLog(
-        machine_id=log.machine_id,
-        shift=log.shift.value,
-        timestamp=log.timestamp or datetime.utcnow(),
-        downtime_type=log.downtime_type.value,
-        duration_minutes=log.duration_minutes,
-        reason=log.reason,
-        resolution=log.resolution,
-        is_planned=log.is_planned
-    )
-
-    db.add(db_log)
     db.commit()
     db.refresh(db_log)
 
@@ -342,13 +377,8 @@ async def get_downtime_summary(
     if machine_id:
         query = query.filter(DowntimeLog.machine_id == machine_id)
 
-    # Default to today
-    if date:
-        start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-    else:
-        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-
-    end = start + timedelta(days=1)
+    # Default to the current production date
+    start, end = plant_calendar.day_bounds_of(date)
     query = query.filter(DowntimeLog.timestamp >= start, DowntimeLog.timestamp < end)
 
     logs = query.all()
@@ -1,21 +1,27 @@
 """
 Quality and Scrap API Router
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from app.db import get_db
-from app.models import QualityCheck, ScrapEntry, Machine
+from app.models import QualityCheck, ScrapEntry
 from app.schemas import (
     QualityCheckCreate, QualityCheckResponse,
     ScrapEntryCreate, ScrapEntryResponse,
     ScrapSummary, QualitySummary,
     ShiftEnum, ScrapTypeEnum
 )
-from app.core.config import settings
+from app.core.fieldsets import FIELDS_QUERY, load_only_fields, parse_fields, sparse_response
+from app.core.formats import JSON, negotiate, tabular_response, to_columns
+from app.core.http_cache import static
+from app.core.singleflight import single_flight
+from app.services import plant_calendar, shop_floor
+from app.services.alert_engine import alert_engine
+from app.services.dashboard_snapshot import dashboard_snapshot
 
 router = APIRouter(prefix="/quality", tags=["Quality & Scrap"])
 
@@ -24,16 +30,28 @@ router = APIRouter(prefix="/quality", tags=["Quality & Scrap"])
 
 @router.get("/checks", response_model=List[QualityCheckResponse])
 async def get_quality_checks(
+    response: Response,
     machine_id: Optional[str] = None,
     passed: Optional[bool] = None,
     shift: Optional[ShiftEnum] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     limit: int = Query(default=100, le=1000),
+    fields: Optional[str] = FIELDS_QUERY,
+    media_type: str = Depends(negotiate),
     db: Session = Depends(get_db)
 ):
-    """Get quality checks with optional filtering."""
+    """
+    Get quality checks with optional filtering.
+
+    - **fields**: Only return these fields, e.g. `id,machine_id,passed`
+
+    Also available as columnar JSON or Arrow (see GET /production/logs).
+    """
+    names = parse_fields(fields, QualityCheckResponse)
     query = db.query(QualityCheck)
+    if names:
+        query = load_only_fields(query, QualityCheck, names)
 
     if machine_id:
         query = query.filter(QualityCheck.machine_id == machine_id)
@@ -47,47 +65,29 @@ async def get_quality_checks(
         query = query.filter(QualityCheck.timestamp <= end_date)
 
     checks = query.order_by(QualityCheck.timestamp.desc()).limit(limit).all()
+    if media_type != JSON:
+        fields = names or list(QualityCheckResponse.model_fields)
+        return tabular_response(media_type, to_columns(checks, fields, QualityCheckResponse))
+    if names:
+        return sparse_response(checks, QualityCheckResponse, names, response)
     return checks
 
 
 @router.post("/checks", response_model=QualityCheckResponse)
 async def create_quality_check(check: QualityCheckCreate, db: Session = Depends(get_db)):
     """Create a new quality check entry."""
-    # Verify machine exists
-    machine = db.query(Machine).filter(Machine.id == check.machine_id).first()
-    if not machine:
+    try:
+        db_check = shop_floor.add_quality_check(db, check)
+    except shop_floor.MachineNotFound:
         raise HTTPException(status_code=404, detail="Machine not found")
 
-    # Determine overall pass/fail
-    passed = (
-        check.spark_test_passed and
-        check.tensile_test_passed and
-        check.visual_inspection_passed
-    )
-
-    db_check = QualityCheck(
-        machine_id=check.machine_id,
-        shift=check.shift.value,
-        timestamp=check.timestamp or datetime.utcnow(),
-        diameter=check.diameter,
-        diameter_tolerance=check.diameter_tolerance,
-        thickness=check.thickness,
-        concentricity=check.concentricity,
-        spark_test_passed=check.spark_test_passed,
-        spark_test_voltage=check.spark_test_voltage,
-        tensile_test_passed=check.tensile_test_passed,
-        tensile_strength=check.tensile_strength,
-        elongation=check.elongation,
-        visual_inspection_passed=check.visual_inspection_passed,
-        defect_type=check.defect_type,
-        defect_location=check.defect_location,
-        passed=passed,
-        notes=check.notes
-    )
-
-    db.add(db_check)
     db.commit()
     db.refresh(db_check)
+    # The rule reads the machine's latest checks with a session of its own: release
+    # this one first and keep the queries off the event loop
+    db.close()
+    await run_in_threadpool(alert_engine.quality_check, db_check.machine_id)
+    dashboard_snapshot.invalidate()
 
     return db_check
 
@@ -104,13 +104,8 @@ async def get_quality_summary(
     if machine_id:
         query = query.filter(QualityCheck.machine_id == machine_id)
 
-    # Default to today
-    if date:
-        start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-    else:
-        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-
-    end = start + timedelta(days=1)
+    # Default to the current production date
+    start, end = plant_calendar.day_bounds_of(date)
     query = query.filter(QualityCheck.timestamp >= start, QualityCheck.timestamp < end)
 
     checks = query.all()
@@ -174,54 +169,24 @@ async def get_scrap_entries(
 @router.post("/scrap", response_model=ScrapEntryResponse)
 async def create_scrap_entry(entry: ScrapEntryCreate, db: Session = Depends(get_db)):
     """Create a new scrap entry with automatic financial calculation."""
-    # Verify machine exists
-    machine = db.query(Machine).filter(Machine.id == entry.machine_id).first()
-    if not machine:
+    try:
+        db_entry = shop_floor.add_scrap_entry(db, entry)
+    except shop_floor.MachineNotFound:
         raise HTTPException(status_code=404, detail="Machine not found")
 
-    db_entry = ScrapEntry(
-        machine_id=entry.machine_id,
-        shift=entry.shift.value,
-        timestamp=entry.timestamp or datetime.utcnow(),
-        scrap_type=entry.scrap_type.value,
-        scrap_code=entry.scrap_code,
-        weight_kg=entry.weight_kg,
-        copper_content_percent=entry.copper_content_percent,
-        aluminum_content_percent=entry.aluminum_content_percent,
-        reason=entry.reason,
-        work_order_id=entry.work_order_id,
-        notes=entry.notes
-    )
-
-    # Calculate financial value
-    db_entry.calculate_financial_value(settings.LME_COPPER_PRICE)
-
-    db.add(db_entry)
     db.commit()
     db.refresh(db_entry)
+    dashboard_snapshot.invalidate()
 
     return db_entry
 
 
-@router.get("/scrap/summary", response_model=ScrapSummary)
-async def get_scrap_summary(
-    machine_id: Optional[str] = None,
-    date: Optional[datetime] = None,
-    db: Session = Depends(get_db)
-):
-    """Get scrap summary with financial value calculation."""
+def _compute_scrap_summary(db: Session, machine_id: Optional[str], start: datetime, end: datetime) -> ScrapSummary:
     query = db.query(ScrapEntry)
 
     if machine_id:
         query = query.filter(ScrapEntry.machine_id == machine_id)
 
-    # Default to today
-    if date:
-        start = date.replace(hour=0, minute=0, second=0, microsecond=0)
-    else:
-        start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-
-    end = start + timedelta(days=1)
     query = query.filter(ScrapEntry.timestamp >= start, ScrapEntry.timestamp < end)
 
     entries = query.all()
@@ -251,20 +216,41 @@ async def get_scrap_summary(
     )
 
 
-@router.get("/scrap/codes")
+@router.get("/scrap/summary", response_model=ScrapSummary)
+async def get_scrap_summary(
+    machine_id: Optional[str] = None,
+    date: Optional[datetime] = None
+):
+    """
+    Get scrap summary with financial value calculation.
+
+    Concurrent requests for the same machine and day share one computation.
+    """
+    # Default to the current production date
+    start, end = plant_calendar.day_bounds_of(date)
+
+    return await single_flight.run_with_session(
+        ("quality.scrap_summary", machine_id or None, start),
+        _compute_scrap_summary, machine_id, start, end
+    )
+
+
+# Based on the 76 internal scrap codes mentioned in the documentation
+SCRAP_CODES = [
+    {"code": "SC-001", "type": "copper-wire", "description": "Pure Copper Wire Scrap", "copper_content": 93},
+    {"code": "SC-002", "type": "copper-wire", "description": "Copper Wire with Light Coating", "copper_content": 85},
+    {"code": "SC-010", "type": "pvc-compound", "description": "Virgin PVC Compound", "copper_content": 0},
+    {"code": "SC-011", "type": "pvc-compound", "description": "Recycled PVC", "copper_content": 0},
+    {"code": "SC-020", "type": "mixed-cable", "description": "Mixed LV Cable Scrap", "copper_content": 45},
+    {"code": "SC-021", "type": "mixed-cable", "description": "Mixed MV Cable Scrap", "copper_content": 55},
+    {"code": "SC-030", "type": "insulated-copper", "description": "PVC Insulated Copper", "copper_content": 70},
+    {"code": "SC-031", "type": "insulated-copper", "description": "XLPE Insulated Copper", "copper_content": 75},
+    {"code": "SC-040", "type": "aluminum-wire", "description": "Pure Aluminum Wire", "copper_content": 0},
+    {"code": "SC-050", "type": "steel-armor", "description": "Steel Armoring Wire", "copper_content": 0},
+]
+
+
+@router.get("/scrap/codes", dependencies=[static(SCRAP_CODES)])
 async def get_scrap_codes():
-    """Get list of available scrap codes with descriptions."""
-    # Based on the 76 internal scrap codes mentioned in the documentation
-    scrap_codes = [
-        {"code": "SC-001", "type": "copper-wire", "description": "Pure Copper Wire Scrap", "copper_content": 93},
-        {"code": "SC-002", "type": "copper-wire", "description": "Copper Wire with Light Coating", "copper_content": 85},
-        {"code": "SC-010", "type": "pvc-compound", "description": "Virgin PVC Compound", "copper_content": 0},
-        {"code": "SC-011", "type": "pvc-compound", "description": "Recycled PVC", "copper_content": 0},
-        {"code": "SC-020", "type": "mixed-cable", "description": "Mixed LV Cable Scrap", "copper_content": 45},
-        {"code": "SC-021", "type": "mixed-cable", "description": "Mixed MV Cable Scrap", "copper_content": 55},
-        {"code": "SC-030", "type": "insulated-copper", "description": "PVC Insulated Copper", "copper_content": 70},
-        {"code": "SC-031", "type": "insulated-copper", "description": "XLPE Insulated Copper", "copper_content": 75},
-        {"code": "SC-040", "type": "aluminum-wire", "description": "Pure Aluminum Wire", "copper_content": 0},
-        {"code": "SC-050", "type": "steel-armor", "description": "Steel Armoring Wire", "copper_content": 0},
-    ]
-    return scrap_codes
+    """Get list of available scrap codes with descriptions (cacheable for a day)."""
+    return SCRAP_CODES
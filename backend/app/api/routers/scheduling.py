@@ -0,0 +1,165 @@
+"""
+Scheduling API Router - Gantt timeline
+"""
+import heapq
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import List, Optional
+from datetime import datetime, timedelta
+
+from app.db import get_db
+from app.models import (
+    WorkOrder, WorkOrderStatus, work_order_period,
+    MaintenanceTask, MaintenanceStatus, maintenance_task_period
+)
+from app.schemas import (
+    TimelineItemKindEnum, ConflictTypeEnum,
+    TimelineItem, TimelineConflict, TimelineResponse
+)
+
+router = APIRouter(prefix="/scheduling", tags=["Scheduling"])
+
+# Largest window a single timeline request may cover
+MAX_WINDOW = timedelta(days=92)
+
+
+def _detect_conflicts(items: List[TimelineItem]) -> List[TimelineConflict]:
+    """
+    Find overlapping bars per machine with a sweep over start times.
+
+    Runs in O(n log n + k) for n bars and k overlapping pairs.
+    Open-ended bars (end is None) overlap everything that starts after them.
+    """
+    conflicts = []
+    by_machine = {}
+    for item in items:
+        by_machine.setdefault(item.machine_id, []).append(item)
+
+    for machine_id, machine_items in by_machine.items():
+        machine_items.sort(key=lambda i: i.start)
+        active = []  # heap of (end timestamp, sequence, item)
+
+        for seq, item in enumerate(machine_items):
+            while active and active[0][0] < item.start.timestamp():
+                heapq.heappop(active)
+
+            for _, _, other in active:
+                if other.kind == item.kind == TimelineItemKindEnum.WORK_ORDER:
+                    conflict_type = ConflictTypeEnum.WORK_ORDER_OVERLAP
+                elif other.kind == item.kind:
+                    conflict_type = ConflictTypeEnum.MAINTENANCE_OVERLAP
+                else:
+                    conflict_type = ConflictTypeEnum.MAINTENANCE_CLASH
+
+                ends = [e for e in (item.end, other.end) if e is not None]
+                conflicts.append(TimelineConflict(
+                    type=conflict_type,
+                    machine_id=machine_id,
+                    item_ids=[other.id, item.id],
+                    overlap_start=item.start,
+                    overlap_end=min(ends) if ends else None
+                ))
+
+            end_key = item.end.timestamp() if item.end else float("inf")
+            heapq.heappush(active, (end_key, seq, item))
+
+    # Orders scheduled to finish after their due date
+    for item in items:
+        if (
+            item.kind == TimelineItemKindEnum.WORK_ORDER
+            and item.due_date
+            and (item.end is None or item.end > item.due_date)
+            and item.status != WorkOrderStatus.COMPLETED.value
+        ):
+            conflicts.append(TimelineConflict(
+                type=ConflictTypeEnum.PAST_DUE,
+                machine_id=item.machine_id,
+                item_ids=[item.id],
+                overlap_start=item.due_date,
+                overlap_end=item.end
+            ))
+
+    return conflicts
+
+
+@router.get("/timeline", response_model=TimelineResponse)
+async def get_timeline(
+    start: datetime,
+    end: datetime,
+    machine_ids: Optional[List[str]] = Query(default=None),
+    include_work_orders: bool = True,
+    include_maintenance: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Get every work order and maintenance task overlapping a time window.
+
+    - **start** / **end**: Visible window of the Gantt chart
+    - **machine_ids**: Restrict to these machines (repeat the parameter)
+
+    Both lookups are range-overlap (&&) scans on GiST indexes, so the cost
+    grows with the number of bars in the window rather than the table size.
+    """
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > MAX_WINDOW:
+        raise HTTPException(status_code=400, detail=f"Window may not exceed {MAX_WINDOW.days} days")
+
+    window = func.tstzrange(start, end, "[]")
+    items = []
+
+    if include_work_orders:
+        query = db.query(WorkOrder).filter(
+            WorkOrder.start_date.isnot(None),
+            work_order_period().op("&&")(window),
+            WorkOrder.status != WorkOrderStatus.CANCELLED.value
+        )
+        if machine_ids:
+            query = query.filter(WorkOrder.machine_id.in_(machine_ids))
+
+        for order in query.all():
+            order_end = order.end_date or order.due_date
+            items.append(TimelineItem(
+                kind=TimelineItemKindEnum.WORK_ORDER,
+                id=order.id,
+                machine_id=order.machine_id,
+                title=f"{order.customer} - {order.product}",
+                status=order.status.value,
+                start=order.start_date,
+                end=max(order.start_date, order_end) if order_end else None,
+                due_date=order.due_date,
+                priority=order.priority.value if order.priority else None
+            ))
+
+    if include_maintenance:
+        query = db.query(MaintenanceTask).filter(
+            MaintenanceTask.scheduled_start.isnot(None),
+            maintenance_task_period().op("&&")(window),
+            MaintenanceTask.status != MaintenanceStatus.CANCELLED.value
+        )
+        if machine_ids:
+            query = query.filter(MaintenanceTask.machine_id.in_(machine_ids))
+
+        for task in query.all():
+            task_end = task.scheduled_end
+            items.append(TimelineItem(
+                kind=TimelineItemKindEnum.MAINTENANCE,
+                id=task.id,
+                machine_id=task.machine_id,
+                title=task.title,
+                status=task.status.value,
+                start=task.scheduled_start,
+                end=max(task.scheduled_start, task_end) if task_end else None,
+                priority=str(task.priority)
+            ))
+
+    items.sort(key=lambda i: (i.machine_id, i.start))
+
+    return TimelineResponse(
+        window_start=start,
+        window_end=end,
+        machine_ids=machine_ids,
+        items=items,
+        conflicts=_detect_conflicts(items)
+    )
@@ -0,0 +1,38 @@
+"""
+Search API Router - One search box across records
+"""
+import time
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.schemas import SearchEntityEnum, SearchResponse
+from app.services import search as search_service
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search_all(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[SearchEntityEnum]] = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Search work orders, maintenance tasks (including description, root
+    cause, resolution and notes), downtime logs, machines, employees and
+    plants.
+
+    - **q**: words are matched as prefixes; with 3+ characters also as a
+      substring and with typo tolerance. Arabic spelling variants (hamza,
+      ta marbuta, alef maksura, diacritics, the "ال" article) are treated as equal.
+    - **types**: restrict to some record types (repeat the parameter)
+
+    Hits are ordered by rank, best first.
+    """
+    started = time.perf_counter()
+    hits = search_service.search(db, q, types or list(SearchEntityEnum), limit)
+    return SearchResponse(query=q, hits=hits, took_ms=round((time.perf_counter() - started) * 1000, 2))
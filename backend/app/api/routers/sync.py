@@ -0,0 +1,50 @@
+"""
+Sync API Router - Offline-first batch sync for shop-floor terminals
+"""
+from datetime import datetime
+
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.schemas import SyncBatchRequest, SyncBatchResponse, SyncEntryTypeEnum
+from app.services import batch_sync
+from app.services.alert_engine import alert_engine
+from app.services.dashboard_snapshot import dashboard_snapshot
+from app.services.telemetry_ingest import reading_row
+from app.services.telemetry_ring import telemetry_rings
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+
+@router.post("/batch", response_model=SyncBatchResponse)
+async def sync_batch(batch: SyncBatchRequest, db: Session = Depends(get_db)):
+    """
+    Apply entries a terminal queued while offline.
+
+    - **entries**: production logs, downtime logs, quality checks and scrap
+      entries, each with a client-generated **idempotency_key**
+
+    The batch is committed as one transaction and the response has one
+    result per entry, in request order. Entries already applied (e.g. a
+    retried batch) come back as **duplicate** with the original record id,
+    so the terminal can safely resend until it gets a response.
+    """
+    response, created = batch_sync.apply_batch(db, batch.entries, batch.terminal_id)
+
+    logs = created.get(SyncEntryTypeEnum.PRODUCTION_LOG, [])
+    if logs:
+        received_at = datetime.utcnow()
+        rows = [reading_row(payload, received_at) for _, _, payload in logs]
+        telemetry_rings.record(rows)
+        alert_engine.readings(rows)
+    checked = {payload.machine_id for _, _, payload in created.get(SyncEntryTypeEnum.QUALITY_CHECK, [])}
+    if checked:
+        db.close()  # The quality rule uses sessions of its own, off the event loop
+        for machine_id in checked:
+            await run_in_threadpool(alert_engine.quality_check, machine_id)
+    if created.keys() & {SyncEntryTypeEnum.QUALITY_CHECK, SyncEntryTypeEnum.SCRAP_ENTRY}:
+        dashboard_snapshot.invalidate()
+
+    return response
@@ -0,0 +1,124 @@
+"""
+System API Router - Runtime diagnostics
+"""
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query
+from sqlalchemy.orm import Session
+
+from app.core.profiling import profile_stats, token_matches
+from app.core.security import ensure_admin, oauth2_scheme, require_admin
+from app.core.singleflight import single_flight
+from app.core.slow_queries import slow_query_log
+from app.core.tracing import span_exporter
+from app.db import engine, get_db
+from app.db.pool import pool_stats
+from app.services.alert_engine import alert_engine
+from app.services.telemetry_ingest import ingest_buffer
+from app.services.telemetry_listener import telemetry_listener
+from app.services.telemetry_ring import telemetry_rings
+
+router = APIRouter(prefix="/system", tags=["System"])
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats():
+    """
+    Connection pool state and checkout latency for this worker process.
+
+    - **checked_out** / **overflow**: connections in use now, and how many of them exceed pool_size
+    - **timeouts**: requests that found the pool exhausted for timeout_s
+    - **wait_ms**: time to get a connection from the pool (incl. opening new ones)
+    - **checkout_ms**: wait plus the pre-ping; **hold_ms**: checkout to checkin
+    """
+    return pool_stats.snapshot(engine.pool)
+
+
+@router.get("/slow-queries", dependencies=[Depends(require_admin)])
+async def get_slow_queries(limit: int = Query(50, ge=1, le=500)):
+    """
+    Statements slower than SLOW_QUERY_MS in this worker, grouped by normalized text. Administrators only.
+
+    - **statements**: the `limit` most expensive by total time, with counts per route and the last parameters
+    - **plans**: EXPLAIN (ANALYZE, BUFFERS) output captured for runs slower than explain_threshold_ms;
+      plain EXPLAIN (`analyzed: false`) for locking or data-modifying statements
+    """
+    return slow_query_log.snapshot(limit)
+
+
+def require_profile_access(
+    x_profile: Optional[str] = Header(None),
+    token: Optional[str] = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    """Dependency: the profiling token in X-Profile (as for profiled requests), or an administrator."""
+    if not token_matches(x_profile):
+        ensure_admin(db, token)
+
+
+@router.get("/profiles", dependencies=[Depends(require_profile_access)])
+async def get_profiles(
+    route: Optional[str] = Query(None, description='Method and route template, e.g. "GET /api/quality/scrap/summary"'),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Sampled CPU time of profiled requests, per route. Needs the X-Profile token or an administrator.
+
+    - **functions**: the `limit` functions with most self time, averaged per profiled request
+    - **recent**: the latest saved profiles (pyinstrument HTML, tracemalloc diff)
+    """
+    return profile_stats.snapshot(route, limit)
+
+
+@router.get("/traces")
+async def get_traces(
+    trace_id: Optional[str] = Query(None, description="Return all spans of this trace"),
+    name: Optional[str] = Query(None, description='Root span name, e.g. "PUT /api/maintenance/tasks/{task_id}"'),
+    min_ms: float = Query(0.0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """
+    Traces kept in this worker's span buffer.
+
+    - without **trace_id**: the latest root spans (requests and background jobs), newest first
+    - with **trace_id**: every buffered span of that trace in start order; parent_id links the tree
+    """
+    if trace_id:
+        return {"trace_id": trace_id, "spans": span_exporter.trace(trace_id)}
+    return {**span_exporter.stats, "traces": span_exporter.traces(limit, name, min_ms)}
+
+
+@router.get("/single-flight")
+async def get_single_flight_stats():
+    """
+    Request coalescing counters per route.
+
+    - **requests**: calls received
+    - **executions**: computations actually run against the database
+    - **coalesced**: calls that shared another call's in-flight computation
+    """
+    return single_flight.snapshot()
+
+
+@router.get("/ingest")
+async def get_ingest_stats():
+    """Telemetry ingest buffer counters, queue depth and last flush timing."""
+    return ingest_buffer.snapshot()
+
+
+@router.get("/telemetry-listener")
+async def get_telemetry_listener_stats():
+    """UDP line-protocol listener counters, including parse errors by reason."""
+    return telemetry_listener.snapshot()
+
+
+@router.get("/telemetry-rings")
+async def get_telemetry_ring_stats():
+    """Live-chart ring buffers: machines tracked, fixed bytes per machine and total memory."""
+    return telemetry_rings.memory()
+
+
+@router.get("/alerts")
+async def get_alert_engine_stats():
+    """Alert engine counters (raised, repeats, suppressed by cooldown, resolved) and open alerts by rule."""
+    return alert_engine.snapshot()
@@ -1,10 +1,11 @@
 
 import os
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Saudi Cable Company Dashboard"
+    APP_VERSION: str = "1.0.0"
     API_V1_STR: str = "/api"
     
     # CORS
@@ -27,9 +28,100 @@ class Settings(BaseSettings):
             
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    # Connection pool (per worker process)
+    WEB_CONCURRENCY: int = 1  # Worker processes (uvicorn reads the same variable for --workers)
+    DB_MAX_CONNECTIONS: int = 60  # Shared by all workers; keep below the server's max_connections
+    DB_POOL_SIZE: int = 0  # Kept-open connections per worker, 0 = half of the worker's share
+    DB_POOL_TIMEOUT: float = 10.0  # Seconds to wait for a free connection before failing the request
+    DB_POOL_RECYCLE: int = 1800  # Reopen connections older than this (seconds)
+    DB_POOL_SLOW_CHECKOUT_MS: float = 100.0  # Checkouts slower than this are logged with the pool state
+    DB_CONNECT_TIMEOUT: int = 5  # Seconds
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 = no limit
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 60000  # Server closes sessions left idle inside a transaction
+
+    # Slow query log
+    SLOW_QUERY_MS: float = 250.0  # Statements slower than this are logged and tracked, 0 = off
+    SLOW_QUERY_EXPLAIN_MS: float = 1000.0  # Re-run slower SELECTs under EXPLAIN (ANALYZE, BUFFERS), 0 = never
+    SLOW_QUERY_EXPLAIN_INTERVAL: float = 600.0  # Seconds before the same statement is explained again
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 60000  # statement_timeout of the EXPLAIN run
+    SLOW_QUERY_MAX_STATEMENTS: int = 200  # Distinct slow statements tracked in memory
+    SLOW_QUERY_MAX_PLANS: int = 50  # Plans kept (the slowest ones)
+
+    # Request profiling
+    PROFILE_TOKEN: str = ""  # Requests sending it in X-Profile are profiled, empty = header disabled
+    PROFILE_SAMPLE_RATE: float = 0.0  # Share of all requests profiled at random
+    PROFILE_INTERVAL_MS: float = 1.0  # CPU sampling interval
+    PROFILE_MEMORY: bool = True  # Also trace allocations (tracemalloc) while a profile runs
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 500  # Older saved profiles are deleted
+
+    # Tracing
+    TRACE_SAMPLE_RATE: float = 0.01  # Share of requests and background jobs traced, 0 = off (also for traceparent)
+    TRACE_BUFFER_SPANS: int = 20000  # Finished spans kept in memory for /system/traces
+    TRACE_FILE: str = ""  # JSON-lines file spans are appended to, empty = memory only
+    TRACE_FLUSH_INTERVAL: float = 1.0  # Seconds between writes to TRACE_FILE
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-this-in-prod")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 1 week
 
+    # Plant calendar
+    PLANT_TIMEZONE: str = "Asia/Riyadh"
+    SHIFT_START_HOURS: List[int] = [6, 14, 22]  # Morning, evening, night; the first one starts the production day
+    WEEK_START_DAY: int = 5  # Saturday (Monday = 0)
+    WEEKEND_DAYS: List[int] = [4]  # Friday: no planned production
+    CALENDAR_PAST_DAYS: int = 400  # production_calendar rows kept filled around today
+    CALENDAR_FUTURE_DAYS: int = 400
+
+    # Dashboard overview snapshot (seconds)
+    DASHBOARD_SNAPSHOT_INTERVAL: float = 30.0
+    DASHBOARD_SNAPSHOT_DEBOUNCE: float = 1.0  # Delay after a write so bursts rebuild once
+    DASHBOARD_SNAPSHOT_WARMUP_SECONDS: float = 60.0  # Rebuild this long before a shift change
+
+    # Telemetry ingest buffer
+    TELEMETRY_QUEUE_SIZE: int = 50000  # Readings held in memory before senders get 503
+    TELEMETRY_FLUSH_INTERVAL_MS: int = 200
+    TELEMETRY_FLUSH_MAX_ROWS: int = 2000
+    TELEMETRY_RING_SIZE: int = 3600  # Latest readings kept in memory per machine for live charts
+    TELEMETRY_UDP_ENABLED: bool = False  # Line-protocol listener for PLC gateways
+    TELEMETRY_UDP_HOST: str = "0.0.0.0"
+    TELEMETRY_UDP_PORT: int = 8094
+    TELEMETRY_UDP_RECEIVE_BUFFER: int = 4 * 1024 * 1024  # SO_RCVBUF bytes (capped by net.core.rmem_max)
+
+    # HTTP caching
+    REFERENCE_CACHE_MAX_AGE: int = 24 * 3600  # Cache-Control max-age (seconds) of static reference data
+
+    # Chart downsampling
+    CHART_MAX_POINTS: int = 5000  # Upper bound of ?max_points on time-series endpoints
+    CHART_FETCH_CHUNK: int = 20000  # Rows per server-side cursor fetch while downsampling
+
+    # Offline batch sync
+    SYNC_RECENT_KEYS: int = 100000  # Idempotency keys remembered in memory
+
+    # Alert rules
+    ALERT_TEMPERATURE_LIMITS: Dict[str, float] = {  # Degrees C by machine type
+        "drawing": 60.0, "bunching": 60.0, "stranding": 60.0, "armoring": 60.0,
+        "rewinding": 50.0, "storage": 40.0,
+        "extrusion": 220.0, "jacketing": 200.0, "processing": 200.0, "cv-line": 350.0
+    }
+    ALERT_TEMPERATURE_DEFAULT_LIMIT: float = 60.0
+    ALERT_TEMPERATURE_HYSTERESIS: float = 5.0  # Clears only this far below the limit
+    ALERT_SPEED_MIN_RATIO: float = 0.8  # Of target speed, while running
+    ALERT_SPEED_LOW_MINUTES: float = 10.0  # How long speed must stay low before alerting
+    ALERT_QUALITY_FAILURE_STREAK: int = 3  # Consecutive failed checks
+    ALERT_COOLDOWN_MINUTES: float = 15.0  # A cleared alert cannot re-open sooner
+    ALERT_TOUCH_INTERVAL: float = 60.0  # Seconds between last_seen updates of a repeating alert
+    ALERT_SWEEP_INTERVAL: float = 60.0  # Seconds between overdue maintenance checks and open-alert reloads
+
+    # Scrap valuation
+    LME_COPPER_PRICE: float = 8500.0  # USD per tonne
+
+    # Capacity simulation
+    SIMULATION_MAX_WORKERS: int = 0  # Process pool size, 0 = one per CPU
+    SIMULATION_MAX_REPLICATIONS: int = 10000
+
 settings = Settings()
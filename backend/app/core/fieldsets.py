@@ -0,0 +1,79 @@
+"""
+Sparse Fieldsets
+
+List endpoints accept ?fields=id,name to return only some fields of their
+response schema:
+
+- parse_fields() validates the requested names against the schema;
+- load_only_fields() narrows the SQL SELECT to the matching columns, the
+  others are never loaded; fields without a column (computed or filled in
+  by the schema) are left to the handler and the schema;
+- sparse_response() serializes just those fields through a partial copy of
+  the schema, so values are encoded exactly as in the full response.
+"""
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import Query as SQLQuery, load_only
+
+FIELDS_QUERY = Query(
+    default=None,
+    description="Comma-separated response fields to return, e.g. `id,name`; all fields when omitted"
+)
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """Requested field names in order, or None for the full response."""
+    if not fields:
+        return None
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(schema.model_fields)}"
+        )
+    return names or None
+
+
+def load_only_fields(query: SQLQuery, model, fields: Iterable[str]) -> SQLQuery:
+    """
+    Load only the columns behind the given fields, plus the primary key.
+
+    Fields without a column (operator_name etc.) select nothing themselves;
+    when only those are requested, the primary key alone is loaded.
+    """
+    mapper = inspect(model)
+    columns = mapper.column_attrs.keys()
+    keys = [mapper.get_property_by_column(column).key for column in mapper.primary_key]
+    keys += [name for name in fields if name in columns and name not in keys]
+    return query.options(load_only(*(getattr(model, key) for key in keys)))
+
+
+@lru_cache(maxsize=256)
+def _partial_list(schema: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    partial = create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    )
+    return TypeAdapter(List[partial])
+
+
+def sparse_response(rows, schema: Type[BaseModel], fields: Tuple[str, ...], response: Response) -> Response:
+    """
+    JSON list of rows (ORM objects or dicts) with only the given fields.
+
+    Headers already set on the endpoint's injected `response` (ETag etc.)
+    are carried over, since FastAPI does not merge them into a returned
+    Response.
+    """
+    adapter = _partial_list(schema, fields)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+        media_type="application/json",
+        headers=dict(response.headers)
+    )
@@ -0,0 +1,110 @@
+"""
+Tabular Response Formats
+
+Time-series endpoints negotiate their format from the Accept header:
+
+- application/json (default): the usual array of objects;
+- application/vnd.columnar+json: {"count": n, "columns": {field: [values]}},
+  one array per field instead of repeating the keys on every row;
+- application/vnd.apache.arrow.stream: an Arrow IPC stream with one record
+  batch. NumPy columns (e.g. the telemetry ring buffers) are wrapped without
+  copying. Needs pyarrow; without it Arrow requests get 406.
+
+Endpoints take `media_type: str = Depends(negotiate)`, build their rows as
+usual and hand them to tabular_response() for the non-default formats.
+"""
+from enum import Enum
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Type
+
+import numpy as np
+import orjson
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.columnar+json"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+TABULAR_FORMATS = (COLUMNAR_JSON, ARROW_STREAM)
+
+
+def negotiate(request: Request, response: Response) -> str:
+    """Dependency: the supported Accept media type with the highest q-value (JSON by default)."""
+    response.headers["Vary"] = "Accept"
+    best, best_q = JSON, 0.0
+    for part in request.headers.get("accept", "").split(","):
+        media_type, *params = (piece.strip() for piece in part.split(";"))
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type in TABULAR_FORMATS and q > best_q:
+            best, best_q = media_type, q
+        elif media_type in (JSON, "application/*", "*/*") and q > best_q:
+            best, best_q = JSON, q
+    return best
+
+
+def to_columns(rows: Iterable[Any], fields: Sequence[str], schema: Optional[Type[BaseModel]] = None) -> Dict[str, list]:
+    """
+    Transpose rows (dicts or objects) into one list per field.
+
+    With the response schema, fields the rows do not have (e.g. operator_name
+    on ORM objects) take the schema default, as in the JSON response.
+    """
+    rows = list(rows)
+    if rows and isinstance(rows[0], Mapping):
+        return {name: [row[name] for row in rows] for name in fields}
+    if schema is None:
+        return {name: [getattr(row, name) for row in rows] for name in fields}
+    columns = {}
+    for name in fields:
+        default = schema.model_fields[name].get_default(call_default_factory=True)
+        columns[name] = [getattr(row, name, default) for row in rows]
+    return columns
+
+
+def _arrow_array(pa, values):
+    if isinstance(values, np.ndarray):
+        return pa.array(values)  # Zero-copy for numeric arrays
+    if any(isinstance(value, Enum) for value in values):
+        values = [value.value if isinstance(value, Enum) else value for value in values]
+    return pa.array(values)
+
+
+def arrow_ipc(columns: Dict[str, Any], metadata: Optional[Dict[str, str]] = None) -> bytes:
+    """Encode columns as an Arrow IPC stream."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=406, detail=f"{ARROW_STREAM} is not available on this server")
+
+    table = pa.table({name: _arrow_array(pa, values) for name, values in columns.items()}, metadata=metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def columnar_json(columns: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> bytes:
+    count = len(next(iter(columns.values()))) if columns else 0
+    return orjson.dumps(
+        {**(extra or {}), "count": count, "columns": columns},
+        option=orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+def tabular_response(media_type: str, columns: Dict[str, Any], extra: Optional[Dict[str, Any]] = None) -> Response:
+    """
+    Columns in a negotiated tabular format. `extra` holds scalar context
+    (e.g. machine_id): top-level keys in columnar JSON, schema metadata in Arrow.
+    """
+    if media_type == ARROW_STREAM:
+        metadata = {key: str(value) for key, value in (extra or {}).items()}
+        content = arrow_ipc(columns, metadata or None)
+    else:
+        content = columnar_json(columns, extra)
+    return Response(content=content, media_type=media_type, headers={"Vary": "Accept"})
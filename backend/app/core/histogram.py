@@ -0,0 +1,51 @@
+"""
+Latency Histograms
+
+Fixed-bucket histograms for diagnostics endpoints. Observations may come
+from any thread (threadpool handlers, background flushers), so updates take
+a lock; a snapshot lists cumulative counts per upper bound, the way
+Prometheus histograms are exposed.
+"""
+import threading
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their count, sum and maximum."""
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)  # Last one is +Inf
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            if value > self._max:
+                self._max = value
+
+    def read(self) -> Tuple[List[int], float, float]:
+        """(cumulative count per bound, the last one being +Inf), sum and max."""
+        with self._lock:
+            counts, total, peak = list(self._counts), self._sum, self._max
+        return list(accumulate(counts)), total, peak
+
+    def snapshot(self) -> Dict:
+        cumulative, total, peak = self.read()
+        buckets = {str(bound): count for bound, count in zip((*self.bounds, "+Inf"), cumulative)}
+        return {
+            "count": cumulative[-1],
+            "sum": round(total, 3),
+            "avg": round(total / cumulative[-1], 3) if cumulative[-1] else 0.0,
+            "max": round(peak, 3),
+            "buckets": buckets
+        }
@@ -0,0 +1,110 @@
+"""
+Conditional GET (ETag / Last-Modified)
+
+Collection endpoints declare which tables their response is built from:
+
+    @router.get("", dependencies=[conditional("machines", "employees")])
+
+The dependency reads those tables' rows in collection_versions (bumped by a
+trigger on every committed write, see app.models.version) and turns them
+into ETag and Last-Modified headers. When the client's If-None-Match (or,
+without it, If-Modified-Since) still matches, the request ends with 304
+after that one primary-key lookup, before the endpoint runs its query.
+
+Constant reference data uses static() instead: an ETag of the content and a
+long public Cache-Control.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+from app.core import tracing
+from app.core.config import settings
+from app.db import get_db
+from app.models import CollectionVersion, VERSIONED_TABLES
+
+# Clients may keep a copy but must revalidate it before use
+REVALIDATE = "no-cache"
+
+
+def make_etag(content: bytes) -> str:
+    return f'W/"{hashlib.blake2b(content, digest_size=8).hexdigest()}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match (RFC 9110 13.1.2)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def _not_modified_since(request: Request, last_modified: Optional[datetime]) -> bool:
+    header = request.headers.get("if-modified-since")
+    if not header or last_modified is None or "if-none-match" in request.headers:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole seconds
+    return last_modified.replace(microsecond=0) <= since
+
+
+def not_modified(request: Request, headers: Dict[str, str], last_modified: Optional[datetime] = None) -> bool:
+    """Whether the client's cached copy identified by headers["ETag"] is still current."""
+    fresh = _etag_matches(request, headers["ETag"]) or _not_modified_since(request, last_modified)
+    tracing.add_event("cache.hit" if fresh else "cache.miss", cache="http")
+    return fresh
+
+
+def _answer(request: Request, response: Response, headers: Dict[str, str], last_modified: Optional[datetime] = None):
+    if not_modified(request, headers, last_modified):
+        raise HTTPException(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+
+def conditional(*tables: str):
+    """Route dependency: ETag / Last-Modified from the versions of the given tables."""
+    unknown = set(tables) - set(VERSIONED_TABLES)
+    if unknown:
+        raise ValueError(f"Tables without a collection_version trigger: {sorted(unknown)}")
+
+    def dependency(request: Request, response: Response, db: Session = Depends(get_db)):
+        rows = db.query(CollectionVersion.name, CollectionVersion.version, CollectionVersion.changed_at).filter(
+            CollectionVersion.name.in_(tables)
+        ).all()
+        versions = {name: (version, changed_at) for name, version, changed_at in rows}
+
+        stamp = "|".join(f"{table}:{versions.get(table, (0, None))[0]}" for table in tables)
+        last_modified = max((changed_at for _, changed_at in versions.values()), default=None)
+
+        headers = {"ETag": make_etag(stamp.encode()), "Cache-Control": REVALIDATE}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+        _answer(request, response, headers, last_modified)
+
+    return Depends(dependency)
+
+
+def static(content: Any, max_age: int = settings.REFERENCE_CACHE_MAX_AGE):
+    """Route dependency for constant responses: ETag of the content and a long Cache-Control."""
+    headers = {
+        "ETag": make_etag(orjson.dumps(content)),
+        "Cache-Control": f"public, max-age={max_age}"
+    }
+
+    def dependency(request: Request, response: Response):
+        _answer(request, response, headers)
+
+    return Depends(dependency)
@@ -0,0 +1,276 @@
+"""
+Prometheus Metrics
+
+Request metrics are kept in process and rendered in the Prometheus text
+format by GET /metrics, so a local scrape (or curl) needs no collector:
+
+- MetricsMiddleware, a plain ASGI middleware, times every HTTP request and
+  counts its response bytes, labelled by method and route template
+  (`/api/machines/{machine_id}`, never the raw path, so the number of
+  series stays bounded);
+- SQL time is summed per request through engine events and a context
+  variable; the threadpool copies the context into worker threads, so
+  statements run there are counted too.
+
+Histograms are fixed-bucket (app.core.histogram): an observation is a
+bisect and a locked increment. The router adds pool, ingest and process
+memory figures with the gauge() / counter() / histogram() helpers.
+"""
+import math
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+from app.core.histogram import LATENCY_BUCKETS_MS, Histogram
+from app.db.database import engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Response adds the charset
+
+SIZE_BUCKETS_BYTES = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# Route label of requests that matched no route (404s of arbitrary paths)
+UNMATCHED = "<unmatched>"
+
+
+# ============== Exposition ==============
+
+def resident_memory_bytes() -> Optional[int]:
+    """Resident set size of this process, None where /proc is not available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _header(lines: List[str], name: str, kind: str, documentation: str):
+    lines.append(f"# HELP {name} {documentation}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def gauge(lines: List[str], name: str, documentation: str, value: float):
+    _header(lines, name, "gauge", documentation)
+    lines.append(f"{name} {_number(value)}")
+
+
+def counter(lines: List[str], name: str, documentation: str, value: float):
+    _header(lines, name, "counter", documentation)
+    lines.append(f"{name} {_number(value)}")
+
+
+def _histogram_samples(lines: List[str], name: str, histogram: Histogram, divisor: float,
+                       names: Sequence[str] = (), values: Sequence[str] = ()):
+    cumulative, total, _ = histogram.read()
+    for bound, count in zip((*histogram.bounds, math.inf), cumulative):
+        le = _number(bound / divisor if not math.isinf(bound) else bound)
+        lines.append(f"{name}_bucket{_labels(names, values, le=le)} {count}")
+    lines.append(f"{name}_sum{_labels(names, values)} {_number(total / divisor)}")
+    lines.append(f"{name}_count{_labels(names, values)} {cumulative[-1]}")
+
+
+def histogram(lines: List[str], name: str, documentation: str, histogram: Histogram, divisor: float = 1.0):
+    """One unlabelled histogram; observations are divided by divisor (1000 for ms -> seconds)."""
+    _header(lines, name, "histogram", documentation)
+    _histogram_samples(lines, name, histogram, divisor)
+
+
+class HistogramFamily:
+    """Histograms of one metric, one per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 bounds: Sequence[float], divisor: float = 1.0):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(bounds)
+        self.divisor = divisor
+        self._children: Dict[Tuple[str, ...], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.bounds))
+        return child
+
+    def render(self, lines: List[str]):
+        _header(lines, self.name, "histogram", self.documentation)
+        with self._lock:
+            children = sorted(self._children.items())
+        for values, child in children:
+            _histogram_samples(lines, self.name, child, self.divisor, self.labelnames, values)
+
+
+class CounterFamily:
+    """Counters of one metric, one per combination of label values."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values: str, amount: int = 1):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self, lines: List[str]):
+        _header(lines, self.name, "counter", self.documentation)
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {value}")
+
+
+# ============== Request metrics ==============
+
+class _RequestDB:
+    """SQL time of one request, shared with the threads it runs statements in."""
+    __slots__ = ("scope", "seconds", "statements")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.seconds = 0.0
+        self.statements = 0
+
+
+_request_db: ContextVar[Optional[_RequestDB]] = ContextVar("request_db", default=None)
+
+_templates: Optional[Dict] = None  # Endpoint function -> route path
+
+
+def route_of(scope) -> str:
+    """Route template of a request, once the router has matched it."""
+    global _templates
+    endpoint = scope.get("endpoint")  # Set by the router once a route matched
+    if endpoint is None:
+        return UNMATCHED
+    if _templates is None:
+        templates = {}
+        for route in scope["app"].routes:
+            templates.setdefault(getattr(route, "endpoint", None), route.path)
+        _templates = templates
+    return _templates.get(endpoint, UNMATCHED)
+
+
+def current_route() -> Optional[str]:
+    """Method and route template of the current request ("GET /api/machines/{machine_id}"), None outside one."""
+    request_db = _request_db.get()
+    if request_db is None:
+        return None
+    return f"{request_db.scope['method']} {route_of(request_db.scope)}"
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _request_db.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    request_db = _request_db.get()
+    started = getattr(context, "_metrics_started", None)
+    if request_db is not None and started is not None:
+        request_db.seconds += time.perf_counter() - started
+        request_db.statements += 1
+
+
+class RequestMetrics:
+    """Per-route request metrics of this worker process."""
+
+    def __init__(self):
+        route_labels = ("method", "route")
+        self.in_flight = 0  # Only changed on the event loop
+        self.requests = CounterFamily(
+            "http_requests_total", "HTTP requests by method, route template and status code.",
+            (*route_labels, "status")
+        )
+        self.duration = HistogramFamily(
+            "http_request_duration_seconds", "Time from receiving a request to the end of its response.",
+            route_labels, LATENCY_BUCKETS_MS, divisor=1000
+        )
+        self.response_size = HistogramFamily(
+            "http_response_size_bytes", "Response body size.", route_labels, SIZE_BUCKETS_BYTES
+        )
+        self.db_time = HistogramFamily(
+            "http_request_db_seconds", "Time spent executing SQL statements per request.",
+            route_labels, LATENCY_BUCKETS_MS, divisor=1000
+        )
+        self.db_statements = CounterFamily(
+            "http_request_db_statements_total", "SQL statements executed while serving requests.", route_labels
+        )
+
+    def observe(self, method: str, route: str, status: int, seconds: float, size: int, request_db: _RequestDB):
+        self.requests.inc(method, route, str(status))
+        self.duration.labels(method, route).observe(seconds * 1000)
+        self.response_size.labels(method, route).observe(size)
+        self.db_time.labels(method, route).observe(request_db.seconds * 1000)
+        if request_db.statements:
+            self.db_statements.inc(method, route, amount=request_db.statements)
+
+    def render(self, lines: List[str]):
+        gauge(lines, "http_requests_in_flight", "Requests being served right now.", self.in_flight)
+        for family in (self.requests, self.duration, self.response_size, self.db_time, self.db_statements):
+            family.render(lines)
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding request_metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        response = {"status": 500, "size": 0}  # 500 unless the app starts a response
+
+        async def send_with_metrics(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        request_db = _RequestDB(scope)
+        token = _request_db.set(request_db)
+        request_metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            request_metrics.in_flight -= 1
+            _request_db.reset(token)
+            request_metrics.observe(
+                scope["method"], route_of(scope), response["status"],
+                time.perf_counter() - started, response["size"], request_db
+            )
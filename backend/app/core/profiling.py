@@ -0,0 +1,223 @@
+"""
+Request Profiling
+
+Profiles single requests in a running server, without redeploying:
+
+- a request carrying `X-Profile: <PROFILE_TOKEN>` is profiled, and so is a
+  random PROFILE_SAMPLE_RATE share of all requests;
+- CPU time is sampled by pyinstrument every PROFILE_INTERVAL_MS on the event
+  loop thread, in async mode, so time spent awaiting shows up as such and
+  other requests interleaving on the loop are left out;
+- with PROFILE_MEMORY, tracemalloc traces allocations for the duration of
+  the request; the snapshot diff lists the lines that allocated what was
+  still alive at the end, plus the peak. Tracing is process-wide and slows
+  every request while it runs, so keep sampling rates low.
+
+Each profile is saved under PROFILE_DIR as `<time>_<method>_<route>_<id>.html`
+(and `.memory.txt`); the response names it in X-Profile-Id. One request per
+worker is profiled at a time, others run unprofiled meanwhile. Self and
+inclusive time per function are added up per route template and served by
+GET /system/profiles, to administrators and to clients sending the token.
+"""
+import contextlib
+import hmac
+import logging
+import os
+import random
+import re
+import threading
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import route_of
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"x-profile"
+
+MEMORY_TOP_LINES = 30
+
+
+def token_matches(value: Optional[str]) -> bool:
+    """Whether an X-Profile value is PROFILE_TOKEN, compared in constant time; never while the token is unset."""
+    if not settings.PROFILE_TOKEN or value is None:
+        return False
+    return hmac.compare_digest(value.encode("latin-1", "replace"), settings.PROFILE_TOKEN.encode())
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_") or "root"
+
+
+class ProfileStats:
+    """Functions' sampled CPU time added up per route across profiled requests."""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict] = {}
+        self._recent: List[Dict] = []  # Latest saved profiles, newest last
+        self._lock = threading.Lock()
+        self.stats = {"profiled": 0, "skipped_busy": 0, "save_errors": 0}
+
+    def add(self, route: str, session, record: Dict):
+        functions: Dict[tuple, List[float]] = {}
+
+        def walk(frame, on_stack: frozenset):
+            key = (frame.function, frame.file_path_short, frame.line_no)
+            totals = functions.setdefault(key, [0.0, 0.0])
+            totals[0] += frame.total_self_time
+            if key not in on_stack:  # Recursion counts once towards inclusive time
+                totals[1] += frame.time
+            for child in frame.children:
+                if not child.is_synthetic:
+                    walk(child, on_stack | {key})
+
+        root = session.root_frame()
+        if root is not None:
+            walk(root, frozenset())
+
+        with self._lock:
+            entry = self._routes.setdefault(route, {"requests": 0, "seconds": 0.0, "functions": {}})
+            entry["requests"] += 1
+            entry["seconds"] += session.duration
+            for key, (self_time, total_time) in functions.items():
+                totals = entry["functions"].setdefault(key, [0.0, 0.0])
+                totals[0] += self_time
+                totals[1] += total_time
+            self._recent.append(record)
+            del self._recent[:-50]
+
+    def count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def snapshot(self, route: Optional[str] = None, limit: int = 20) -> Dict:
+        with self._lock:
+            routes = {}
+            for name, entry in self._routes.items():
+                if route is not None and name != route:
+                    continue
+                top = sorted(entry["functions"].items(), key=lambda item: item[1][0], reverse=True)[:limit]
+                routes[name] = {
+                    "requests": entry["requests"],
+                    "avg_ms": round(entry["seconds"] / entry["requests"] * 1000, 2),
+                    "functions": [
+                        {
+                            "function": function, "location": f"{path}:{line}" if line else path,
+                            "self_ms_per_request": round(self_time / entry["requests"] * 1000, 3),
+                            "total_ms_per_request": round(total_time / entry["requests"] * 1000, 3)
+                        }
+                        for (function, path, line), (self_time, total_time) in top
+                    ]
+                }
+            return {**self.stats, "routes": routes, "recent": list(reversed(self._recent))}
+
+
+profile_stats = ProfileStats()
+
+
+def _save(path: str, session, memory: Optional[str]):
+    from pyinstrument.renderers import HTMLRenderer
+
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    with open(path + ".html", "w", encoding="utf-8") as f:
+        f.write(HTMLRenderer().render(session))
+    if memory is not None:
+        with open(path + ".memory.txt", "w", encoding="utf-8") as f:
+            f.write(memory)
+
+    # Names start with the time, so they sort oldest first
+    saved = sorted(entry.name for entry in os.scandir(settings.PROFILE_DIR) if entry.name.endswith(".html"))
+    for name in saved[:-settings.PROFILE_MAX_FILES]:
+        stem = os.path.join(settings.PROFILE_DIR, name[:-len(".html")])
+        for suffix in (".html", ".memory.txt"):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(stem + suffix)
+
+
+def _memory_report(before, after, peak: int, route: str) -> str:
+    import pyinstrument
+
+    # Leave out the profilers' own allocations (the sampler's stack records)
+    ignore = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, os.path.join(os.path.dirname(pyinstrument.__file__), "*"))
+    ]
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    lines = [f"{route}: peak {peak / 1024:.1f} KiB traced during the request", ""]
+    lines += [str(stat) for stat in diff[:MEMORY_TOP_LINES]]
+    return "\n".join(lines) + "\n"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that ask for it or are sampled."""
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False  # Only changed on the event loop
+
+    def _wanted(self, scope) -> bool:
+        if settings.PROFILE_TOKEN:
+            for name, value in scope["headers"]:
+                if name == HEADER and token_matches(value.decode("latin-1")):
+                    return True
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._busy:
+            profile_stats.count("skipped_busy")
+            await self.app(scope, receive, send)
+            return
+
+        from pyinstrument import Profiler
+
+        started_at = datetime.now(timezone.utc)
+        profile_id = uuid.uuid4().hex[:12]
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        self._busy = True
+        memory = settings.PROFILE_MEMORY and not tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+        profiler = Profiler(interval=settings.PROFILE_INTERVAL_MS / 1000, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            session = profiler.stop()
+            report = None
+            template = route_of(scope)
+            route = f"{scope['method']} {template}"
+            if memory:
+                after = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                report = _memory_report(before, after, peak, route)
+            self._busy = False
+
+            name = f"{started_at:%Y%m%dT%H%M%S}_{scope['method']}_{_slug(template)}_{profile_id}"
+            path = os.path.join(settings.PROFILE_DIR, name)
+            record = {
+                "id": profile_id, "route": route, "started_at": started_at,
+                "duration_ms": round(session.duration * 1000, 2), "file": path + ".html",
+                "memory_file": path + ".memory.txt" if report is not None else None
+            }
+            profile_stats.count("profiled")
+            profile_stats.add(route, session, record)
+            try:
+                await run_in_threadpool(_save, path, session, report)
+            except OSError as exc:
+                profile_stats.count("save_errors")
+                logger.warning("Could not save profile %s: %s", path, exc)
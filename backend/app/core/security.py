@@ -1,14 +1,22 @@
 
 from datetime import datetime, timedelta
 from typing import Optional, Union, Any
-from jose import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.db.database import get_db
+from app.models.user import User, UserRole
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
+# Bearer token of POST /api/auth/login; optional here, so endpoints can accept other credentials too
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
+
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -24,3 +32,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def user_from_token(db: Session, token: Optional[str]) -> User:
+    """The active user a bearer token was issued to; 401 otherwise."""
+    unauthorized = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Not authenticated",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if not token:
+        raise unauthorized
+    try:
+        username = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        raise unauthorized
+    user = db.query(User).filter(User.username == username).first() if username else None
+    if user is None or not user.is_active:
+        raise unauthorized
+    return user
+
+def ensure_admin(db: Session, token: Optional[str]) -> User:
+    """The administrator a bearer token was issued to; 401 without a valid token, 403 for other roles."""
+    user = user_from_token(db, token)
+    if user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Administrator role required")
+    return user
+
+def require_admin(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    """Dependency: only administrators get through."""
+    return ensure_admin(db, token)
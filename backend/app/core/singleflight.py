@@ -0,0 +1,70 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent calls with the same key share one in-flight computation: the
+first caller starts it in the threadpool, later callers await the same task
+and receive the same result (or exception). Once it finishes the key is
+released, so the next call computes fresh data; nothing is cached.
+
+The computation runs as its own task with its own DB session, so a client
+disconnecting does not cancel the work other callers are waiting on.
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import tracing
+from app.db.database import with_session
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls keyed by (route, *normalized params)."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    async def run(self, key: Tuple, fn: Callable, *args) -> Any:
+        """Run fn(*args) in the threadpool unless an identical call is in flight."""
+        stats = self.stats.setdefault(key[0], {"requests": 0, "executions": 0, "coalesced": 0})
+        stats["requests"] += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            stats["executions"] += 1
+            task = asyncio.ensure_future(run_in_threadpool(fn, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._release(key, t))
+        else:
+            stats["coalesced"] += 1
+            tracing.add_event("singleflight.coalesced", route=key[0])
+
+        return await asyncio.shield(task)
+
+    async def run_with_session(self, key: Tuple, fn: Callable, *args) -> Any:
+        """Like run(), but calls fn(db, *args) with a session owned by the shared task."""
+        return await self.run(key, with_session, fn, *args)
+
+    def _release(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so an error nobody awaited is not logged twice
+            logger.debug("Single-flight call %s failed: %r", key[0], task.exception())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-route counters plus the number of computations in flight."""
+        routes = {}
+        for route, stats in self.stats.items():
+            routes[route] = {
+                **stats,
+                "coalesced_ratio": round(stats["coalesced"] / stats["requests"], 4) if stats["requests"] else 0.0
+            }
+        return {"in_flight": len(self._inflight), "routes": routes}
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,195 @@
+"""
+Slow Query Log
+
+Engine events time every statement; those slower than SLOW_QUERY_MS are
+logged with their normalized text, parameters, duration and the route of the
+request that ran them (app.core.metrics.current_route), and aggregated per
+normalized statement: expanded IN lists, multi-row VALUES and literals are
+folded, so the same query with other arguments counts as one.
+
+SELECTs slower than SLOW_QUERY_EXPLAIN_MS are run again, with the same
+parameters, under EXPLAIN (ANALYZE, BUFFERS) on a background thread and a
+connection of its own, inside a transaction that is rolled back. ANALYZE
+really executes the statement, so statements where that has effects beyond
+the rolled-back transaction or holds locks others wait on (FOR UPDATE / FOR
+SHARE, data-modifying CTEs, sequence calls) only get a plain EXPLAIN. A
+statement is explained at most once per SLOW_QUERY_EXPLAIN_INTERVAL and the
+slowest SLOW_QUERY_MAX_PLANS plans are kept. GET /system/slow-queries
+(administrators only: it shows statement parameters) serves both.
+
+Statements through raw psycopg2 cursors (the named cursors of chart series)
+bypass engine events and are not seen here.
+"""
+import logging
+import re
+import reprlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.metrics import current_route
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\(\s*%\(\w+\)s(?:\s*,\s*%\(\w+\)s)*\s*\)")
+_REPEATED_LISTS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+# Row locks, data-modifying CTEs and sequence calls: EXPLAIN ANALYZE would take the locks again or change state
+_NOT_ANALYZABLE = re.compile(
+    r"\bFOR\s+(?:UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)\b|\b(?:INSERT|UPDATE|DELETE|MERGE)\b"
+    r"|\b(?:nextval|setval)\s*\(",
+    re.IGNORECASE
+)
+
+_params_repr = reprlib.Repr()
+_params_repr.maxstring = 80
+_params_repr.maxother = 80
+_params_repr.maxdict = 20
+_params_repr.maxlist = 10
+
+
+def normalize(statement: str) -> str:
+    """Statement text with literals and parameter lists folded, the key of the slow query table."""
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("(...)", statement)
+    statement = _REPEATED_LISTS.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _describe_parameters(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    return _params_repr.repr(parameters)
+
+
+class SlowQueryLog:
+    """Slow statements of this worker process, and the plans captured for the worst of them."""
+
+    def __init__(self):
+        self._statements: Dict[str, Dict] = {}
+        self._plans: Dict[str, Dict] = {}
+        self._explained_at: Dict[str, float] = {}  # Monotonic time the statement was last queued
+        self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self._lock = threading.Lock()
+        self.stats = {"slow": 0, "explained": 0, "explain_errors": 0}
+
+    def record(self, statement: str, parameters, executemany: bool, elapsed_ms: float):
+        fingerprint = normalize(statement)
+        route = current_route()
+        described = _describe_parameters(parameters, executemany)
+        logger.warning("Slow query (%.0f ms, %s): %s -- parameters %s", elapsed_ms, route or "background",
+                       fingerprint, described)
+
+        with self._lock:
+            self.stats["slow"] += 1
+            entry = self._statements.get(fingerprint)
+            if entry is None:
+                if len(self._statements) >= settings.SLOW_QUERY_MAX_STATEMENTS:
+                    cheapest = min(self._statements, key=lambda key: self._statements[key]["total_ms"])
+                    del self._statements[cheapest]
+                    self._explained_at.pop(cheapest, None)
+                entry = self._statements[fingerprint] = {
+                    "statement": fingerprint, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "routes": {}
+                }
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["routes"][route or "background"] = entry["routes"].get(route or "background", 0) + 1
+            entry["last_ms"] = elapsed_ms
+            entry["last_parameters"] = described
+            entry["last_seen"] = datetime.now(timezone.utc)
+
+            now = time.monotonic()
+            explained_at = self._explained_at.get(fingerprint)
+            explain = (
+                0 < settings.SLOW_QUERY_EXPLAIN_MS <= elapsed_ms
+                and not executemany and _EXPLAINABLE.match(statement) is not None
+                and (explained_at is None or now - explained_at >= settings.SLOW_QUERY_EXPLAIN_INTERVAL)
+            )
+            if explain:
+                self._explained_at[fingerprint] = now
+        if explain:
+            self._explainer.submit(self._explain, fingerprint, statement, parameters, elapsed_ms, route)
+
+    def _explain(self, fingerprint: str, statement: str, parameters, elapsed_ms: float, route: Optional[str]):
+        analyze = _NOT_ANALYZABLE.search(statement) is None
+        try:
+            # A raw DBAPI connection: its statements fire no engine events, so the EXPLAIN is not recorded itself
+            connection = engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                cursor.execute(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+                cursor.execute(("EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN ") + statement, parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                cursor.close()
+            finally:
+                connection.rollback()
+                connection.close()
+        except Exception as exc:
+            with self._lock:
+                self.stats["explain_errors"] += 1
+            logger.warning("EXPLAIN of slow query failed: %s", exc)
+            return
+
+        with self._lock:
+            self.stats["explained"] += 1
+            self._plans[fingerprint] = {
+                "statement": fingerprint,
+                "duration_ms": round(elapsed_ms, 1),
+                "route": route,
+                "parameters": _describe_parameters(parameters, False),
+                "captured_at": datetime.now(timezone.utc),
+                "analyzed": analyze,
+                "plan": plan
+            }
+            if len(self._plans) > settings.SLOW_QUERY_MAX_PLANS:
+                fastest = min(self._plans, key=lambda key: self._plans[key]["duration_ms"])
+                del self._plans[fastest]
+        logger.info("Captured plan of slow query (%.0f ms): %s", elapsed_ms, fingerprint)
+
+    def snapshot(self, limit: int = 50) -> Dict:
+        with self._lock:
+            statements = sorted(self._statements.values(), key=lambda entry: entry["total_ms"], reverse=True)
+            statements = [
+                {**entry, "total_ms": round(entry["total_ms"], 1), "max_ms": round(entry["max_ms"], 1),
+                 "last_ms": round(entry["last_ms"], 1), "routes": dict(entry["routes"])}
+                for entry in statements[:limit]
+            ]
+            plans: List[Dict] = sorted(self._plans.values(), key=lambda plan: plan["duration_ms"], reverse=True)
+            stats = dict(self.stats)
+        return {
+            "threshold_ms": settings.SLOW_QUERY_MS,
+            "explain_threshold_ms": settings.SLOW_QUERY_EXPLAIN_MS,
+            **stats,
+            "statements": statements,
+            "plans": plans
+        }
+
+
+slow_query_log = SlowQueryLog()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._slow_query_started = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_started", None)
+    if started is None or settings.SLOW_QUERY_MS <= 0:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if elapsed_ms >= settings.SLOW_QUERY_MS:
+        slow_query_log.record(statement, parameters, executemany, elapsed_ms)
@@ -0,0 +1,387 @@
+"""
+Request Tracing
+
+OpenTelemetry-shaped spans without an SDK or collector. A trace starts at a
+request (TracingMiddleware, continuing an incoming W3C `traceparent`) or at
+a background job (job()); span() opens child spans inside either. The
+current span lives in a context variable, so it follows the request into
+threadpool workers and into tasks it creates. Outside any trace, span() and
+add_event() cost one context variable lookup.
+
+Recorded automatically:
+
+- every SQL statement (db.query) and session commit (db.commit) through
+  engine and Session events;
+- cache outcomes as span events via add_event("cache.hit" / "cache.miss");
+- trace and span ids on every log record (%(trace_id)s / %(span_id)s).
+
+Responses carry X-Trace-Id and a Server-Timing header totalling the
+request's child spans by name (`db.query;dur=12.4;desc="7x"`), readable in
+the browser's network panel. Finished spans are kept in a bounded ring
+buffer (GET /system/traces) and, with TRACE_FILE set, appended to it as
+JSON lines by a background thread. TRACE_SAMPLE_RATE decides per trace
+whether it is recorded at all. A request with a `traceparent` follows the
+caller's decision instead (its sampled flag), unless TRACE_SAMPLE_RATE is 0,
+which turns tracing off.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import route_of
+from app.db.database import engine
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_CHARS = 500
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+class Span:
+    """One timed operation; times are Unix epoch nanoseconds."""
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start", "end",
+                 "attributes", "events", "status", "children")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end: Optional[int] = None
+        self.attributes = attributes
+        self.events: List[Dict] = []
+        self.status = "ok"
+        self.children: Optional[List["Span"]] = None  # Finished descendants, on trace roots only
+
+    @property
+    def is_root(self) -> bool:
+        return self.children is not None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.time_ns()) - self.start) / 1e6
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time": time.time_ns(), **attributes})
+
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "kind": self.kind, "start": self.start, "end": self.end,
+            "duration_ms": round(self.duration_ms, 3), "status": self.status,
+            "attributes": self.attributes, "events": self.events
+        }
+
+
+# (span, trace root) of the code running now
+_current: ContextVar[Optional[tuple]] = ContextVar("current_span", default=None)
+
+
+# ============== Export ==============
+
+class SpanExporter:
+    """Finished spans: a ring buffer in memory, optionally appended to TRACE_FILE."""
+
+    def __init__(self):
+        self.spans: deque = deque(maxlen=settings.TRACE_BUFFER_SPANS)
+        self._pending: List[Span] = []
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self.stats = {"traces_recorded": 0, "spans_recorded": 0, "written": 0, "write_errors": 0}
+
+    def export(self, span: Span):
+        self.spans.append(span)
+        self.stats["spans_recorded"] += 1
+        if span.is_root:
+            self.stats["traces_recorded"] += 1
+        if settings.TRACE_FILE:
+            with self._lock:
+                self._pending.append(span)
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+                    self._writer.start()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            with open(settings.TRACE_FILE, "ab") as f:
+                f.write(b"".join(orjson.dumps(span.to_dict(), default=str) + b"\n" for span in batch))
+            self.stats["written"] += len(batch)
+        except OSError as exc:
+            self.stats["write_errors"] += 1
+            logger.warning("Could not write %d spans to %s: %s", len(batch), settings.TRACE_FILE, exc)
+
+    def _write_loop(self):
+        while True:
+            time.sleep(settings.TRACE_FLUSH_INTERVAL)
+            self.flush()
+
+    def traces(self, limit: int = 50, name: Optional[str] = None, min_ms: float = 0.0) -> List[Dict]:
+        """Latest trace roots, newest first."""
+        roots = []
+        for span in reversed(self.spans):
+            if span.is_root and (name is None or span.name == name) and span.duration_ms >= min_ms:
+                roots.append({**span.to_dict(), "spans": len(span.children) + 1})
+                if len(roots) >= limit:
+                    break
+        return roots
+
+    def trace(self, trace_id: str) -> List[Dict]:
+        """All buffered spans of one trace, in start order."""
+        return [span.to_dict() for span in sorted(
+            (span for span in self.spans if span.trace_id == trace_id), key=lambda span: span.start
+        )]
+
+
+span_exporter = SpanExporter()
+
+
+def _finish(span: Span, root: Span):
+    span.end = time.time_ns()
+    if span is not root:
+        root.children.append(span)
+    span_exporter.export(span)
+
+
+# ============== API ==============
+
+def current_span() -> Optional[Span]:
+    current = _current.get()
+    return current[0] if current else None
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current[0].trace_id if current else None
+
+
+def add_event(name: str, **attributes):
+    """Attach an event (cache.hit, cache.miss, ...) to the current span, if any."""
+    current = _current.get()
+    if current is not None:
+        current[0].add_event(name, **attributes)
+
+
+@contextmanager
+def _activate(span: Span, root: Span) -> Iterator[Span]:
+    token = _current.set((span, root))
+    try:
+        yield span
+    except BaseException as exc:
+        span.status = "error"
+        span.set(error=type(exc).__name__)
+        raise
+    finally:
+        _current.reset(token)
+        _finish(span, root)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Child span of the current one; does nothing outside a trace."""
+    current = _current.get()
+    if current is None:
+        yield None
+        return
+    parent, root = current
+    with _activate(Span(name, "internal", parent.trace_id, parent.span_id, attributes), root) as child:
+        yield child
+
+
+@contextmanager
+def job(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Span of a background job: a child inside a trace (e.g. when a request runs it), else a new sampled trace."""
+    if _current.get() is not None:
+        with span(name, **attributes) as child:
+            yield child
+        return
+    if not _sampled():
+        yield None
+        return
+    root = _root(name, "job", _new_id(128), None, attributes)
+    with _activate(root, root):
+        yield root
+
+
+def _root(name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict) -> Span:
+    root = Span(name, kind, trace_id, parent_id, attributes)
+    root.children = []
+    return root
+
+
+def _enabled() -> bool:
+    return settings.TRACE_SAMPLE_RATE > 0
+
+
+def _sampled() -> bool:
+    rate = settings.TRACE_SAMPLE_RATE
+    return rate >= 1.0 or (rate > 0 and random.random() < rate)
+
+
+# ============== Database ==============
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._trace_started = time.time_ns()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    current = _current.get()
+    started = getattr(context, "_trace_started", None)
+    if current is None or started is None:
+        return
+    parent, root = current
+    query = Span("db.query", "client", parent.trace_id, parent.span_id, {
+        "db.statement": " ".join(statement[:STATEMENT_CHARS].split()),
+        "db.rows": cursor.rowcount
+    })
+    query.start = started
+    _finish(query, root)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    current = _current.get()
+    if current is not None:
+        parent, root = current
+        session.info["_trace_commit"] = (Span("db.commit", "client", parent.trace_id, parent.span_id, {}), root)
+
+
+def _end_commit(session, status: str):
+    pending = session.info.pop("_trace_commit", None)
+    if pending is not None:
+        commit, root = pending
+        commit.status = status
+        _finish(commit, root)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    _end_commit(session, "ok")
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    _end_commit(session, "error")
+
+
+# ============== Logging ==============
+
+_record_factory = logging.getLogRecordFactory()
+
+
+def _trace_record_factory(*args, **kwargs) -> logging.LogRecord:
+    record = _record_factory(*args, **kwargs)
+    current = _current.get()
+    record.trace_id = current[0].trace_id if current else "-"
+    record.span_id = current[0].span_id if current else "-"
+    return record
+
+
+logging.setLogRecordFactory(_trace_record_factory)
+
+
+# ============== Middleware ==============
+
+def _parse_traceparent(value: str) -> Optional[tuple]:
+    """(trace id, parent span id, sampled flag) of a W3C traceparent header, None if malformed."""
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 0x01)
+
+
+def server_timing(root: Span) -> str:
+    """Server-Timing value: the root's finished child spans totalled by name, plus the total so far."""
+    totals: Dict[str, List[float]] = {}
+    for child in list(root.children):
+        entry = totals.setdefault(child.name, [0.0, 0])
+        entry[0] += child.duration_ms
+        entry[1] += 1
+    caches: Dict[str, List[str]] = {}
+    for traced in [root, *list(root.children)]:
+        for recorded in traced.events:
+            if recorded["name"].startswith("cache."):
+                caches.setdefault(recorded["name"], []).append(str(recorded.get("cache", "")))
+    metrics = [f'{name};dur={total:.1f};desc="{count}x"' for name, (total, count) in totals.items()]
+    metrics += [f'{name};desc="{",".join(names)}"' for name, names in caches.items()]
+    metrics.append(f"total;dur={root.duration_ms:.1f}")
+    return ", ".join(metrics)
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span of every sampled request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id, sampled = None, None, None
+        if _enabled():
+            for name, value in scope["headers"]:
+                if name == b"traceparent":
+                    trace_id, parent_id, sampled = _parse_traceparent(value.decode("latin-1")) or (None, None, None)
+                    break
+            if sampled is None:
+                sampled = _sampled()
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        root = _root(f"{scope['method']} {scope['path']}", "server", trace_id or _new_id(128), parent_id, {
+            "http.method": scope["method"], "http.target": scope["path"]
+        })
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                root.set(**{"http.status_code": message["status"]})
+                if message["status"] >= 500:
+                    root.status = "error"
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-trace-id", root.trace_id.encode()),
+                    (b"server-timing", server_timing(root).encode("latin-1"))
+                ]
+            await send(message)
+
+        with _activate(root, root):
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                template = route_of(scope)
+                root.name = f"{scope['method']} {template}"
+                root.set(**{"http.route": template})
@@ -1,4 +1,10 @@
 from app.db.database import Base, engine, SessionLocal, get_db, init_db
-from app.db.seed import run_seed
+
+
+def run_seed(*args, **kwargs):
+    """app.db.seed.run_seed, imported on first use: the generator imports app.models, which imports app.db."""
+    from app.db.seed import run_seed as _run_seed
+    return _run_seed(*args, **kwargs)
+
 
 __all__ = ["Base", "engine", "SessionLocal", "get_db", "init_db", "run_seed"]
@@ -1,11 +1,40 @@
 
+from typing import Tuple
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool
+
+
+def pool_limits() -> Tuple[int, int]:
+    """(pool_size, max_overflow) of one worker process, from its share of DB_MAX_CONNECTIONS."""
+    share = max(settings.DB_MAX_CONNECTIONS // max(settings.WEB_CONCURRENCY, 1), 2)
+    size = min(settings.DB_POOL_SIZE or share // 2, share)
+    return size, share - size
+
+
+def _server_options() -> str:
+    options = {
+        "statement_timeout": settings.DB_STATEMENT_TIMEOUT_MS,
+        "idle_in_transaction_session_timeout": settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+    }
+    return " ".join(f"-c {name}={value}" for name, value in options.items())
+
 
 # Create SQLAlchemy engine
 # pool_pre_ping=True helps verify connections before using them
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+POOL_SIZE, MAX_OVERFLOW = pool_limits()
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_pre_ping=True,
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT, "options": _server_options()}
+)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -14,9 +43,26 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 # Dependency to get DB session
+# Sessions check out a connection only when they first run a statement, so
+# handlers that never query do not touch the pool.
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def with_session(fn, *args):
+    """Call fn(db, *args) with a session of its own, e.g. from a worker thread."""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def init_db():
+    """Create all tables that do not exist yet."""
+    import app.models  # noqa: F401 - registers every model on Base.metadata
+    Base.metadata.create_all(bind=engine)
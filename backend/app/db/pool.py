@@ -0,0 +1,112 @@
+"""
+Instrumented Connection Pool
+
+A QueuePool that times every checkout:
+
+- wait: taking a connection from the queue, including opening a new one when
+  the pool grows and blocking while all of them are checked out;
+- checkout: the whole Pool.connect(), i.e. the wait plus the pre-ping;
+- hold: from checkout to checkin, how long a request keeps its connection.
+
+Slow checkouts (DB_POOL_SLOW_CHECKOUT_MS) and pool timeouts are logged
+together with the pool state, so exhaustion under load shows up in the
+logs; every checkout is logged at DEBUG. GET /system/db-pool serves the
+counters and histograms.
+"""
+import logging
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.histogram import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Checkout counters and latency histograms of the process's pool."""
+
+    def __init__(self):
+        self.wait_ms = Histogram()
+        self.checkout_ms = Histogram()
+        self.hold_ms = Histogram()
+        self.counters = {"checkouts": 0, "timeouts": 0, "connects": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def snapshot(self, pool: QueuePool) -> Dict:
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),  # Negative while the pool has not filled up yet
+            "timeout_s": pool.timeout(),
+            **counters,
+            "wait_ms": self.wait_ms.snapshot(),
+            "checkout_ms": self.checkout_ms.snapshot(),
+            "hold_ms": self.hold_ms.snapshot()
+        }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool feeding pool_stats."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.count("timeouts")
+            logger.warning(
+                "Connection pool exhausted, no connection within %.1fs: %s", self.timeout(), self.status()
+            )
+            raise
+        finally:
+            pool_stats.wait_ms.observe((time.perf_counter() - started) * 1000)
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        pool_stats.checkout_ms.observe(elapsed_ms)
+        if elapsed_ms >= settings.DB_POOL_SLOW_CHECKOUT_MS:
+            logger.warning("Slow connection checkout (%.0f ms): %s", elapsed_ms, self.status())
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Connection checkout (%.1f ms): %s", elapsed_ms, self.status())
+        return connection
+
+
+@event.listens_for(InstrumentedQueuePool, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_stats.count("connects")
+
+
+@event.listens_for(InstrumentedQueuePool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_stats.count("checkouts")
+    connection_record.info["checked_out_at"] = time.perf_counter()
+
+
+@event.listens_for(InstrumentedQueuePool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    checked_out_at = connection_record.info.pop("checked_out_at", None)
+    if checked_out_at is not None:
+        pool_stats.hold_ms.observe((time.perf_counter() - checked_out_at) * 1000)
+
+
+@event.listens_for(InstrumentedQueuePool, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_stats.count("invalidations")
@@ -1,580 +1,757 @@
 """
-Database Seed Script
-Initial data for Saudi Cable Company Dashboard
+Synthetic Data Generator
+
+Fills the database with correlated, plausible plant data for development
+and scale testing, for any number of machines and days:
+
+- reference data: the plants, machines of every production stage in a
+  typical mix (MACHINE_MIX), one operator per machine and shift, a few
+  technicians, back-to-back work orders, preventive maintenance every
+  PM_INTERVAL_DAYS and daily workforce records;
+- one production log per machine every --interval seconds, with the
+  quality checks, downtime and scrap of the same simulated line state.
+
+Built-in correlations:
+
+- shifts and working days follow app.services.plant_calendar: nothing runs
+  on weekend days, night shifts run slower and break down more often, every
+  shift has a planned break and some shift changes start with a setup;
+- breakdowns come in bursts: each may be followed by more stops within the
+  next hour or so, with lognormal durations per downtime type; the long
+  mechanical and electrical ones also become corrective maintenance tasks;
+- after every stop the line ramps back up and warms up again; the process
+  temperature drifts slowly around its setpoint and follows the afternoon
+  heat;
+- quality checks measure diameter, insulation thickness and tensile
+  strength as functions of the temperature deviation, so failures cluster
+  when a line runs hot or cold;
+- scrap of the line's material types is booked at restarts, quality
+  rejections and shift-end trims, valued at the LME copper price.
+
+Time series are generated per machine in CHUNK_DAYS slices on a process
+pool and written with binary COPY (app.db.binary_copy), one transaction per
+slice. Secondary indexes of the event tables are dropped first and rebuilt
+in parallel at the end (unless --keep-indexes), so 200 machines x 180 days
+at the default interval (about 52M production logs) load in minutes. The
+same --seed gives the same data whatever the number of workers.
+
+    python -m app.db.seed --machines 18 --days 30
+    python -m app.db.seed --machines 200 --days 180 --workers 8 --reset
 """
-
-from datetime import datetime, timedelta
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 
+from app.core.config import settings
+from app.db.binary_copy import Categorical, column_types, copy_rows
+from app.db.database import Base
 from app.models import (
-    Plant, Machine, Employee,
-    WorkOrder, MaintenanceTask
+    DowntimeType, Employee, Machine, MachineStatus, MachineType, MaintenanceStatus, MaintenanceTask,
+    MaintenanceType, Plant, Priority, ScrapType, Shift, WorkOrder, WorkOrderStatus, WorkforceRecord
+)
+from app.services import kpi_counters, plant_calendar
+
+CHUNK_DAYS = 30
+INSERT_BATCH = 5000
+USD_TO_SAR = 3.75
+
+SHIFT_ORDER = list(Shift)
+SHIFT_SPEED = np.array([1.0, 0.97, 0.92])  # Share of target speed, by SHIFT_ORDER
+SHIFT_BREAKDOWNS = np.array([0.8, 1.0, 1.3])  # Relative breakdown rate, by SHIFT_ORDER
+
+# Planned stops
+BREAK_MINUTES = 30  # Halfway through every shift
+SETUP_PROBABILITY = 0.35  # Of a changeover at a shift change
+SETUP_MINUTES = (20, 45)
+
+# Breakdowns: (share, median minutes, reasons) per type; follow-ups per breakdown and their mean delay
+BREAKDOWNS = {
+    DowntimeType.MECHANICAL: (0.35, 35, ("Bearing failure", "Capstan slip", "Wire break", "Gearbox noise")),
+    DowntimeType.ELECTRICAL: (0.20, 20, ("Drive trip", "Sensor fault", "PLC fault")),
+    DowntimeType.MATERIAL: (0.20, 12, ("Waiting for material", "Empty payoff bobbin")),
+    DowntimeType.QUALITY: (0.15, 15, ("Diameter adjustment", "Die change after defect")),
+    DowntimeType.OTHER: (0.10, 10, ("Operator called away", "Housekeeping")),
+}
+BREAKDOWN_SIGMA = 0.8
+BURST_FOLLOWUPS = 0.8
+BURST_DELAY_MINUTES = 40.0
+CORRECTIVE_MINUTES = 90  # Mechanical / electrical stops at least this long get a maintenance task
+
+# Line dynamics
+WARMUP_MINUTES = 8.0  # Time constant of ramp-up and warm-up after a stop
+SPEED_NOISE = 0.02
+DRIFT_MINUTES = 180.0  # Correlation time of the process temperature drift
+AMBIENT_MEAN_C = 35.0
+AMBIENT_SWING_C = 7.0  # Peak at 15:00 plant time
+AMBIENT_GAIN = 0.3  # Process degrees per ambient degree
+
+# Quality checks
+QUALITY_EVERY_MINUTES = 30
+DIAMETER_PER_DEGREE = 0.0012  # Relative diameter change per degree off the setpoint
+DIAMETER_TOLERANCE = 0.01
+THICKNESS_PER_DEGREE = 0.004
+TENSILE_PER_DEGREE = 0.003
+DEFECTS = [None, "Diameter out of tolerance", "Insulation too thin", "Spark test failure",
+           "Low tensile strength", "Surface defect"]
+
+PM_INTERVAL_DAYS = 28
+
+
+@dataclass(frozen=True)
+class LineProfile:
+    """Nominal figures of one machine type."""
+    prefix: str
+    label: str
+    area: str
+    plants: Tuple[str, ...]
+    target_speed: float  # m/min
+    setpoint: float  # Process temperature, °C
+    pressure: Optional[float]  # Bar at target speed; None where not measured
+    kg_per_meter: float
+    diameter: float  # mm
+    insulation: Optional[float]  # Insulation / sheath thickness in mm; None for bare conductor
+    tensile: float  # MPa
+    breakdowns_per_day: float
+    startup_scrap_kg: float
+    scrap: Tuple[Tuple[ScrapType, str, float], ...]  # (type, code, copper %); the first is the line's own
+
+
+PROFILES = {
+    MachineType.DRAWING: LineProfile(
+        "BD", "Rod breakdown", "Drawing", ("PCP-1", "PCP-2", "PCP-3"), 600, 45, None, 0.0223, 1.78, None, 240, 1.2,
+        6.0, ((ScrapType.COPPER_WIRE, "SC-001", 93), (ScrapType.COPPER_WIRE, "SC-002", 85))
+    ),
+    MachineType.BUNCHING: LineProfile(
+        "BN", "Buncher", "Stranding", ("PCP-1", "PCP-2"), 250, 40, None, 0.045, 2.9, None, 230, 0.8,
+        4.0, ((ScrapType.COPPER_WIRE, "SC-002", 85),)
+    ),
+    MachineType.STRANDING: LineProfile(
+        "ST", "Strander", "Stranding", ("PCP-1", "PCP-2", "PCP-3"), 60, 40, None, 0.45, 8.1, None, 230, 0.7,
+        12.0, ((ScrapType.COPPER_WIRE, "SC-001", 93), (ScrapType.MIXED_CABLE, "SC-020", 45))
+    ),
+    MachineType.EXTRUSION: LineProfile(
+        "XT", "Extrusion line", "Extrusion", ("PCP-1", "PCP-2", "PCP-3", "PVC-REEL"), 300, 175, 180, 0.04, 3.0, 0.8,
+        220, 1.5, 5.0, ((ScrapType.PVC_COMPOUND, "SC-010", 0), (ScrapType.INSULATED_COPPER, "SC-030", 70))
+    ),
+    MachineType.CV_LINE: LineProfile(
+        "CV", "CV line", "CV Line", ("CV-LINE",), 25, 210, 250, 1.2, 22.0, 3.4, 200, 0.6,
+        40.0, ((ScrapType.INSULATED_COPPER, "SC-031", 75), (ScrapType.MIXED_CABLE, "SC-021", 55))
+    ),
+    MachineType.ARMORING: LineProfile(
+        "AR", "Armoring line", "Armoring", ("CV-LINE", "PVC-REEL"), 15, 40, None, 2.8, 32.0, None, 350, 0.5,
+        30.0, ((ScrapType.STEEL_ARMOR, "SC-050", 0), (ScrapType.MIXED_CABLE, "SC-020", 45))
+    ),
+    MachineType.JACKETING: LineProfile(
+        "JK", "Sheathing line", "Jacketing", ("CV-LINE", "PVC-REEL"), 40, 165, 150, 2.2, 36.0, 2.0, 210, 0.9,
+        25.0, ((ScrapType.PVC_COMPOUND, "SC-011", 0), (ScrapType.MIXED_CABLE, "SC-020", 45))
+    ),
+    MachineType.REWINDING: LineProfile(
+        "RW", "Rewinder", "Reeling", ("PVC-REEL",), 200, 35, None, 1.0, 20.0, None, 200, 0.4,
+        8.0, ((ScrapType.MIXED_CABLE, "SC-020", 45),)
+    ),
+}
+
+# Machine n gets MACHINE_MIX[n % 16]: roughly the proportions of a cable plant
+MACHINE_MIX = [
+    MachineType.DRAWING, MachineType.EXTRUSION, MachineType.BUNCHING, MachineType.EXTRUSION,
+    MachineType.STRANDING, MachineType.DRAWING, MachineType.JACKETING, MachineType.EXTRUSION,
+    MachineType.CV_LINE, MachineType.DRAWING, MachineType.BUNCHING, MachineType.EXTRUSION,
+    MachineType.ARMORING, MachineType.STRANDING, MachineType.JACKETING, MachineType.REWINDING,
+]
+
+PLANTS = [
+    {"id": "PCP-1", "name": "PCP-1 Drawing Plant", "name_ar": "مصنع السحب PCP-1",
+     "description": "Wire drawing and stranding plant", "design_capacity_mt": 15000.0},
+    {"id": "PCP-2", "name": "PCP-2 Drawing Plant", "name_ar": "مصنع السحب PCP-2",
+     "description": "Wire drawing and stranding plant", "design_capacity_mt": 13500.0},
+    {"id": "PCP-3", "name": "PCP-3 Drawing Plant", "name_ar": "مصنع السحب PCP-3",
+     "description": "Wire drawing and stranding plant", "design_capacity_mt": 12000.0},
+    {"id": "CV-LINE", "name": "CV Line", "name_ar": "خط CV",
+     "description": "Cross-linked polyethylene insulation line", "design_capacity_mt": 9000.0},
+    {"id": "PVC-REEL", "name": "PVC & Reel Plant", "name_ar": "مصنع PVC والبكرات",
+     "description": "PVC insulation and cable reeling", "design_capacity_mt": 10500.0},
+]
+
+FIRST_NAMES = [("Ahmed", "أحمد"), ("Mohammed", "محمد"), ("Khalid", "خالد"), ("Faisal", "فيصل"), ("Omar", "عمر"),
+               ("Saad", "سعد"), ("Abdullah", "عبدالله"), ("Nasser", "ناصر"), ("Turki", "تركي"), ("Majed", "ماجد")]
+LAST_NAMES = [("Al-Rashid", "الراشد"), ("Hassan", "حسن"), ("Ibrahim", "إبراهيم"), ("Al-Otaibi", "العتيبي"),
+              ("Al-Ghamdi", "الغامدي"), ("Al-Mutairi", "المطيري"), ("Al-Qahtani", "القحطاني"),
+              ("Al-Harbi", "الحربي"), ("Al-Shehri", "الشهري"), ("Al-Dossari", "الدوسري")]
+
+CUSTOMERS = ["Riyadh Contracting", "Eastern Province Utilities", "Jeddah Developers", "Gulf Power Projects",
+             "Northern Grid Company", "Al Kharj Industrial City", "Red Sea Construction", "Dammam Housing"]
+PRODUCTS = [("1.5mm² Building Wire", "BW-1.5"), ("2.5mm² Building Wire", "BW-2.5"), ("4mm² Building Wire", "BW-4.0"),
+            ("10mm² Power Cable", "PC-10"), ("16mm² Power Cable", "PC-16"), ("3x240mm² 33kV XLPE Cable", "MV-240")]
+COLORS = ["White", "Red", "Blue", "Black", "Yellow", "Green"]
+
+BULK_TABLES = {
+    "production_logs": ["machine_id", "operator_id", "shift", "timestamp", "speed", "target_speed", "temperature",
+                        "pressure", "output_length", "output_weight", "created_at"],
+    "downtime_logs": ["machine_id", "operator_id", "shift", "timestamp", "downtime_type", "duration_minutes",
+                      "reason", "is_planned", "created_at"],
+    "quality_checks": ["machine_id", "operator_id", "shift", "timestamp", "diameter", "diameter_tolerance",
+                       "thickness", "spark_test_passed", "tensile_test_passed", "tensile_strength",
+                       "visual_inspection_passed", "defect_type", "passed", "created_at"],
+    "scrap_entries": ["machine_id", "operator_id", "shift", "timestamp", "scrap_type", "scrap_code", "weight_kg",
+                      "copper_content_percent", "aluminum_content_percent", "lme_price_used",
+                      "financial_value_usd", "financial_value_sar", "reason", "created_at"],
+}
+
+RESET_TABLES = (
+    "production_logs", "downtime_logs", "quality_checks", "scrap_entries", "emulsion_logs", "maintenance_tasks",
+    "work_orders", "workforce_records", "alerts", "kpi_counters", "machines", "employees", "plants"
 )
 
 
-def seed_plants(db: Session):
-    """Seed initial plant data."""
-    plants = [
-        Plant(
-            name="PCP-1 Drawing Plant",
-            name_ar="مصنع السحب PCP-1",
-            code="PCP-1",
-            description="Wire drawing and stranding plant",
-            capacity_tons_per_day=50.0,
-            is_active=True
-        ),
-        Plant(
-            name="PCP-2 Drawing Plant",
-            name_ar="مصنع السحب PCP-2",
-            code="PCP-2",
-            description="Wire drawing and stranding plant",
-            capacity_tons_per_day=45.0,
-            is_active=True
-        ),
-        Plant(
-            name="PCP-3 Drawing Plant",
-            name_ar="مصنع السحب PCP-3",
-            code="PCP-3",
-            description="Wire drawing and stranding plant",
-            capacity_tons_per_day=40.0,
-            is_active=True
-        ),
-        Plant(
-            name="CV Line",
-            name_ar="خط CV",
-            code="CV-LINE",
-            description="Cross-linked polyethylene insulation line",
-            capacity_tons_per_day=30.0,
-            is_active=True
-        ),
-        Plant(
-            name="PVC & Reel Plant",
-            name_ar="مصنع PVC والبكرات",
-            code="PVC-REEL",
-            description="PVC insulation and cable reeling",
-            capacity_tons_per_day=35.0,
-            is_active=True
-        ),
+def _bulk_engine() -> Engine:
+    """Engine without the app's pool and statement timeout, for COPY and index builds."""
+    return create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+
+# ============== Time series ==============
+
+@dataclass(frozen=True)
+class Slice:
+    """Consecutive readings of one machine, generated and written as a unit."""
+    machine_id: str
+    machine_type: MachineType
+    operators: Tuple[int, int, int]  # Employee ids by SHIFT_ORDER
+    start: np.datetime64  # First reading, UTC
+    readings: int
+    interval: int  # Seconds between readings
+    seed: int
+    last: bool  # The machine's latest slice
+
+
+def _ar1(rng: np.random.Generator, n: int, minutes: float, correlation_minutes: float, std: float) -> np.ndarray:
+    """Stationary AR(1) noise with the given correlation time and standard deviation."""
+    phi = math.exp(-minutes / correlation_minutes)
+    shocks = rng.normal(0, std * math.sqrt(1 - phi * phi), n)
+    shocks[0] = rng.normal(0, std)
+    return pd.Series(shocks / (1 - phi)).ewm(alpha=1 - phi, adjust=False).mean().to_numpy()
+
+
+def _covered(n: int, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Mask of the readings inside any [start, start + length) interval."""
+    edges = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(edges, np.minimum(starts, n), 1)
+    np.add.at(edges, np.minimum(starts + lengths, n), -1)
+    return np.cumsum(edges[:-1]) > 0
+
+
+def _stops(piece: Slice, profile: LineProfile, rng: np.random.Generator, shift: np.ndarray,
+           working: np.ndarray, minutes: float) -> Dict[str, np.ndarray]:
+    """Planned stops and bursty breakdowns of a slice, sorted and without overlaps."""
+    n = piece.readings
+    changes = np.flatnonzero(np.diff(shift) != 0) + 1
+    changes = changes[working[changes]]
+    setups = changes[rng.random(len(changes)) < SETUP_PROBABILITY]
+    breaks = changes + int(4 * 60 / minutes) - int(BREAK_MINUTES / 2 / minutes)
+    breaks = breaks[breaks < n]
+
+    # Breakdowns: thinned by shift, each followed by a Poisson number of follow-ups
+    peak = SHIFT_BREAKDOWNS.max()
+    first = rng.uniform(0, n, rng.poisson(profile.breakdowns_per_day * peak * n * minutes / 1440)).astype(np.int64)
+    first = first[rng.random(len(first)) < SHIFT_BREAKDOWNS[shift[first]] / peak]
+    followups = rng.poisson(BURST_FOLLOWUPS, len(first))
+    later = np.repeat(first, followups) + rng.exponential(BURST_DELAY_MINUTES / minutes, followups.sum()).astype(np.int64)
+    breakdowns = np.concatenate([first, later])
+    breakdowns = breakdowns[breakdowns < n]
+    breakdowns = breakdowns[working[breakdowns]]
+
+    types = list(BREAKDOWNS)
+    shares = np.array([BREAKDOWNS[kind][0] for kind in types])
+    kinds = rng.choice(len(types), size=len(breakdowns), p=shares / shares.sum())
+    medians = np.array([BREAKDOWNS[kind][1] for kind in types], dtype=float)[kinds]
+    reason_lists = [BREAKDOWNS[kind][2] for kind in types]
+    reasons = [reason_lists[kind][rng.integers(len(reason_lists[kind]))] for kind in kinds]
+
+    stops = pd.DataFrame({
+        "start": np.concatenate([setups, breaks, breakdowns]),
+        "minutes": np.concatenate([
+            rng.uniform(*SETUP_MINUTES, len(setups)), np.full(len(breaks), float(BREAK_MINUTES)),
+            rng.lognormal(np.log(medians), BREAKDOWN_SIGMA)
+        ]),
+        "type": [DowntimeType.SETUP.name] * len(setups) + [DowntimeType.BREAK.name] * len(breaks)
+                + [types[kind].name for kind in kinds],
+        "reason": ["Product changeover"] * len(setups) + ["Shift break"] * len(breaks) + reasons,
+        "planned": np.concatenate([np.ones(len(setups) + len(breaks), bool), np.zeros(len(breakdowns), bool)]),
+    }).sort_values("start", kind="stable")
+    stops["length"] = np.maximum(1, np.ceil(stops["minutes"] / minutes)).astype(np.int64)
+
+    # A stop starting while the line is already down is part of the earlier one
+    keep, down_until = [], -1
+    for start, length in zip(stops["start"].to_numpy(), stops["length"].to_numpy()):
+        keep.append(start >= down_until)
+        if keep[-1]:
+            down_until = start + length
+    return {name: column.to_numpy() for name, column in stops[np.array(keep, dtype=bool)].items()}
+
+
+def generate_slice(piece: Slice) -> Dict:
+    """Table data of one slice: {"tables": {table: (columns, rows)}, "breakdowns": [...], "state": {...}}."""
+    rng = np.random.default_rng(piece.seed)
+    profile = PROFILES[piece.machine_type]
+    n, minutes = piece.readings, piece.interval / 60
+    timestamps = piece.start + np.arange(n) * np.timedelta64(piece.interval, "s")
+
+    calendar = plant_calendar.bucketize(timestamps)
+    shift = pd.Categorical(calendar["shift"], categories=[s.value for s in SHIFT_ORDER]).codes.astype(np.int64)
+    working = calendar["working_day"].to_numpy()
+    local = pd.DatetimeIndex(timestamps, tz="UTC").tz_convert(settings.PLANT_TIMEZONE)
+    hour = local.hour.to_numpy() + local.minute.to_numpy() / 60
+
+    stops = _stops(piece, profile, rng, shift, working, minutes)
+    down = _covered(n, stops["start"], stops["length"])
+    running = working & ~down
+    warmth = pd.Series(running.astype(float)).ewm(
+        alpha=1 - math.exp(-minutes / WARMUP_MINUTES), adjust=False
+    ).mean().to_numpy()
+
+    speed = profile.target_speed * SHIFT_SPEED[shift] * warmth * (1 + _ar1(rng, n, minutes, 20, SPEED_NOISE))
+    speed = np.where(running, np.maximum(speed, 0), 0.0)
+    ambient = AMBIENT_MEAN_C + AMBIENT_SWING_C * np.cos(2 * np.pi * (hour - 15) / 24)
+    process = profile.setpoint + _ar1(rng, n, minutes, DRIFT_MINUTES, 3.0) + AMBIENT_GAIN * (ambient - AMBIENT_MEAN_C)
+    temperature = ambient + (process - ambient) * warmth
+    if profile.pressure is None:
+        pressure = np.full(n, np.nan)
+    else:
+        pressure = profile.pressure * (0.3 + 0.7 * speed / profile.target_speed) * (1 + rng.normal(0, 0.02, n))
+    length = speed * minutes
+
+    operators = np.array(piece.operators)
+    shift_names = [s.name for s in SHIFT_ORDER]
+
+    def common(index: np.ndarray) -> Dict:
+        return {
+            "machine_id": Categorical.constant(piece.machine_id, len(index)),
+            "operator_id": operators[shift[index]],
+            "shift": Categorical(shift_names, shift[index]),
+            "timestamp": timestamps[index],
+            "created_at": timestamps[index],
+        }
+
+    everything = np.arange(n)
+    logs = {
+        **common(everything), "speed": speed.round(2), "target_speed": np.full(n, float(profile.target_speed)),
+        "temperature": temperature.round(2), "pressure": pressure.round(2), "output_length": length.round(2),
+        "output_weight": (length * profile.kg_per_meter).round(3)
+    }
+
+    # Downtime
+    stop_types = [kind.name for kind in DowntimeType]
+    reason_vocabulary = sorted(set(stops["reason"]))
+    downtime = {
+        **common(stops["start"]),
+        "downtime_type": Categorical(stop_types, np.array([stop_types.index(t) for t in stops["type"]], dtype=np.int64)),
+        "duration_minutes": np.round(stops["minutes"]).astype(np.int64),
+        "reason": Categorical(reason_vocabulary, np.searchsorted(reason_vocabulary, stops["reason"])),
+        "is_planned": stops["planned"],
+    }
+
+    # Quality checks, once the line is warm
+    every = max(1, round(QUALITY_EVERY_MINUTES / minutes))
+    checks = np.arange(rng.integers(every), n, every)
+    checks = checks[running[checks] & (warmth[checks] > 0.95)]
+    m = len(checks)
+    deviation = temperature[checks] - profile.setpoint
+    diameter = profile.diameter * (1 + DIAMETER_PER_DEGREE * deviation + rng.normal(0, 0.002, m))
+    failures = [np.abs(diameter - profile.diameter) > profile.diameter * DIAMETER_TOLERANCE]
+    if profile.insulation is None:
+        thickness = np.full(m, np.nan)
+        failures += [np.zeros(m, bool), np.zeros(m, bool)]
+    else:
+        thickness = profile.insulation * (1 - THICKNESS_PER_DEGREE * deviation + rng.normal(0, 0.01, m))
+        spark_failure = 0.002 + 0.25 / (1 + np.exp(8 - np.abs(deviation)))
+        failures += [thickness < profile.insulation * 0.95, rng.random(m) < spark_failure]
+    tensile = profile.tensile * (1 - TENSILE_PER_DEGREE * deviation + rng.normal(0, 0.02, m))
+    failures += [tensile < profile.tensile * 0.95, rng.random(m) < 0.005]
+    failed = np.stack(failures, axis=1)
+    passed = ~failed.any(axis=1)
+    quality = {
+        **common(checks), "diameter": diameter.round(3),
+        "diameter_tolerance": np.full(m, round(profile.diameter * DIAMETER_TOLERANCE, 3)),
+        "thickness": thickness.round(3), "spark_test_passed": ~failed[:, 2], "tensile_test_passed": ~failed[:, 3],
+        "tensile_strength": tensile.round(1), "visual_inspection_passed": ~failed[:, 4],
+        "defect_type": Categorical(DEFECTS, np.where(passed, 0, failed.argmax(axis=1) + 1)),
+        "passed": passed,
+    }
+
+    # Scrap: at restarts after breakdowns, at rejected checks and as shift-end trim
+    restarts = (stops["start"] + stops["length"])[~stops["planned"]]
+    restarts = restarts[restarts < n]
+    trims = np.flatnonzero(np.diff(shift) != 0) + 1
+    trims = trims[working[trims]]
+    rejected = checks[~passed]
+    index = np.concatenate([restarts, rejected, trims])
+    kind = np.concatenate([
+        np.zeros(len(restarts), np.int64), np.full(len(rejected), len(profile.scrap) - 1), np.zeros(len(trims), np.int64)
+    ])
+    weight = np.concatenate([
+        rng.lognormal(np.log(profile.startup_scrap_kg), 0.5, len(restarts)),
+        rng.lognormal(np.log(profile.startup_scrap_kg * 2), 0.6, len(rejected)),
+        rng.lognormal(np.log(profile.startup_scrap_kg / 2), 0.4, len(trims)),
+    ]).round(2)
+    copper = np.array([percent for _, _, percent in profile.scrap], dtype=float)[kind]
+    value_usd = weight * copper / 100 / 1000 * settings.LME_COPPER_PRICE
+    scrap = {
+        **common(index), "scrap_type": Categorical([t.name for t, _, _ in profile.scrap], kind),
+        "scrap_code": Categorical([code for _, code, _ in profile.scrap], kind), "weight_kg": weight,
+        "copper_content_percent": copper, "aluminum_content_percent": np.zeros(len(index)),
+        "lme_price_used": np.full(len(index), settings.LME_COPPER_PRICE),
+        "financial_value_usd": value_usd.round(2), "financial_value_sar": (value_usd * USD_TO_SAR).round(2),
+        "reason": Categorical(["Startup after stop", "Quality rejection", "End of run trim"], np.concatenate([
+            np.zeros(len(restarts), np.int64), np.ones(len(rejected), np.int64), np.full(len(trims), 2)
+        ])),
+    }
+
+    long_stops = (~stops["planned"]) & (stops["minutes"] >= CORRECTIVE_MINUTES) & np.isin(
+        stops["type"], [DowntimeType.MECHANICAL.name, DowntimeType.ELECTRICAL.name]
+    )
+    breakdowns = [
+        (piece.machine_id, pd.Timestamp(timestamps[start]).to_pydatetime().replace(tzinfo=timezone.utc),
+         DowntimeType[kind_name], float(duration), reason)
+        for start, kind_name, duration, reason in zip(
+            stops["start"][long_stops], stops["type"][long_stops], stops["minutes"][long_stops],
+            stops["reason"][long_stops]
+        )
     ]
 
-    for plant in plants:
-        existing = db.query(Plant).filter(Plant.code == plant.code).first()
-        if not existing:
-            db.add(plant)
-
+    state = None
+    if piece.last:
+        day = slice(max(0, n - int(1440 / minutes)), n)
+        planned = working[day].sum()
+        recent_checks = passed[checks >= day.start]
+        availability = running[day].sum() / planned if planned else 0.0
+        performance = speed[day][running[day]].mean() / profile.target_speed if running[day].any() else 0.0
+        quality_rate = recent_checks.mean() if len(recent_checks) else 1.0
+        state = {
+            "status": MachineStatus.RUNNING if running[-1] else MachineStatus.STOPPED if down[-1] else MachineStatus.IDLE,
+            "speed": float(speed[-1].round(2)), "temperature": float(temperature[-1].round(1)),
+            "oee": float(round(min(availability * performance * quality_rate, 1.0) * 100, 1)),
+        }
+
+    return {
+        "tables": {
+            "production_logs": (logs, n), "downtime_logs": (downtime, len(stops["start"])),
+            "quality_checks": (quality, m), "scrap_entries": (scrap, len(index)),
+        },
+        "breakdowns": breakdowns,
+        "state": state,
+    }
+
+
+# Set up in every worker process by _init_worker
+_worker_connection = None
+_worker_types: Dict[str, Dict[str, str]] = {}
+
+
+def _init_worker(types: Dict[str, Dict[str, str]]):
+    global _worker_connection, _worker_types
+    _worker_connection = _bulk_engine().raw_connection()
+    cursor = _worker_connection.cursor()
+    cursor.execute("SET synchronous_commit = off")
+    cursor.close()
+    _worker_types = types
+
+
+def _load_slice(piece: Slice) -> Dict:
+    """Worker entry point: generate a slice and COPY it in one transaction."""
+    generated = generate_slice(piece)
+    rows = {}
+    for table, (data, count) in generated["tables"].items():
+        copy_rows(_worker_connection, table, _worker_types[table], data, count)
+        rows[table] = count
+    _worker_connection.commit()
+    return {"machine_id": piece.machine_id, "rows": rows, "breakdowns": generated["breakdowns"],
+            "state": generated["state"]}
+
+
+def _execute(statement: str):
+    """Worker entry point: run one statement, e.g. an index build."""
+    cursor = _worker_connection.cursor()
+    cursor.execute("SET maintenance_work_mem = '256MB'")
+    cursor.execute(statement)
+    cursor.close()
+    _worker_connection.commit()
+
+
+def _secondary_indexes(conn, table: str) -> List[Tuple[str, str]]:
+    """(name, definition) of the indexes not backing a primary key or unique constraint."""
+    return conn.execute(text(
+        "SELECT CAST(indexrelid AS regclass)::text, pg_get_indexdef(indexrelid) FROM pg_index "
+        "WHERE indrelid = CAST(:table AS regclass) AND NOT indisprimary AND NOT indisunique"
+    ), {"table": table}).all()
+
+
+# ============== Reference data ==============
+
+def _insert(db: Session, model, rows: List[Dict]):
+    for i in range(0, len(rows), INSERT_BATCH):
+        db.execute(insert(model).values(rows[i:i + INSERT_BATCH]).on_conflict_do_nothing())
+
+
+def _person(n: int) -> Tuple[str, str]:
+    first, first_ar = FIRST_NAMES[n % len(FIRST_NAMES)]
+    last, last_ar = LAST_NAMES[(n // len(FIRST_NAMES) + n) % len(LAST_NAMES)]
+    return f"{first} {last}", f"{first_ar} {last_ar}"
+
+
+def machine_specs(count: int) -> List[Tuple[str, MachineType, str, str]]:
+    """(id, type, name, plant) of the first `count` machines of the standard mix, ids like XT-3."""
+    numbers: Dict[MachineType, int] = {}
+    specs = []
+    for i in range(count):
+        machine_type = MACHINE_MIX[i % len(MACHINE_MIX)]
+        profile = PROFILES[machine_type]
+        number = numbers[machine_type] = numbers.get(machine_type, 0) + 1
+        specs.append((f"{profile.prefix}-{number}", machine_type, f"{profile.label} {number}",
+                      profile.plants[(number - 1) % len(profile.plants)]))
+    return specs
+
+
+def seed_reference(db: Session, specs, start: datetime, end: datetime, rng: np.random.Generator) -> Dict:
+    """Plants, employees, machines, work orders, preventive maintenance and workforce records."""
+    _insert(db, Plant, [{**plant, "current_capacity_mt": plant["design_capacity_mt"] * 0.8, "is_active": True}
+                        for plant in PLANTS])
+
+    employees = []
+    for i, (machine_id, machine_type, _, _) in enumerate(specs):
+        for k, shift in enumerate(SHIFT_ORDER):
+            number = i * len(SHIFT_ORDER) + k
+            name, name_ar = _person(number)
+            employees.append({
+                "employee_number": f"EMP{number + 1:05d}", "name": name, "name_ar": name_ar,
+                "department": PROFILES[machine_type].area, "position": "Operator", "shift": shift.value,
+                "is_active": True, "skill_level": int(rng.integers(1, 6))
+            })
+    technicians = []
+    for k in range(max(3, len(specs) // 6)):
+        name, name_ar = _person(len(employees) + 7 * k)
+        technicians.append(name)
+        employees.append({
+            "employee_number": f"TEC{k + 1:04d}", "name": name, "name_ar": name_ar, "department": "Maintenance",
+            "position": "Technician", "shift": SHIFT_ORDER[k % len(SHIFT_ORDER)].value, "is_active": True,
+            "skill_level": int(rng.integers(3, 6))
+        })
+    _insert(db, Employee, employees)
+    ids = dict(db.query(Employee.employee_number, Employee.id))
+    operators = {
+        machine_id: tuple(ids[f"EMP{i * len(SHIFT_ORDER) + k + 1:05d}"] for k in range(len(SHIFT_ORDER)))
+        for i, (machine_id, _, _, _) in enumerate(specs)
+    }
+
+    _insert(db, Machine, [
+        {"id": machine_id, "name": name, "area": PROFILES[machine_type].area, "type": machine_type,
+         "status": MachineStatus.IDLE, "speed": 0.0, "target_speed": PROFILES[machine_type].target_speed,
+         "temperature": AMBIENT_MEAN_C, "oee": 0.0, "operator_id": operators[machine_id][0]}
+        for machine_id, machine_type, name, _ in specs
+    ])
+
+    now = datetime.now(timezone.utc)
+    orders, tasks = [], []
+    for machine_id, machine_type, name, _ in specs:
+        profile = PROFILES[machine_type]
+        at = start - timedelta(hours=float(rng.uniform(0, 48)))
+        while at < end + timedelta(days=7):
+            hours = float(rng.uniform(12, 72))
+            finish = at + timedelta(hours=hours)
+            ordered = round(profile.target_speed * 60 * hours * 0.75, -2)
+            share = 1.0 if finish <= now else max(0.0, (now - at) / (finish - at))
+            status = (WorkOrderStatus.COMPLETED if finish <= now else
+                      WorkOrderStatus.IN_PROGRESS if at <= now else WorkOrderStatus.PENDING)
+            product, code = PRODUCTS[int(rng.integers(len(PRODUCTS)))]
+            orders.append({
+                "id": f"WO-{len(orders) + 1:06d}", "customer": CUSTOMERS[int(rng.integers(len(CUSTOMERS)))],
+                "product": product, "product_code": code, "machine_id": machine_id,
+                "priority": list(Priority)[int(rng.choice(3, p=[0.2, 0.6, 0.2]))], "status": status,
+                "progress": round(share * 100, 1), "quantity_ordered": ordered,
+                "quantity_produced": round(ordered * share), "color": COLORS[int(rng.integers(len(COLORS)))],
+                "due_date": finish + timedelta(days=2), "start_date": at,
+                "end_date": finish if status == WorkOrderStatus.COMPLETED else None
+            })
+            at = finish
+
+        at = start + timedelta(days=float(rng.uniform(0, PM_INTERVAL_DAYS)))
+        while at < end + timedelta(days=PM_INTERVAL_DAYS):
+            done = at + timedelta(hours=4) <= now
+            tasks.append({
+                "id": f"MT-{len(tasks) + 1:06d}", "machine_id": machine_id, "type": MaintenanceType.PREVENTIVE,
+                "status": MaintenanceStatus.COMPLETED if done else MaintenanceStatus.PENDING,
+                "title": f"Preventive maintenance {name}", "priority": 3,
+                "assignee": technicians[int(rng.integers(len(technicians)))], "team": "Maintenance",
+                "scheduled_start": at, "scheduled_end": at + timedelta(hours=4), "estimated_duration_hours": 4.0,
+                "actual_start": at if done else None, "actual_end": at + timedelta(hours=4) if done else None,
+                "actual_duration_hours": 4.0 if done else None, "downtime_minutes": 240 if done else 0,
+                "labor_cost": 400.0, "parts_cost": round(float(rng.uniform(100, 900)), 2),
+            })
+            tasks[-1]["total_cost"] = tasks[-1]["labor_cost"] + tasks[-1]["parts_cost"]
+            at += timedelta(days=PM_INTERVAL_DAYS)
+    _insert(db, WorkOrder, orders)
+    _insert(db, MaintenanceTask, tasks)
+
+    machines_per_plant: Dict[str, int] = {}
+    for _, _, _, plant in specs:
+        machines_per_plant[plant] = machines_per_plant.get(plant, 0) + 1
+    records = []
+    for day in range((end - start).days + 1):
+        for plant in PLANTS:
+            positions = machines_per_plant.get(plant["id"], 0) * len(SHIFT_ORDER) + 12
+            filled = int(positions * rng.uniform(0.88, 0.98))
+            records.append({
+                "plant_id": plant["id"], "date": start + timedelta(days=day), "total_positions": positions,
+                "filled_positions": filled, "vacancies": positions - filled, "morning_shift": filled * 4 // 10,
+                "evening_shift": filled * 35 // 100, "night_shift": filled - filled * 4 // 10 - filled * 35 // 100,
+                "operators": filled - 12, "technicians": 5, "supervisors": 3, "engineers": 2, "support_staff": 2,
+                "in_training": int(rng.integers(0, 4)), "certified": int((filled - 12) * 0.7)
+            })
+    _insert(db, WorkforceRecord, records)
     db.commit()
-    return db.query(Plant).all()
-
-
-def seed_machines(db: Session, plants: list):
-    """Seed initial machine data."""
-    plant_map = {p.code: p.id for p in plants}
-
-    machines = [
-        # PCP-1 Drawing Machines
-        Machine(
-            name="Bull Block 1",
-            name_ar="بول بلوك 1",
-            code="BC-1",
-            machine_type="bull_block",
-            plant_id=plant_map.get("PCP-1"),
-            area="Drawing",
-            status="running",
-            max_speed=25.0,
-            current_speed=22.5,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Bull Block 2",
-            name_ar="بول بلوك 2",
-            code="BC-2",
-            machine_type="bull_block",
-            plant_id=plant_map.get("PCP-1"),
-            area="Drawing",
-            status="running",
-            max_speed=25.0,
-            current_speed=20.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Bull Block 3",
-            name_ar="بول بلوك 3",
-            code="BC-3",
-            machine_type="bull_block",
-            plant_id=plant_map.get("PCP-1"),
-            area="Drawing",
-            status="idle",
-            max_speed=25.0,
-            target_oee=85.0
-        ),
-
-        # PCP-2 Drawing Machines
-        Machine(
-            name="Bull Block 4",
-            name_ar="بول بلوك 4",
-            code="BC-4",
-            machine_type="bull_block",
-            plant_id=plant_map.get("PCP-2"),
-            area="Drawing",
-            status="running",
-            max_speed=25.0,
-            current_speed=23.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Bull Block 5",
-            name_ar="بول بلوك 5",
-            code="BC-5",
-            machine_type="bull_block",
-            plant_id=plant_map.get("PCP-2"),
-            area="Drawing",
-            status="maintenance",
-            max_speed=25.0,
-            target_oee=85.0
-        ),
-
-        # PCP-3 Drawing Machines
-        Machine(
-            name="Bull Block 6",
-            name_ar="بول بلوك 6",
-            code="BC-6",
-            machine_type="bull_block",
-            plant_id=plant_map.get("PCP-3"),
-            area="Drawing",
-            status="running",
-            max_speed=25.0,
-            current_speed=21.0,
-            target_oee=85.0
-        ),
-
-        # Extrusion Lines
-        Machine(
-            name="Extrusion Line 1",
-            name_ar="خط البثق 1",
-            code="XT-11",
-            machine_type="extruder",
-            plant_id=plant_map.get("PCP-1"),
-            area="Extrusion",
-            status="running",
-            max_speed=100.0,
-            current_speed=85.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Extrusion Line 2",
-            name_ar="خط البثق 2",
-            code="XT-12",
-            machine_type="extruder",
-            plant_id=plant_map.get("PCP-1"),
-            area="Extrusion",
-            status="running",
-            max_speed=100.0,
-            current_speed=90.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Extrusion Line 3",
-            name_ar="خط البثق 3",
-            code="XT-13",
-            machine_type="extruder",
-            plant_id=plant_map.get("PCP-2"),
-            area="Extrusion",
-            status="idle",
-            max_speed=100.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Extrusion Line 4",
-            name_ar="خط البثق 4",
-            code="XT-14",
-            machine_type="extruder",
-            plant_id=plant_map.get("PCP-2"),
-            area="Extrusion",
-            status="running",
-            max_speed=100.0,
-            current_speed=78.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Extrusion Line 5",
-            name_ar="خط البثق 5",
-            code="XT-15",
-            machine_type="extruder",
-            plant_id=plant_map.get("PCP-3"),
-            area="Extrusion",
-            status="running",
-            max_speed=100.0,
-            current_speed=82.0,
-            target_oee=85.0
-        ),
-
-        # CV Line
-        Machine(
-            name="CV Line Main",
-            name_ar="خط CV الرئيسي",
-            code="CV-1",
-            machine_type="cv_line",
-            plant_id=plant_map.get("CV-LINE"),
-            area="CV Line",
-            status="running",
-            max_speed=50.0,
-            current_speed=45.0,
-            target_oee=90.0
-        ),
-
-        # Stranding Machines
-        Machine(
-            name="Strander 1",
-            name_ar="آلة الجدل 1",
-            code="XL-1",
-            machine_type="strander",
-            plant_id=plant_map.get("PCP-1"),
-            area="Stranding",
-            status="running",
-            max_speed=200.0,
-            current_speed=180.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Strander 2",
-            name_ar="آلة الجدل 2",
-            code="XL-2",
-            machine_type="strander",
-            plant_id=plant_map.get("PCP-2"),
-            area="Stranding",
-            status="running",
-            max_speed=200.0,
-            current_speed=175.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Strander 3",
-            name_ar="آلة الجدل 3",
-            code="XL-3",
-            machine_type="strander",
-            plant_id=plant_map.get("PCP-2"),
-            area="Stranding",
-            status="idle",
-            max_speed=200.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Strander 4",
-            name_ar="آلة الجدل 4",
-            code="XL-4",
-            machine_type="strander",
-            plant_id=plant_map.get("PCP-3"),
-            area="Stranding",
-            status="running",
-            max_speed=200.0,
-            current_speed=165.0,
-            target_oee=85.0
-        ),
-
-        # PVC & Reel
-        Machine(
-            name="PVC Line 1",
-            name_ar="خط PVC 1",
-            code="PVC-1",
-            machine_type="pvc_line",
-            plant_id=plant_map.get("PVC-REEL"),
-            area="PVC",
-            status="running",
-            max_speed=80.0,
-            current_speed=72.0,
-            target_oee=85.0
-        ),
-        Machine(
-            name="Reeling Machine 1",
-            name_ar="آلة اللف 1",
-            code="RL-1",
-            machine_type="reeler",
-            plant_id=plant_map.get("PVC-REEL"),
-            area="Reeling",
-            status="running",
-            max_speed=300.0,
-            current_speed=280.0,
-            target_oee=90.0
-        ),
+    return {"operators": operators, "technicians": technicians, "next_task": len(tasks) + 1,
+            "rows": {"plants": len(PLANTS), "employees": len(employees), "machines": len(specs),
+                     "work_orders": len(orders), "maintenance_tasks": len(tasks), "workforce_records": len(records)}}
+
+
+def _corrective_tasks(breakdowns: Sequence[tuple], technicians: List[str], first: int,
+                      rng: np.random.Generator) -> List[Dict]:
+    tasks = []
+    for k, (machine_id, at, kind, minutes, reason) in enumerate(breakdowns):
+        hours = round(minutes / 60, 2)
+        parts = round(float(rng.uniform(200, 3000)), 2)
+        tasks.append({
+            "id": f"MT-{first + k:06d}", "machine_id": machine_id,
+            "type": MaintenanceType.EMERGENCY if minutes >= 4 * CORRECTIVE_MINUTES else MaintenanceType.CORRECTIVE,
+            "status": MaintenanceStatus.COMPLETED, "title": f"Repair: {reason.lower()}",
+            "description": f"{kind.value.capitalize()} breakdown", "priority": 1 if minutes >= 240 else 2,
+            "assignee": technicians[int(rng.integers(len(technicians)))], "team": "Maintenance",
+            "scheduled_start": at, "actual_start": at, "actual_end": at + timedelta(minutes=minutes),
+            "actual_duration_hours": hours, "downtime_minutes": int(round(minutes)), "root_cause": reason,
+            "resolution": "Repaired and restarted", "labor_cost": round(hours * 100, 2), "parts_cost": parts,
+            "total_cost": round(hours * 100 + parts, 2),
+        })
+    return tasks
+
+
+# ============== Entry point ==============
+
+def run_seed(machines: int = 18, days: int = 30, interval: int = 60, workers: Optional[int] = None,
+             seed: int = 0, reset: bool = False, keep_indexes: bool = False) -> Dict[str, int]:
+    """Generate and load the data set; returns the rows written per table."""
+    engine = _bulk_engine()
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        if reset:
+            conn.execute(text(f"TRUNCATE {', '.join(RESET_TABLES)} RESTART IDENTITY CASCADE"))
+        elif conn.execute(text("SELECT EXISTS (SELECT 1 FROM production_logs)")).scalar():
+            raise SystemExit("production_logs is not empty; pass --reset to replace all data")
+        types = {table: column_types(conn, table, columns) for table, columns in BULK_TABLES.items()}
+
+    rng = np.random.default_rng(seed)
+    end = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    specs = machine_specs(machines)
+
+    with Session(bind=engine) as db:
+        reference = seed_reference(db, specs, start, end, rng)
+        plant_calendar.fill(db, plant_calendar.production_date_of(start) - timedelta(days=1),
+                            plant_calendar.production_date_of(end) + timedelta(days=2))
+    rows = dict(reference["rows"])
+    print(f"  reference data       {', '.join(f'{table} {count:,}' for table, count in rows.items())}")
+
+    per_machine = days * 86400 // interval
+    per_chunk = CHUNK_DAYS * 86400 // interval
+    origin = np.datetime64(start.replace(tzinfo=None), "s")
+    pieces = [
+        (offset, machine_id, machine_type)
+        for offset in range(0, per_machine, per_chunk) for machine_id, machine_type, _, _ in specs
     ]
-
-    for machine in machines:
-        existing = db.query(Machine).filter(Machine.code == machine.code).first()
-        if not existing:
-            db.add(machine)
-
-    db.commit()
-    return db.query(Machine).all()
-
-
-def seed_employees(db: Session, machines: list):
-    """Seed initial employee data."""
-    employees = [
-        Employee(
-            employee_number="EMP001",
-            name="Ahmed Al-Rashid",
-            name_ar="أحمد الراشد",
-            role="Operator",
-            department="Drawing",
-            shift="A"
-        ),
-        Employee(
-            employee_number="EMP002",
-            name="Mohammed Hassan",
-            name_ar="محمد حسن",
-            role="Operator",
-            department="Drawing",
-            shift="A"
-        ),
-        Employee(
-            employee_number="EMP003",
-            name="Khalid Ibrahim",
-            name_ar="خالد إبراهيم",
-            role="Supervisor",
-            department="Drawing",
-            shift="A"
-        ),
-        Employee(
-            employee_number="EMP004",
-            name="Faisal Al-Otaibi",
-            name_ar="فيصل العتيبي",
-            role="Operator",
-            department="Extrusion",
-            shift="B"
-        ),
-        Employee(
-            employee_number="EMP005",
-            name="Omar Al-Ghamdi",
-            name_ar="عمر الغامدي",
-            role="Operator",
-            department="Extrusion",
-            shift="B"
-        ),
-        Employee(
-            employee_number="EMP006",
-            name="Saad Al-Mutairi",
-            name_ar="سعد المطيري",
-            role="Technician",
-            department="Maintenance",
-            shift="A"
-        ),
-        Employee(
-            employee_number="EMP007",
-            name="Abdullah Al-Qahtani",
-            name_ar="عبدالله القحطاني",
-            role="Inspector",
-            department="Quality",
-            shift="A"
-        ),
-        Employee(
-            employee_number="EMP008",
-            name="Nasser Al-Harbi",
-            name_ar="ناصر الحربي",
-            role="Operator",
-            department="CV Line",
-            shift="A"
-        ),
-        Employee(
-            employee_number="EMP009",
-            name="Turki Al-Shehri",
-            name_ar="تركي الشهري",
-            role="Supervisor",
-            department="Maintenance",
-            shift="B"
-        ),
-        Employee(
-            employee_number="EMP010",
-            name="Majed Al-Dossari",
-            name_ar="ماجد الدوسري",
-            role="Operator",
-            department="PVC",
-            shift="C"
-        ),
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(pieces))]
+    slices = [
+        Slice(machine_id, machine_type, reference["operators"][machine_id],
+              origin + np.timedelta64(offset * interval, "s"), min(per_chunk, per_machine - offset), interval,
+              piece_seed, offset + per_chunk >= per_machine)
+        for (offset, machine_id, machine_type), piece_seed in zip(pieces, seeds)
     ]
 
-    for emp in employees:
-        existing = db.query(Employee).filter(Employee.employee_number == emp.employee_number).first()
-        if not existing:
-            db.add(emp)
-
-    db.commit()
-    return db.query(Employee).all()
-
-
-def seed_work_orders(db: Session, machines: list):
-    """Seed initial work orders."""
-    machine_map = {m.code: m.id for m in machines}
-
-    work_orders = [
-        WorkOrder(
-            order_number="WO-2024-001",
-            product_name="1.5mm² Building Wire",
-            product_code="BW-1.5",
-            machine_id=machine_map.get("XT-11"),
-            quantity_planned=5000.0,
-            quantity_completed=3500.0,
-            unit="meters",
-            status="in_progress",
-            priority="high",
-            color_code="White",
-            scheduled_start=datetime.now() - timedelta(hours=4),
-            scheduled_end=datetime.now() + timedelta(hours=4)
-        ),
-        WorkOrder(
-            order_number="WO-2024-002",
-            product_name="2.5mm² Building Wire",
-            product_code="BW-2.5",
-            machine_id=machine_map.get("XT-12"),
-            quantity_planned=8000.0,
-            quantity_completed=2000.0,
-            unit="meters",
-            status="in_progress",
-            priority="medium",
-            color_code="Red",
-            scheduled_start=datetime.now() - timedelta(hours=2),
-            scheduled_end=datetime.now() + timedelta(hours=6)
-        ),
-        WorkOrder(
-            order_number="WO-2024-003",
-            product_name="4mm² Building Wire",
-            product_code="BW-4.0",
-            machine_id=machine_map.get("XT-14"),
-            quantity_planned=6000.0,
-            quantity_completed=0.0,
-            unit="meters",
-            status="pending",
-            priority="medium",
-            color_code="Blue",
-            scheduled_start=datetime.now() + timedelta(hours=2),
-            scheduled_end=datetime.now() + timedelta(hours=10)
-        ),
-        WorkOrder(
-            order_number="WO-2024-004",
-            product_name="10mm² Power Cable",
-            product_code="PC-10",
-            machine_id=machine_map.get("CV-1"),
-            quantity_planned=2000.0,
-            quantity_completed=500.0,
-            unit="meters",
-            status="in_progress",
-            priority="high",
-            scheduled_start=datetime.now() - timedelta(hours=6),
-            scheduled_end=datetime.now() + timedelta(hours=6)
-        ),
-        WorkOrder(
-            order_number="WO-2024-005",
-            product_name="16mm² Power Cable",
-            product_code="PC-16",
-            machine_id=machine_map.get("CV-1"),
-            quantity_planned=3000.0,
-            status="pending",
-            priority="low",
-            scheduled_start=datetime.now() + timedelta(hours=8),
-            scheduled_end=datetime.now() + timedelta(hours=20)
-        ),
-    ]
-
-    for wo in work_orders:
-        existing = db.query(WorkOrder).filter(WorkOrder.order_number == wo.order_number).first()
-        if not existing:
-            db.add(wo)
-
-    db.commit()
-    return db.query(WorkOrder).all()
-
-
-def seed_maintenance_tasks(db: Session, machines: list, employees: list):
-    """Seed initial maintenance tasks."""
-    machine_map = {m.code: m.id for m in machines}
-    emp_map = {e.employee_number: e.id for e in employees}
-
-    tasks = [
-        MaintenanceTask(
-            task_number="MT-2024-001",
-            machine_id=machine_map.get("BC-2"),
-            maintenance_type="preventive",
-            description="Regular oil change and bearing inspection",
-            priority="medium",
-            status="in_progress",
-            assigned_to=emp_map.get("EMP006"),
-            scheduled_date=datetime.now(),
-            estimated_duration_hours=2.0
-        ),
-        MaintenanceTask(
-            task_number="MT-2024-002",
-            machine_id=machine_map.get("XT-11"),
-            maintenance_type="corrective",
-            description="Replace worn die set",
-            priority="high",
-            status="in_progress",
-            assigned_to=emp_map.get("EMP006"),
-            scheduled_date=datetime.now(),
-            estimated_duration_hours=4.0
-        ),
-        MaintenanceTask(
-            task_number="MT-2024-003",
-            machine_id=machine_map.get("XL-4"),
-            maintenance_type="predictive",
-            description="Vibration analysis indicates bearing wear",
-            priority="medium",
-            status="pending",
-            scheduled_date=datetime.now() + timedelta(days=2),
-            estimated_duration_hours=3.0
-        ),
-        MaintenanceTask(
-            task_number="MT-2024-004",
-            machine_id=machine_map.get("BC-5"),
-            maintenance_type="preventive",
-            description="Full overhaul and calibration",
-            priority="high",
-            status="in_progress",
-            assigned_to=emp_map.get("EMP009"),
-            scheduled_date=datetime.now() - timedelta(days=1),
-            estimated_duration_hours=8.0
-        ),
-    ]
-
-    for task in tasks:
-        existing = db.query(MaintenanceTask).filter(MaintenanceTask.task_number == task.task_number).first()
-        if not existing:
-            db.add(task)
-
-    db.commit()
-    return db.query(MaintenanceTask).all()
-
-
-def run_seed(db: Session):
-    """Run all seed functions."""
-    print("🌱 Seeding database...")
-
-    print("  → Seeding plants...")
-    plants = seed_plants(db)
-    print(f"    ✓ Created {len(plants)} plants")
-
-    print("  → Seeding machines...")
-    machines = seed_machines(db, plants)
-    print(f"    ✓ Created {len(machines)} machines")
-
-    print("  → Seeding employees...")
-    employees = seed_employees(db, machines)
-    print(f"    ✓ Created {len(employees)} employees")
-
-    print("  → Seeding work orders...")
-    work_orders = seed_work_orders(db, machines)
-    print(f"    ✓ Created {len(work_orders)} work orders")
-
-    print("  → Seeding maintenance tasks...")
-    tasks = seed_maintenance_tasks(db, machines, employees)
-    print(f"    ✓ Created {len(tasks)} maintenance tasks")
-
-    print("✅ Database seeding complete!")
+    indexes = []
+    if not keep_indexes:
+        with engine.begin() as conn:
+            for table in BULK_TABLES:
+                indexes += _secondary_indexes(conn, table)
+            for name, definition in indexes:
+                print(f"  dropping {name} until the load is done: {definition}")
+                conn.execute(text(f"DROP INDEX {name}"))
+
+    breakdowns, states = [], {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, initializer=_init_worker,
+                             initargs=(types,)) as executor:
+        try:
+            for done, result in enumerate(executor.map(_load_slice, slices), 1):
+                for table, count in result["rows"].items():
+                    rows[table] = rows.get(table, 0) + count
+                breakdowns += result["breakdowns"]
+                if result["state"] is not None:
+                    states[result["machine_id"]] = result["state"]
+                if done % max(1, len(slices) // 20) == 0 or done == len(slices):
+                    elapsed = time.perf_counter() - started
+                    print(f"  {done:>6}/{len(slices)} slices  {rows['production_logs']:>14,} production logs  "
+                          f"{rows['production_logs'] / elapsed:>10,.0f}/s")
+        finally:
+            if indexes:
+                print(f"  rebuilding {len(indexes)} indexes")
+                list(executor.map(_execute, [definition for _, definition in indexes]))
+
+    with Session(bind=engine) as db:
+        corrective = _corrective_tasks(sorted(breakdowns, key=lambda b: b[1]), reference["technicians"],
+                                       reference["next_task"], rng)
+        _insert(db, MaintenanceTask, corrective)
+        rows["maintenance_tasks"] += len(corrective)
+        for machine_id, state in states.items():
+            db.query(Machine).filter(Machine.id == machine_id).update(state, synchronize_session=False)
+        db.commit()
+        kpi_counters.reconcile(db)
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in [*BULK_TABLES, "work_orders", "maintenance_tasks", "machines"]:
+            conn.execute(text(f"ANALYZE {table}"))
+    engine.dispose()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load synthetic plant data")
+    parser.add_argument("--machines", type=int, default=18)
+    parser.add_argument("--days", type=int, default=30, help="History up to now, in days")
+    parser.add_argument("--interval", type=int, default=60, help="Seconds between production logs of a machine")
+    parser.add_argument("--workers", type=int, help="Generator processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true", help="Truncate all plant data first")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="Maintain the event tables' indexes during the load instead of rebuilding them")
+    args = parser.parse_args(argv)
+
+    print(f"Seeding {args.machines} machines x {args.days} days, a reading every {args.interval}s")
+    started = time.perf_counter()
+    rows = run_seed(args.machines, args.days, args.interval, args.workers, args.seed, args.reset, args.keep_indexes)
+    for table, count in rows.items():
+        print(f"  {table:<20} {count:>14,}")
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    return 0
 
 
 if __name__ == "__main__":
-    from app.db.database import SessionLocal
-
-    db = SessionLocal()
-    try:
-        run_seed(db)
-    finally:
-        db.close()
+    main()
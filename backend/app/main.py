@@ -1,9 +1,25 @@
 
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.db.database import engine, Base
-from app.api.routers import auth, machines, production, maintenance, quality, dashboard
+from app.db.database import engine, Base, SessionLocal
+from app.api.routers import auth, machines, production, maintenance, quality, dashboard, scheduling, system, sync, alerts, search, metrics
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import TracingMiddleware
+from app.services import simulation, kpi_counters, plant_calendar
+from app.services.alert_engine import alert_engine
+from app.services.dashboard_snapshot import dashboard_snapshot
+from app.services.telemetry_ingest import ingest_buffer
+from app.services.telemetry_listener import telemetry_listener
+
+# Application loggers; every record carries the ids of the trace it was logged in
+logging.basicConfig(
+    level=settings.LOG_LEVEL,
+    format="%(asctime)s %(levelname)s %(name)s [trace=%(trace_id)s span=%(span_id)s] %(message)s"
+)
 
 # Create tables (Alternative to running Alembic manually for first start)
 Base.metadata.create_all(bind=engine)
@@ -25,13 +41,50 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
+# Outermost, so request timings include the other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Include Routers
+# Every router defines its own prefix (/auth, /dashboard, /machines, ...)
 app.include_router(auth.router, prefix=settings.API_V1_STR)
-app.include_router(dashboard.router, prefix=f"{settings.API_V1_STR}/dashboard")
-app.include_router(machines.router, prefix=f"{settings.API_V1_STR}") # Machines router defines its own /machines prefix
-app.include_router(production.router, prefix=f"{settings.API_V1_STR}/production")
-app.include_router(maintenance.router, prefix=f"{settings.API_V1_STR}/maintenance")
-app.include_router(quality.router, prefix=f"{settings.API_V1_STR}/quality")
+app.include_router(dashboard.router, prefix=settings.API_V1_STR)
+app.include_router(machines.router, prefix=settings.API_V1_STR)
+app.include_router(production.router, prefix=settings.API_V1_STR)
+app.include_router(maintenance.router, prefix=settings.API_V1_STR)
+app.include_router(quality.router, prefix=settings.API_V1_STR)
+app.include_router(scheduling.router, prefix=settings.API_V1_STR)
+app.include_router(system.router, prefix=settings.API_V1_STR)
+app.include_router(sync.router, prefix=settings.API_V1_STR)
+app.include_router(alerts.router, prefix=settings.API_V1_STR)
+app.include_router(search.router, prefix=settings.API_V1_STR)
+# Prometheus scrapes /metrics at the root
+app.include_router(metrics.router)
+
+@app.on_event("startup")
+async def startup():
+    db = SessionLocal()
+    try:
+        plant_calendar.ensure_filled(db)
+        kpi_counters.ensure_initialized(db)
+    finally:
+        db.close()
+    await alert_engine.start()
+    await dashboard_snapshot.start()
+    await ingest_buffer.start()
+    if settings.TELEMETRY_UDP_ENABLED:
+        await telemetry_listener.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await telemetry_listener.stop()
+    await ingest_buffer.stop()
+    await dashboard_snapshot.stop()
+    await alert_engine.stop()
+    simulation.shutdown_executor()
+
 
 @app.get("/")
 def root():
@@ -1,7 +1,16 @@
-
 from app.models.machine import Machine, Employee, MachineStatus, MachineType
-from app.models.production import ProductionLog, ProductionLogBase
-from app.models.maintenance import MaintenanceTask, MaintenanceType, MaintenanceStatus
-from app.models.quality import QualityCheck, CheckResult
-from app.models.capacity import CapacityData
+from app.models.production import (
+    WorkOrder, ProductionLog, DowntimeLog, work_order_period,
+    Shift, Priority, WorkOrderStatus, DowntimeType
+)
+from app.models.maintenance import (
+    MaintenanceTask, EmulsionLog, MaintenanceType, MaintenanceStatus, maintenance_task_period
+)
+from app.models.quality import QualityCheck, ScrapEntry, ScrapType
+from app.models.capacity import Plant, WorkforceRecord, DailyProduction
 from app.models.user import User, UserRole
+from app.models.kpi import KPICounter
+from app.models.sync import SyncReceipt
+from app.models.alert import Alert, AlertSeverity, AlertStatus
+from app.models.version import CollectionVersion, VERSIONED_TABLES
+from app.models.calendar import ProductionCalendar
@@ -0,0 +1,68 @@
+"""
+Alert SQLAlchemy Models
+"""
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.db.database import Base
+
+
+class AlertSeverity(str, enum.Enum):
+    ERROR = "error"
+    WARNING = "warning"
+    INFO = "info"
+
+
+class AlertStatus(str, enum.Enum):
+    ACTIVE = "active"
+    ACKNOWLEDGED = "acknowledged"
+    RESOLVED = "resolved"
+
+
+class Alert(Base):
+    """Alert raised by a rule of the alert engine (see app.services.alert_engine)"""
+    __tablename__ = "alerts"
+
+    id = Column(Integer, primary_key=True)
+    rule = Column(String(50), nullable=False)
+    dedup_key = Column(String(100), nullable=False)  # "<rule>:<subject>", one open alert per key
+    machine_id = Column(String(20), index=True)  # No FK: history outlives deleted machines
+    severity = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default=AlertStatus.ACTIVE.value)
+
+    # Details
+    title = Column(String(100), nullable=False)
+    message = Column(String(300), nullable=False)
+    value = Column(Float)  # Observed value that triggered the rule
+    threshold = Column(Float)
+    occurrences = Column(Integer, nullable=False, default=1)
+
+    # Lifecycle
+    first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    acknowledged_at = Column(DateTime(timezone=True))
+    acknowledged_by = Column(String(100))
+    resolved_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<Alert {self.id}: {self.dedup_key} ({self.status})>"
+
+
+# At most one open alert per dedup key; also serves the engine's lookups
+Index(
+    "ix_alerts_open_dedup_key",
+    Alert.dedup_key,
+    unique=True,
+    postgresql_where=Alert.resolved_at.is_(None)
+)
+
+# Open alerts, newest first (dashboard and GET /alerts)
+Index(
+    "ix_alerts_open_last_seen",
+    Alert.last_seen_at.desc(),
+    postgresql_where=Alert.resolved_at.is_(None)
+)
+
+# Cooldown lookups and per-key history
+Index("ix_alerts_dedup_key_resolved", Alert.dedup_key, Alert.resolved_at)
@@ -0,0 +1,22 @@
+"""
+Production Calendar SQLAlchemy Model
+"""
+from sqlalchemy import Boolean, Column, Date, DateTime, Enum, Integer
+
+from app.db.database import Base
+from app.models.production import Shift
+
+
+class ProductionCalendar(Base):
+    """Plant calendar attributes of one UTC hour (see app.services.plant_calendar)"""
+    __tablename__ = "production_calendar"
+
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # Whole UTC hour
+    production_date = Column(Date, nullable=False, index=True)  # Starts with the first shift, not at midnight
+    shift = Column(Enum(Shift), nullable=False)
+    week_start = Column(Date, nullable=False, index=True)
+    working_day = Column(Boolean, nullable=False)
+    planned_minutes = Column(Integer, nullable=False)  # Scheduled production time within the hour
+
+    def __repr__(self):
+        return f"<ProductionCalendar {self.bucket_start}: {self.production_date} {self.shift}>"
@@ -5,6 +5,7 @@ from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean
 from sqlalchemy.sql import func
 
 from app.db.database import Base
+from app.models.search import search_columns, search_indexes
 
 
 class Plant(Base):
@@ -26,6 +27,9 @@ class Plant(Base):
     # Status
     is_active = Column(Boolean, default=True)
 
+    # Search (generated, see app.models.search)
+    search_document, search_vector = search_columns("id", "name", "name_ar", "description", "location")
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -41,6 +45,9 @@ class Plant(Base):
         return 0.0
 
 
+search_indexes(Plant)
+
+
 class WorkforceRecord(Base):
     """Workforce tracking model"""
     __tablename__ = "workforce_records"
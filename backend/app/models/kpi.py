@@ -0,0 +1,21 @@
+"""
+KPI Counter SQLAlchemy Model
+"""
+from sqlalchemy import Column, String, Float, DateTime
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class KPICounter(Base):
+    """Incrementally maintained dashboard counter (see app.services.kpi_counters)"""
+    __tablename__ = "kpi_counters"
+
+    key = Column(String(100), primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<KPICounter {self.key}={self.value}>"
@@ -7,6 +7,7 @@ from sqlalchemy.sql import func
 import enum
 
 from app.db.database import Base
+from app.models.search import search_columns, search_indexes
 
 
 class MachineStatus(str, enum.Enum):
@@ -44,6 +45,9 @@ class Machine(Base):
     oee = Column(Float, default=0.0)
     operator_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
 
+    # Search (generated, see app.models.search)
+    search_document, search_vector = search_columns("id", "name", "area")
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -60,6 +64,9 @@ class Machine(Base):
         return f"<Machine {self.id}: {self.name}>"
 
 
+search_indexes(Machine)
+
+
 class Employee(Base):
     """Employee model"""
     __tablename__ = "employees"
@@ -77,6 +84,11 @@ class Employee(Base):
     skill_level = Column(Integer, default=1)  # 1-5
     certifications = Column(String(500))  # JSON string of certifications
 
+    # Search (generated, see app.models.search)
+    search_document, search_vector = search_columns(
+        "employee_number", "name", "name_ar", "department", "position"
+    )
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -87,3 +99,6 @@ class Employee(Base):
 
     def __repr__(self):
         return f"<Employee {self.employee_number}: {self.name}>"
+
+
+search_indexes(Employee)
@@ -1,12 +1,13 @@
 """
 Maintenance SQLAlchemy Models
 """
-from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Text, Boolean, Index, case
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
 from app.db.database import Base
+from app.models.search import search_columns, search_indexes, trigram_index
 
 
 class MaintenanceType(str, enum.Enum):
@@ -29,7 +30,7 @@ class MaintenanceTask(Base):
     __tablename__ = "maintenance_tasks"
 
     id = Column(String(20), primary_key=True, index=True)
-    machine_id = Column(String(20), ForeignKey("machines.id"), nullable=False)
+    machine_id = Column(String(20), ForeignKey("machines.id"), nullable=False, index=True)
     type = Column(Enum(MaintenanceType), nullable=False)
     status = Column(Enum(MaintenanceStatus), default=MaintenanceStatus.PENDING)
 
@@ -64,6 +65,11 @@ class MaintenanceTask(Base):
     resolution = Column(Text)
     notes = Column(Text)
 
+    # Search (generated, see app.models.search)
+    search_document, search_vector = search_columns(
+        "id", "title", "description", "assignee", "team", "root_cause", "resolution", "notes"
+    )
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -75,6 +81,37 @@ class MaintenanceTask(Base):
         return f"<MaintenanceTask {self.id}: {self.title}>"
 
 
+def maintenance_task_period():
+    """
+    Scheduled interval of a maintenance task as a PostgreSQL tstzrange.
+
+    A task without scheduled_end is treated as open-ended. Queries must use
+    this exact expression to hit ix_maintenance_tasks_period.
+    """
+    return func.tstzrange(
+        MaintenanceTask.scheduled_start,
+        case(
+            (MaintenanceTask.scheduled_end.is_(None), None),
+            else_=func.greatest(MaintenanceTask.scheduled_start, MaintenanceTask.scheduled_end)
+        ),
+        "[]"
+    )
+
+
+# GiST index over the scheduled interval for Gantt window (overlap) queries
+Index(
+    "ix_maintenance_tasks_period",
+    maintenance_task_period(),
+    postgresql_using="gist",
+    postgresql_where=MaintenanceTask.scheduled_start.isnot(None)
+)
+
+search_indexes(MaintenanceTask)
+
+# Trigram index for the assignee substring filter of the task list
+trigram_index("ix_maintenance_tasks_assignee_trgm", MaintenanceTask.assignee)
+
+
 class EmulsionLog(Base):
     """Emulsion monitoring log for drawing machines"""
     __tablename__ = "emulsion_logs"
@@ -1,12 +1,13 @@
 """
 Production-related SQLAlchemy Models
 """
-from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Text, Boolean, Index, case
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 
 from app.db.database import Base
+from app.models.search import search_columns, search_indexes, trigram_index
 
 
 class Shift(str, enum.Enum):
@@ -37,7 +38,7 @@ class WorkOrder(Base):
     customer = Column(String(100), nullable=False)
     product = Column(String(200), nullable=False)
     product_code = Column(String(50))
-    machine_id = Column(String(20), ForeignKey("machines.id"), nullable=False)
+    machine_id = Column(String(20), ForeignKey("machines.id"), nullable=False, index=True)
     priority = Column(Enum(Priority), default=Priority.MEDIUM)
     status = Column(Enum(WorkOrderStatus), default=WorkOrderStatus.PENDING)
     progress = Column(Float, default=0.0)
@@ -49,6 +50,9 @@ class WorkOrder(Base):
     end_date = Column(DateTime(timezone=True))
     notes = Column(Text)
 
+    # Search (generated, see app.models.search)
+    search_document, search_vector = search_columns("id", "customer", "product", "product_code", "notes")
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -60,6 +64,37 @@ class WorkOrder(Base):
         return f"<WorkOrder {self.id}: {self.product}>"
 
 
+def work_order_period():
+    """
+    Scheduled interval of a work order as a PostgreSQL tstzrange.
+
+    The order runs from start_date until end_date, or until its due date while
+    still open. An order without either bound stays open-ended. The upper bound
+    is clamped to start_date so late orders never produce an invalid range.
+    Queries must use this exact expression to hit ix_work_orders_period.
+    """
+    upper = func.coalesce(WorkOrder.end_date, WorkOrder.due_date)
+    return func.tstzrange(
+        WorkOrder.start_date,
+        case((upper.is_(None), None), else_=func.greatest(WorkOrder.start_date, upper)),
+        "[]"
+    )
+
+
+# GiST index over the scheduled interval for Gantt window (overlap) queries
+Index(
+    "ix_work_orders_period",
+    work_order_period(),
+    postgresql_using="gist",
+    postgresql_where=WorkOrder.start_date.isnot(None)
+)
+
+search_indexes(WorkOrder)
+
+# Trigram index for the customer substring filter of the work order list
+trigram_index("ix_work_orders_customer_trgm", WorkOrder.customer)
+
+
 class ProductionLog(Base):
     """Production Log for manual data entry"""
     __tablename__ = "production_logs"
@@ -92,6 +127,14 @@ class ProductionLog(Base):
         return f"<ProductionLog {self.id}: {self.machine_id}>"
 
 
+# Per-machine time ranges; covers the columns chart downsampling reads, so
+# that fetch is an index-only scan
+Index(
+    "ix_production_logs_machine_timestamp", ProductionLog.machine_id, ProductionLog.timestamp,
+    postgresql_include=["id", "speed", "temperature"]
+)
+
+
 class DowntimeType(str, enum.Enum):
     MECHANICAL = "mechanical"
     ELECTRICAL = "electrical"
@@ -119,6 +162,9 @@ class DowntimeLog(Base):
     resolution = Column(Text)
     is_planned = Column(Boolean, default=False)
 
+    # Search (generated, see app.models.search)
+    search_document, search_vector = search_columns("machine_id", "reason", "resolution")
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -127,3 +173,6 @@ class DowntimeLog(Base):
 
     def __repr__(self):
         return f"<DowntimeLog {self.id}: {self.machine_id} - {self.downtime_type}>"
+
+
+search_indexes(DowntimeLog)
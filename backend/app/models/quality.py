@@ -1,7 +1,7 @@
 """
 Quality and Scrap SQLAlchemy Models
 """
-from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -52,6 +52,10 @@ class QualityCheck(Base):
         return f"<QualityCheck {self.id}: {self.machine_id} - {'PASS' if self.passed else 'FAIL'}>"
 
 
+# Latest checks of a machine (quality failure streak alert, per-machine history)
+Index("ix_quality_checks_machine_timestamp", QualityCheck.machine_id, QualityCheck.timestamp)
+
+
 class ScrapType(str, enum.Enum):
     COPPER_WIRE = "copper-wire"
     PVC_COMPOUND = "pvc-compound"
@@ -0,0 +1,83 @@
+"""
+Search Columns
+
+Searchable tables carry two stored generated columns that PostgreSQL keeps
+up to date on every insert / update:
+
+- search_document: the searchable columns joined with spaces and passed
+  through normalize_arabic(), with a pg_trgm index for substring and
+  typo-tolerant matches;
+- search_vector: the tsvector of the same text, with a GIN index for ranked
+  word / prefix matches. Ranking reads the stored vector instead of parsing
+  the text of every matching row again.
+
+normalize_arabic() maps hamza / madda / wasla alef to bare alef, alef maksura
+to ya and ta marbuta to ha, drops tatweel and harakat, and strips the
+definite article from words, so common spelling variants match each other.
+app.services.search applies the same normalization to the query.
+"""
+from sqlalchemy import DDL, Column, Computed, Index, Text, event, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+
+from app.db.database import Base
+
+# Characters past the end of ARABIC_TO are deleted by translate()
+ARABIC_FROM = "أإآٱىة" + "\u0640" + "".join(chr(c) for c in range(0x064B, 0x0653)) + "\u0670"
+ARABIC_TO = "اااايه"
+# "ال" at the start of a word of at least two more letters
+ARABIC_ARTICLE = r"(^|\s)ال(\S\S)"
+
+# The extension ships with PostgreSQL contrib; without it search still works
+# through search_vector (see app.services.search)
+event.listen(Base.metadata, "before_create", DDL("""
+    DO $$ BEGIN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXCEPTION WHEN feature_not_supported OR undefined_file OR insufficient_privilege THEN
+        RAISE WARNING 'pg_trgm is not available, search uses full-text matching only';
+    END $$
+"""))
+# Must exist before the tables whose generated columns call it
+NORMALIZE_ARABIC_DDL = f"""
+    CREATE OR REPLACE FUNCTION normalize_arabic(value text) RETURNS text
+    LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+    AS $$ SELECT regexp_replace(translate(value, '{ARABIC_FROM}', '{ARABIC_TO}'), '{ARABIC_ARTICLE}', '\\1\\2', 'g') $$
+"""
+event.listen(Base.metadata, "before_create", DDL(NORMALIZE_ARABIC_DDL))
+
+
+def document_sql(*columns: str) -> str:
+    """SQL for the normalized search text of the given columns (NULLs count as empty)."""
+    text = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return f"normalize_arabic({text})"
+
+
+def vector_sql(*columns: str) -> str:
+    # 'simple' does no stemming: the text mixes English and Arabic
+    return f"to_tsvector('simple'::regconfig, {document_sql(*columns)})"
+
+
+def search_columns(*columns: str):
+    """The (search_document, search_vector) columns of a model, deferred from normal loads."""
+    return (
+        deferred(Column(Text, Computed(document_sql(*columns), persisted=True))),
+        deferred(Column(TSVECTOR, Computed(vector_sql(*columns), persisted=True))),
+    )
+
+
+def _has_pg_trgm(ddl, target, bind, **kw) -> bool:
+    return bind.execute(text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")).scalar()
+
+
+def trigram_index(name: str, column) -> Index:
+    """GIN trigram index over a text column, skipped by create_all where pg_trgm is not installed."""
+    return Index(
+        name, column, postgresql_using="gin", postgresql_ops={column.key: "gin_trgm_ops"}
+    ).ddl_if(callable_=_has_pg_trgm)
+
+
+def search_indexes(model):
+    """Create the GIN indexes over a model's search columns."""
+    table = model.__tablename__
+    Index(f"ix_{table}_search_vector", model.search_vector, postgresql_using="gin")
+    trigram_index(f"ix_{table}_search_document", model.search_document)
@@ -0,0 +1,24 @@
+"""
+Offline Sync SQLAlchemy Models
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class SyncReceipt(Base):
+    """Idempotency record of a shop-floor entry applied through batch sync"""
+    __tablename__ = "sync_receipts"
+
+    id = Column(Integer, primary_key=True)
+    idempotency_key = Column(String(64), nullable=False, unique=True, index=True)
+    entry_type = Column(String(30), nullable=False)
+    record_id = Column(Integer, nullable=False)  # Id of the created log / check / scrap entry
+    terminal_id = Column(String(50))
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<SyncReceipt {self.idempotency_key}: {self.entry_type} {self.record_id}>"
@@ -0,0 +1,64 @@
+"""
+Collection Version SQLAlchemy Model
+"""
+from sqlalchemy import DDL, BigInteger, Column, DateTime, String, event
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+# Tables whose writes bump their collection version (see app.core.http_cache)
+VERSIONED_TABLES = (
+    "machines", "employees", "plants", "workforce_records", "work_orders", "maintenance_tasks"
+)
+
+
+class CollectionVersion(Base):
+    """Change counter of a table, maintained by the collection_version trigger"""
+    __tablename__ = "collection_versions"
+
+    name = Column(String(50), primary_key=True)  # Table name
+    version = Column(BigInteger, nullable=False, default=0)
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<CollectionVersion {self.name}={self.version}>"
+
+
+# The trigger is deferred: it runs at commit, once per table and transaction,
+# so the version row is locked only for the last moment of the transaction and
+# concurrent writers cannot deadlock on it.
+BUMP_COLLECTION_VERSION_DDL = """
+    CREATE OR REPLACE FUNCTION bump_collection_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF current_setting('collection_version.' || TG_TABLE_NAME, true) IS DISTINCT FROM 'bumped' THEN
+            PERFORM set_config('collection_version.' || TG_TABLE_NAME, 'bumped', true);
+            INSERT INTO collection_versions (name, version, changed_at)
+            VALUES (TG_TABLE_NAME, 1, clock_timestamp())
+            ON CONFLICT (name) DO UPDATE
+            SET version = collection_versions.version + 1, changed_at = excluded.changed_at;
+        END IF;
+        RETURN NULL;
+    END $$
+"""
+
+
+def collection_version_trigger_ddl(table: str) -> str:
+    return f"""
+        DO $$ BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_trigger WHERE tgname = 'collection_version' AND tgrelid = '{table}'::regclass
+            ) THEN
+                CREATE CONSTRAINT TRIGGER collection_version
+                AFTER INSERT OR UPDATE OR DELETE ON {table}
+                DEFERRABLE INITIALLY DEFERRED
+                FOR EACH ROW EXECUTE FUNCTION bump_collection_version();
+            END IF;
+        END $$;
+        INSERT INTO collection_versions (name, version) VALUES ('{table}', 0) ON CONFLICT (name) DO NOTHING
+    """
+
+
+event.listen(Base.metadata, "after_create", DDL(BUMP_COLLECTION_VERSION_DDL))
+for _table in VERSIONED_TABLES:
+    event.listen(Base.metadata, "after_create", DDL(collection_version_trigger_ddl(_table)))
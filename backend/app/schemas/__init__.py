@@ -4,7 +4,7 @@ Pydantic Schemas Package
 from app.schemas.machine import (
     MachineStatusEnum, MachineTypeEnum,
     MachineBase, MachineCreate, MachineUpdate, MachineStatusUpdate, MachineResponse,
-    MachineStats, AreaOEE,
+    MachineStats, AreaOEE, MachineLiveWindow,
     EmployeeBase, EmployeeCreate, EmployeeResponse
 )
 
@@ -12,6 +12,7 @@ from app.schemas.production import (
     ShiftEnum, PriorityEnum, WorkOrderStatusEnum, DowntimeTypeEnum,
     WorkOrderBase, WorkOrderCreate, WorkOrderUpdate, WorkOrderResponse,
     ProductionLogBase, ProductionLogCreate, ProductionLogResponse,
+    TelemetryBatch, TelemetryIngestResponse,
     DowntimeLogBase, DowntimeLogCreate, DowntimeLogResponse,
     ProductionSummary, DowntimeSummary
 )
@@ -34,20 +35,43 @@ from app.schemas.dashboard import (
     PlantBase, PlantCreate, PlantResponse, PlantCapacity,
     WorkforceRecordBase, WorkforceRecordCreate, WorkforceRecordResponse, WorkforceSummary,
     MachineOverview, KPIOverview, WorkforceOverview, ScrapOverview, DashboardOverview,
-    HourlyProduction, DailyProductionSummary, WeeklyTrend
+    HourlyProduction, DailyProductionSummary, WeeklyTrend,
+    DashboardSectionEnum, DashboardBundle
 )
 
+from app.schemas.scheduling import (
+    TimelineItemKindEnum, ConflictTypeEnum,
+    TimelineItem, TimelineConflict, TimelineResponse
+)
+
+from app.schemas.simulation import (
+    SimulationScenario, SimulationRequest,
+    StageStatistics, ScenarioResult, SimulationResponse
+)
+
+from app.schemas.sync import (
+    SyncEntryTypeEnum, SyncEntryStatusEnum,
+    SyncEntry, SyncBatchRequest, SyncEntryResult, SyncBatchResponse
+)
+
+from app.schemas.alert import (
+    AlertSeverityEnum, AlertStatusEnum, AlertAcknowledge, AlertResponse
+)
+
+from app.schemas.search import SearchEntityEnum, SearchHit, SearchResponse
+
 __all__ = [
     # Machine schemas
     "MachineStatusEnum", "MachineTypeEnum",
     "MachineBase", "MachineCreate", "MachineUpdate", "MachineStatusUpdate", "MachineResponse",
-    "MachineStats", "AreaOEE",
+    "MachineStats", "AreaOEE", "MachineLiveWindow",
     "EmployeeBase", "EmployeeCreate", "EmployeeResponse",
 
     # Production schemas
     "ShiftEnum", "PriorityEnum", "WorkOrderStatusEnum", "DowntimeTypeEnum",
     "WorkOrderBase", "WorkOrderCreate", "WorkOrderUpdate", "WorkOrderResponse",
     "ProductionLogBase", "ProductionLogCreate", "ProductionLogResponse",
+    "TelemetryBatch", "TelemetryIngestResponse",
     "DowntimeLogBase", "DowntimeLogCreate", "DowntimeLogResponse",
     "ProductionSummary", "DowntimeSummary",
 
@@ -68,4 +92,21 @@ __all__ = [
     "WorkforceRecordBase", "WorkforceRecordCreate", "WorkforceRecordResponse", "WorkforceSummary",
     "MachineOverview", "KPIOverview", "WorkforceOverview", "ScrapOverview", "DashboardOverview",
     "HourlyProduction", "DailyProductionSummary", "WeeklyTrend",
+    "DashboardSectionEnum", "DashboardBundle",
+
+    # Scheduling schemas
+    "TimelineItemKindEnum", "ConflictTypeEnum",
+    "TimelineItem", "TimelineConflict", "TimelineResponse",
+
+    # Simulation schemas
+    "SimulationScenario", "SimulationRequest",
+    "StageStatistics", "ScenarioResult", "SimulationResponse",
+
+    # Sync schemas
+    "SyncEntryTypeEnum", "SyncEntryStatusEnum",
+    "SyncEntry", "SyncBatchRequest", "SyncEntryResult", "SyncBatchResponse",
+    # Alert schemas
+    "AlertSeverityEnum", "AlertStatusEnum", "AlertAcknowledge", "AlertResponse",
+    # Search schemas
+    "SearchEntityEnum", "SearchHit", "SearchResponse",
 ]
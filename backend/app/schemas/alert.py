@@ -0,0 +1,46 @@
+"""
+Pydantic Schemas for Alert endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+
+class AlertSeverityEnum(str, Enum):
+    ERROR = "error"
+    WARNING = "warning"
+    INFO = "info"
+
+
+class AlertStatusEnum(str, Enum):
+    ACTIVE = "active"
+    ACKNOWLEDGED = "acknowledged"  # Still open, hidden from the dashboard
+    RESOLVED = "resolved"
+
+
+class AlertAcknowledge(BaseModel):
+    """Schema for acknowledging an alert"""
+    acknowledged_by: Optional[str] = Field(None, max_length=100)
+
+
+class AlertResponse(BaseModel):
+    """Schema for alert response"""
+    id: int
+    rule: str
+    machine_id: Optional[str] = None
+    severity: AlertSeverityEnum
+    status: AlertStatusEnum
+    title: str
+    message: str
+    value: Optional[float] = None
+    threshold: Optional[float] = None
+    occurrences: int
+    first_seen_at: datetime
+    last_seen_at: datetime
+    acknowledged_at: Optional[datetime] = None
+    acknowledged_by: Optional[str] = None
+    resolved_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -4,6 +4,9 @@ Pydantic Schemas for Dashboard and Capacity endpoints
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from enum import Enum
+
+from app.schemas.machine import MachineResponse
 
 
 # ============== Capacity Schemas ==============
@@ -158,3 +161,25 @@ class WeeklyTrend(BaseModel):
     production: float
     target: float
     scrap: float
+
+
+# ============== Bundle Schemas ==============
+
+class DashboardSectionEnum(str, Enum):
+    OVERVIEW = "overview"
+    CAPACITY = "capacity"
+    WORKFORCE = "workforce"
+    HOURLY = "hourly"
+    MACHINES = "machines"
+
+
+class DashboardBundle(BaseModel):
+    """Schema for several dashboard sections in one response; unrequested sections are null"""
+    generated_at: datetime
+    overview: Optional[DashboardOverview] = None
+    capacity: Optional[List[PlantCapacity]] = None
+    workforce: Optional[List[WorkforceSummary]] = None
+    hourly: Optional[List[HourlyProduction]] = None
+    machines: Optional[List[MachineResponse]] = None
+    errors: Dict[str, str] = {}  # Section -> message, for sections that failed
+    timings_ms: Dict[str, float] = {}
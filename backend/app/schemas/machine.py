@@ -96,6 +96,17 @@ class AreaOEE(BaseModel):
     running_count: int
 
 
+class MachineLiveWindow(BaseModel):
+    """Schema for the in-memory live telemetry window (parallel arrays, oldest first)"""
+    machine_id: str
+    capacity: int
+    count: int
+    memory_bytes: int
+    timestamps: List[float]  # Unix epoch milliseconds
+    speed: List[Optional[float]]
+    temperature: List[Optional[float]]
+
+
 # ============== Employee Schemas ==============
 
 class EmployeeBase(BaseModel):
@@ -109,6 +109,17 @@ class ProductionLogResponse(ProductionLogBase):
         from_attributes = True
 
 
+class TelemetryBatch(BaseModel):
+    """Schema for a batch of readings sent to the high-frequency ingest path"""
+    readings: List[ProductionLogCreate] = Field(..., min_length=1, max_length=5000)
+
+
+class TelemetryIngestResponse(BaseModel):
+    """Schema for the ingest acknowledgement (rows are written asynchronously)"""
+    accepted: int
+    queue_depth: int
+
+
 # ============== Downtime Log Schemas ==============
 
 class DowntimeLogBase(BaseModel):
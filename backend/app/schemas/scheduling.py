@@ -0,0 +1,52 @@
+"""
+Pydantic Schemas for Scheduling (Gantt timeline) endpoints
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from enum import Enum
+
+
+class TimelineItemKindEnum(str, Enum):
+    WORK_ORDER = "work-order"
+    MAINTENANCE = "maintenance"
+
+
+class ConflictTypeEnum(str, Enum):
+    WORK_ORDER_OVERLAP = "work-order-overlap"
+    MAINTENANCE_CLASH = "maintenance-clash"
+    MAINTENANCE_OVERLAP = "maintenance-overlap"
+    PAST_DUE = "past-due"
+
+
+# ============== Timeline Schemas ==============
+
+class TimelineItem(BaseModel):
+    """A single bar on the Gantt chart"""
+    kind: TimelineItemKindEnum
+    id: str
+    machine_id: str
+    title: str
+    status: str
+    start: datetime
+    end: Optional[datetime] = None  # None means open-ended
+    due_date: Optional[datetime] = None
+    priority: Optional[str] = None
+
+
+class TimelineConflict(BaseModel):
+    """Two bars on the same machine whose intervals overlap, or a late order"""
+    type: ConflictTypeEnum
+    machine_id: str
+    item_ids: List[str]
+    overlap_start: datetime
+    overlap_end: Optional[datetime] = None
+
+
+class TimelineResponse(BaseModel):
+    """Everything scheduled on the requested machines inside a time window"""
+    window_start: datetime
+    window_end: datetime
+    machine_ids: Optional[List[str]] = None
+    items: List[TimelineItem]
+    conflicts: List[TimelineConflict]
@@ -0,0 +1,32 @@
+"""
+Pydantic Schemas for Search endpoints
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+from enum import Enum
+
+
+class SearchEntityEnum(str, Enum):
+    WORK_ORDER = "work_order"
+    MAINTENANCE_TASK = "maintenance_task"
+    DOWNTIME_LOG = "downtime_log"
+    MACHINE = "machine"
+    EMPLOYEE = "employee"
+    PLANT = "plant"
+
+
+class SearchHit(BaseModel):
+    """One matching record"""
+    type: SearchEntityEnum
+    id: str
+    title: str
+    subtitle: Optional[str] = None
+    machine_id: Optional[str] = None
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    """Schema for search results, best match first"""
+    query: str
+    hits: List[SearchHit]
+    took_ms: float
@@ -0,0 +1,68 @@
+"""
+Pydantic Schemas for Capacity Simulation endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
+
+
+class SimulationScenario(BaseModel):
+    """A what-if variant of the production line"""
+    name: str = Field(default="baseline", min_length=1, max_length=100)
+    shifts_per_day: int = Field(default=2, ge=1, le=3)
+    staffing_ratio: Optional[float] = Field(None, gt=0, le=1)  # None: from workforce records
+    fixed_machine_ids: List[str] = []  # Stopped machines brought back into service
+    extra_machines: Dict[str, int] = {}  # Stage name -> machines added
+    speed_factor: float = Field(default=1.0, gt=0, le=3)
+    downtime_reduction: float = Field(default=0.0, ge=0, lt=1)  # Share of unplanned stops avoided
+    setup_reduction: float = Field(default=0.0, ge=0, le=1)  # Share of planned stop time removed
+    buffer_reels: Optional[int] = Field(None, ge=1, le=1000)
+
+
+class SimulationRequest(BaseModel):
+    """Schema for a capacity simulation run"""
+    area: Optional[str] = Field(None, max_length=50)  # Plant area, e.g. PCP-1
+    working_days: int = Field(default=30, ge=1, le=365)
+    replications: int = Field(default=1000, ge=1)
+    reel_length_m: float = Field(default=1000.0, gt=0)
+    lookback_days: int = Field(default=90, ge=7, le=730)
+    seed: Optional[int] = None
+    scenarios: List[SimulationScenario] = Field(
+        default_factory=lambda: [SimulationScenario()], min_length=1, max_length=10
+    )
+
+
+class StageStatistics(BaseModel):
+    """Mean share of crewed machine-time per state for one stage"""
+    stage: str
+    machines: int
+    crewed: int
+    busy_percent: float
+    blocked_percent: float
+    starved_percent: float
+    down_percent: float
+
+
+class ScenarioResult(BaseModel):
+    """Throughput distribution for one scenario"""
+    scenario: str
+    throughput_m_per_day: float
+    throughput_m_per_day_p5: float
+    throughput_m_per_day_p95: float
+    throughput_mt_per_year: float
+    utilization_percent: Optional[float] = None  # Against plant design capacity
+    change_percent: Optional[float] = None  # Against the first scenario
+    bottleneck_stage: Optional[str] = None
+    stages: List[StageStatistics]
+
+
+class SimulationResponse(BaseModel):
+    """Schema for capacity simulation results"""
+    area: Optional[str] = None
+    working_days: int
+    replications: int
+    kg_per_meter: float
+    staffing_ratio: float
+    design_capacity_mt: float
+    current_capacity_mt: float
+    elapsed_seconds: float
+    results: List[ScenarioResult]
@@ -0,0 +1,50 @@
+"""
+Pydantic Schemas for Offline Batch Sync endpoints
+"""
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from enum import Enum
+
+
+class SyncEntryTypeEnum(str, Enum):
+    PRODUCTION_LOG = "production_log"
+    DOWNTIME_LOG = "downtime_log"
+    QUALITY_CHECK = "quality_check"
+    SCRAP_ENTRY = "scrap_entry"
+
+
+class SyncEntryStatusEnum(str, Enum):
+    CREATED = "created"
+    DUPLICATE = "duplicate"  # Already applied by an earlier (retried) batch
+    INVALID = "invalid"  # Payload failed validation
+    FAILED = "failed"  # Valid payload the server could not apply (e.g. unknown machine)
+
+
+class SyncEntry(BaseModel):
+    """One queued terminal entry; data is the matching *Create schema"""
+    idempotency_key: str = Field(..., min_length=8, max_length=64)
+    type: SyncEntryTypeEnum
+    data: Dict[str, Any]
+
+
+class SyncBatchRequest(BaseModel):
+    """Schema for a batch of entries queued while a terminal was offline"""
+    terminal_id: Optional[str] = Field(None, max_length=50)
+    entries: List[SyncEntry] = Field(..., min_length=1, max_length=500)
+
+
+class SyncEntryResult(BaseModel):
+    """Outcome of one entry, in request order"""
+    idempotency_key: str
+    type: SyncEntryTypeEnum
+    status: SyncEntryStatusEnum
+    record_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class SyncBatchResponse(BaseModel):
+    """Schema for the batch sync result"""
+    created: int
+    duplicates: int
+    rejected: int
+    results: List[SyncEntryResult]
@@ -0,0 +1,3 @@
+"""
+Domain Services Package
+"""
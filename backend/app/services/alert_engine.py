@@ -0,0 +1,456 @@
+"""
+Rule-Based Alert Engine
+
+Rules are evaluated incrementally as events arrive: telemetry readings
+(ingest buffer, production logs), machine status changes, quality checks,
+emulsion logs, plus a periodic sweep for overdue maintenance. Each alert is
+identified by a dedup key "<rule>:<subject>" and the alerts table holds at
+most one open alert per key:
+
+- a condition that is still true only bumps occurrences / last_seen_at,
+  written at most every ALERT_TOUCH_INTERVAL seconds;
+- once resolved, the same key cannot re-open for ALERT_COOLDOWN_MINUTES
+  (except rules that mirror a state, such as a stopped machine);
+- acknowledging hides an alert from the dashboard but keeps it open until
+  its condition clears.
+
+Open keys, machine metadata and "speed low since" timers are kept in
+memory, so a reading that changes nothing costs no query. Readers (the
+dashboard, GET /alerts) use indexed queries on the alerts table.
+
+With several workers the table is the shared state: alerts are resolved
+by dedup key (whichever worker opened them), cooldowns are re-read from the
+table unless one is known to be running, and the background sweeper reloads
+the open keys every ALERT_SWEEP_INTERVAL, so a worker can resolve alerts
+other workers raised. Handlers that change maintenance tasks only wake the
+sweeper (request_sweep) instead of sweeping on the event loop.
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core import tracing
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models import (
+    Alert, AlertSeverity, AlertStatus, Machine, MachineStatus,
+    MaintenanceTask, MaintenanceStatus, QualityCheck
+)
+from app.services.dashboard_snapshot import dashboard_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Rule:
+    severity: AlertSeverity
+    title: str
+    cooldown: bool = True  # False for rules that mirror a state and must follow it exactly
+
+
+MACHINE_DOWN = "machine_down"
+MACHINE_MAINTENANCE = "machine_maintenance"
+TEMPERATURE_HIGH = "temperature_high"
+SPEED_LOW = "speed_low"
+QUALITY_FAILURES = "quality_failures"
+EMULSION_OUT_OF_SPEC = "emulsion_out_of_spec"
+MAINTENANCE_OVERDUE = "maintenance_overdue"
+
+RULES: Dict[str, Rule] = {
+    MACHINE_DOWN: Rule(AlertSeverity.ERROR, "Machine Down", cooldown=False),
+    MACHINE_MAINTENANCE: Rule(AlertSeverity.WARNING, "Under Maintenance", cooldown=False),
+    TEMPERATURE_HIGH: Rule(AlertSeverity.ERROR, "High Temperature"),
+    SPEED_LOW: Rule(AlertSeverity.WARNING, "Running Below Target"),
+    QUALITY_FAILURES: Rule(AlertSeverity.ERROR, "Repeated Quality Failures"),
+    EMULSION_OUT_OF_SPEC: Rule(AlertSeverity.WARNING, "Emulsion Out of Spec"),
+    MAINTENANCE_OVERDUE: Rule(AlertSeverity.WARNING, "Maintenance Overdue"),
+}
+
+# Rules whose subject is the machine id
+MACHINE_RULES = (
+    MACHINE_DOWN, MACHINE_MAINTENANCE, TEMPERATURE_HIGH, SPEED_LOW, QUALITY_FAILURES, EMULSION_OUT_OF_SPEC
+)
+
+NEVER = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def alert_key(rule: str, subject: str) -> str:
+    return f"{rule}:{subject}"
+
+
+def _value(member) -> Optional[str]:
+    """Enum columns hold the member after a load and the plain value after assignment."""
+    return getattr(member, "value", member)
+
+
+def _machine_info(machine: Machine) -> Dict:
+    return {
+        "name": machine.name,
+        "type": _value(machine.type),
+        "status": _value(machine.status),
+        "target_speed": machine.target_speed or 0.0,
+    }
+
+
+class AlertEngine:
+    """Evaluates alert rules on events and keeps the alerts table up to date."""
+
+    def __init__(self):
+        self._open: Dict[str, int] = {}  # dedup key -> open alert id
+        self._touched: Dict[str, float] = {}  # dedup key -> monotonic time of the last DB update
+        self._repeats: Dict[str, int] = {}  # occurrences not yet written
+        self._cooldown_until: Dict[str, datetime] = {}
+        self._machines: Dict[str, Dict] = {}
+        self._below_since: Dict[str, datetime] = {}  # machine id -> first low-speed reading
+        self._lock = threading.RLock()  # Events come from request handlers and the ingest flusher
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.stats = {
+            "events": 0, "raised": 0, "repeats": 0, "suppressed": 0, "resolved": 0
+        }
+
+    # ============== Transitions ==============
+
+    def _raise(self, rule: str, subject: str, machine_id: Optional[str], message: str,
+               value: Optional[float] = None, threshold: Optional[float] = None):
+        key = alert_key(rule, subject)
+        with self._lock:
+            if key in self._open:
+                self._repeat(key, message, value)
+                return
+            if RULES[rule].cooldown and self._cooling_down(key):
+                self.stats["suppressed"] += 1
+                return
+
+            db = SessionLocal()
+            try:
+                alert = Alert(
+                    rule=rule, dedup_key=key, machine_id=machine_id,
+                    severity=RULES[rule].severity.value, status=AlertStatus.ACTIVE.value,
+                    title=RULES[rule].title, message=message, value=value, threshold=threshold
+                )
+                db.add(alert)
+                db.commit()
+                alert_id = alert.id
+            except IntegrityError:
+                # Opened concurrently by another worker: adopt it
+                db.rollback()
+                alert_id = db.query(Alert.id).filter(
+                    Alert.dedup_key == key, Alert.resolved_at.is_(None)
+                ).scalar()
+            finally:
+                db.close()
+
+            if alert_id is None:
+                return
+            self._open[key] = alert_id
+            self._touched[key] = time.monotonic()
+            self.stats["raised"] += 1
+        dashboard_snapshot.invalidate()
+
+    def _repeat(self, key: str, message: str, value: Optional[float]):
+        self.stats["repeats"] += 1
+        self._repeats[key] = self._repeats.get(key, 0) + 1
+        if time.monotonic() - self._touched.get(key, 0.0) < settings.ALERT_TOUCH_INTERVAL:
+            return
+
+        db = SessionLocal()
+        try:
+            touched = db.execute(
+                update(Alert).where(Alert.id == self._open[key], Alert.resolved_at.is_(None)).values(
+                    occurrences=Alert.occurrences + self._repeats[key],
+                    last_seen_at=func.now(), message=message, value=value
+                )
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if not touched:  # Resolved by another worker: the next event raises it again, cooldown permitting
+            self._forget(key)
+            return
+        self._repeats[key] = 0
+        self._touched[key] = time.monotonic()
+
+    def _cooling_down(self, key: str) -> bool:
+        """A running cooldown is trusted; otherwise another worker may have resolved the key since, ask the table."""
+        now = datetime.now(timezone.utc)
+        if now < self._cooldown_until.get(key, NEVER):
+            return True
+        db = SessionLocal()
+        try:
+            resolved_at = db.query(func.max(Alert.resolved_at)).filter(Alert.dedup_key == key).scalar()
+        finally:
+            db.close()
+        until = resolved_at + timedelta(minutes=settings.ALERT_COOLDOWN_MINUTES) if resolved_at else NEVER
+        self._cooldown_until[key] = until
+        return now < until
+
+    def _forget(self, key: str):
+        self._open.pop(key, None)
+        self._touched.pop(key, None)
+        self._repeats.pop(key, None)
+
+    def _resolve(self, rule: str, subject: str):
+        key = alert_key(rule, subject)
+        if key not in self._open:  # Common case, no lock needed
+            return
+        with self._lock:
+            if key not in self._open:
+                return
+
+            # By key rather than id: the open alert may be another worker's
+            now = datetime.now(timezone.utc)
+            db = SessionLocal()
+            try:
+                resolved = db.execute(
+                    update(Alert).where(Alert.dedup_key == key, Alert.resolved_at.is_(None)).values(
+                        status=AlertStatus.RESOLVED.value, resolved_at=now,
+                        occurrences=Alert.occurrences + self._repeats.get(key, 0)
+                    )
+                ).rowcount
+                db.commit()
+            finally:
+                db.close()
+
+            self._forget(key)
+            if not resolved:  # Already resolved elsewhere; its cooldown is read when the key is raised again
+                return
+            self._cooldown_until[key] = now + timedelta(minutes=settings.ALERT_COOLDOWN_MINUTES)
+            self.stats["resolved"] += 1
+        dashboard_snapshot.invalidate()
+
+    # ============== Events ==============
+
+    def readings(self, rows: Iterable[Dict]):
+        """Temperature and low-speed rules for telemetry rows (see telemetry_ingest.reading_row)."""
+        limits = settings.ALERT_TEMPERATURE_LIMITS
+        for row in rows:
+            self.stats["events"] += 1
+            machine_id = row["machine_id"]
+            info = self._machines.get(machine_id)
+            if info is None:
+                continue
+
+            temperature = row["temperature"]
+            if temperature is not None:
+                limit = limits.get(info["type"], settings.ALERT_TEMPERATURE_DEFAULT_LIMIT)
+                if temperature > limit:
+                    self._raise(
+                        TEMPERATURE_HIGH, machine_id, machine_id,
+                        f"{machine_id} temperature {temperature:.1f}°C exceeds {limit:.0f}°C",
+                        value=temperature, threshold=limit
+                    )
+                elif temperature <= limit - settings.ALERT_TEMPERATURE_HYSTERESIS:
+                    self._resolve(TEMPERATURE_HIGH, machine_id)
+
+            self._check_speed(machine_id, info, row["speed"], row["timestamp"])
+
+    def _check_speed(self, machine_id: str, info: Dict, speed: float, timestamp: datetime):
+        if info["status"] != MachineStatus.RUNNING.value or not info["target_speed"]:
+            return
+        minimum = info["target_speed"] * settings.ALERT_SPEED_MIN_RATIO
+        if speed >= minimum:
+            self._below_since.pop(machine_id, None)
+            self._resolve(SPEED_LOW, machine_id)
+            return
+
+        since = self._below_since.setdefault(machine_id, timestamp)
+        minutes = (timestamp - since).total_seconds() / 60
+        if minutes >= settings.ALERT_SPEED_LOW_MINUTES:
+            self._raise(
+                SPEED_LOW, machine_id, machine_id,
+                f"{machine_id} at {speed:.1f} for {minutes:.0f} min, below {minimum:.1f} "
+                f"({settings.ALERT_SPEED_MIN_RATIO:.0%} of target {info['target_speed']:.1f})",
+                value=speed, threshold=minimum
+            )
+
+    def machine_changed(self, machine: Machine):
+        """Call after a machine was created or updated (status, target speed, ...)."""
+        self.stats["events"] += 1
+        info = _machine_info(machine)
+        self._machines[machine.id] = info
+        status = info["status"]
+
+        if status == MachineStatus.STOPPED.value:
+            self._raise(MACHINE_DOWN, machine.id, machine.id, f"{machine.id} ({info['name']}) is stopped")
+        else:
+            self._resolve(MACHINE_DOWN, machine.id)
+
+        if status == MachineStatus.MAINTENANCE.value:
+            self._raise(
+                MACHINE_MAINTENANCE, machine.id, machine.id, f"{machine.id} ({info['name']}) is under maintenance"
+            )
+        else:
+            self._resolve(MACHINE_MAINTENANCE, machine.id)
+
+        if status != MachineStatus.RUNNING.value:
+            self._below_since.pop(machine.id, None)
+            self._resolve(SPEED_LOW, machine.id)
+
+    def machine_deleted(self, machine_id: str):
+        self._machines.pop(machine_id, None)
+        self._below_since.pop(machine_id, None)
+        for rule in MACHINE_RULES:
+            self._resolve(rule, machine_id)
+
+    def quality_check(self, machine_id: str):
+        """Call after a quality check was committed for the machine."""
+        self.stats["events"] += 1
+        streak = settings.ALERT_QUALITY_FAILURE_STREAK
+        db = SessionLocal()
+        try:
+            latest = [
+                passed for (passed,) in db.query(QualityCheck.passed)
+                .filter(QualityCheck.machine_id == machine_id)
+                .order_by(QualityCheck.timestamp.desc(), QualityCheck.id.desc())
+                .limit(streak)
+            ]
+        finally:
+            db.close()
+
+        if len(latest) == streak and not any(latest):
+            self._raise(
+                QUALITY_FAILURES, machine_id, machine_id,
+                f"{machine_id} failed the last {streak} quality checks",
+                value=streak, threshold=streak
+            )
+        elif latest and latest[0]:
+            self._resolve(QUALITY_FAILURES, machine_id)
+
+    def emulsion_logged(self, machine_id: str, is_within_spec: bool, action_required: Optional[str],
+                        ph_level: Optional[float] = None):
+        self.stats["events"] += 1
+        if is_within_spec:
+            self._resolve(EMULSION_OUT_OF_SPEC, machine_id)
+        else:
+            self._raise(
+                EMULSION_OUT_OF_SPEC, machine_id, machine_id,
+                f"{machine_id} emulsion out of spec: {action_required or 'check parameters'}",
+                value=ph_level
+            )
+
+    def request_sweep(self):
+        """Ask the background sweeper to run now (call from the event loop after changing tasks)."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def sweep_maintenance(self):
+        """Raise alerts for open tasks past their scheduled end and resolve the rest."""
+        with tracing.job("alerts.sweep_maintenance"):
+            self._sweep_maintenance()
+
+    def _sweep_maintenance(self):
+        self.stats["events"] += 1
+        db = SessionLocal()
+        try:
+            overdue = db.query(
+                MaintenanceTask.id, MaintenanceTask.machine_id, MaintenanceTask.title, MaintenanceTask.scheduled_end
+            ).filter(
+                MaintenanceTask.status.in_([MaintenanceStatus.PENDING, MaintenanceStatus.IN_PROGRESS]),
+                MaintenanceTask.scheduled_end < func.now()
+            ).all()
+        finally:
+            db.close()
+
+        due = set()
+        for task_id, machine_id, title, scheduled_end in overdue:
+            due.add(alert_key(MAINTENANCE_OVERDUE, task_id))
+            self._raise(
+                MAINTENANCE_OVERDUE, task_id, machine_id,
+                f"{task_id} '{title}' on {machine_id} was due {scheduled_end:%Y-%m-%d %H:%M}"
+            )
+
+        prefix = alert_key(MAINTENANCE_OVERDUE, "")
+        for key in [k for k in list(self._open) if k.startswith(prefix) and k not in due]:
+            self._resolve(MAINTENANCE_OVERDUE, key[len(prefix):])
+
+    # ============== Lifecycle ==============
+
+    def sync_open(self):
+        """Reload the open keys from the table, including those other workers raised or resolved."""
+        with self._lock:
+            db = SessionLocal()
+            try:
+                open_alerts = dict(db.query(Alert.dedup_key, Alert.id).filter(Alert.resolved_at.is_(None)).all())
+            finally:
+                db.close()
+            for key in self._open.keys() - open_alerts.keys():
+                self._forget(key)
+            for key, alert_id in open_alerts.items():
+                if self._open.get(key) != alert_id:
+                    self._open[key] = alert_id
+                    self._touched[key] = time.monotonic()
+                    self._repeats.pop(key, None)
+
+    def load(self):
+        """Load open alerts and machines, then bring machine-state alerts up to date."""
+        db = SessionLocal()
+        try:
+            open_alerts = db.query(Alert.dedup_key, Alert.id).filter(Alert.resolved_at.is_(None)).all()
+            machines = db.query(Machine).all()
+            with self._lock:
+                self._open = dict(open_alerts)
+                self._machines = {m.id: _machine_info(m) for m in machines}
+        finally:
+            db.close()
+
+        # Machines may have changed while no engine was running
+        for machine in machines:
+            self.machine_changed(machine)
+        subjects = [key.split(":", 1) for key in list(self._open)]
+        for machine_id in {subject for rule, subject in subjects if rule in MACHINE_RULES} - self._machines.keys():
+            self.machine_deleted(machine_id)
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                await run_in_threadpool(self.sync_open)
+                await run_in_threadpool(self.sweep_maintenance)
+            except Exception:
+                logger.exception("Overdue maintenance sweep failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.ALERT_SWEEP_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        try:
+            await run_in_threadpool(self.load)
+        except Exception:
+            logger.exception("Could not load alert engine state")
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict:
+        open_by_rule: Dict[str, int] = {}
+        for key in list(self._open):
+            rule = key.split(":", 1)[0]
+            open_by_rule[rule] = open_by_rule.get(rule, 0) + 1
+        return {
+            **self.stats,
+            "open": len(self._open),
+            "open_by_rule": open_by_rule,
+            "machines_tracked": len(self._machines),
+            "speed_timers": len(self._below_since),
+        }
+
+
+alert_engine = AlertEngine()
@@ -0,0 +1,168 @@
+"""
+Offline-First Batch Sync
+
+Shop-floor terminals queue entries while offline and send them in batches,
+each entry carrying a client-generated idempotency key. A batch is applied
+in one transaction; every entry runs in its own savepoint, so one bad entry
+is reported without discarding the others.
+
+Retries are deduplicated in two steps: a bounded in-memory map of recently
+applied keys answers most of them without a query, and the unique index on
+sync_receipts.idempotency_key catches the rest (older keys, other workers,
+two retries of the same batch racing each other).
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import SyncReceipt
+from app.schemas import (
+    ProductionLogCreate, DowntimeLogCreate, QualityCheckCreate, ScrapEntryCreate,
+    SyncEntry, SyncEntryTypeEnum, SyncEntryStatusEnum, SyncEntryResult, SyncBatchResponse
+)
+from app.services import shop_floor
+
+UNIQUE_VIOLATION = "23505"  # PostgreSQL SQLSTATE
+
+# Entry type -> (payload schema, function adding the record to the session)
+HANDLERS: Dict[SyncEntryTypeEnum, Tuple[Type[BaseModel], Callable]] = {
+    SyncEntryTypeEnum.PRODUCTION_LOG: (ProductionLogCreate, shop_floor.add_production_log),
+    SyncEntryTypeEnum.DOWNTIME_LOG: (DowntimeLogCreate, shop_floor.add_downtime_log),
+    SyncEntryTypeEnum.QUALITY_CHECK: (QualityCheckCreate, shop_floor.add_quality_check),
+    SyncEntryTypeEnum.SCRAP_ENTRY: (ScrapEntryCreate, shop_floor.add_scrap_entry),
+}
+
+
+class RecentKeys:
+    """LRU map of recently applied idempotency keys -> record id."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._keys: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()  # Shared by every request thread
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            record_id = self._keys.get(key)
+            if record_id is not None:
+                self._keys.move_to_end(key)
+            return record_id
+
+    def add(self, key: str, record_id: int):
+        with self._lock:
+            self._keys[key] = record_id
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.capacity:
+                self._keys.popitem(last=False)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+recent_keys = RecentKeys(settings.SYNC_RECENT_KEYS)
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def apply_batch(db: Session, entries: List[SyncEntry], terminal_id: Optional[str] = None):
+    """
+    Apply a batch and commit it. Returns (response, created records by type)
+    so the caller can run post-commit work for what was actually written.
+    """
+    results: List[Optional[SyncEntryResult]] = [None] * len(entries)
+    known: Dict[str, int] = {}
+
+    # 1. Keys applied recently (memory), then older ones (one indexed lookup)
+    for entry in entries:
+        record_id = recent_keys.get(entry.idempotency_key)
+        if record_id is not None:
+            known[entry.idempotency_key] = record_id
+    unresolved = {e.idempotency_key for e in entries} - known.keys()
+    if unresolved:
+        known.update(
+            db.query(SyncReceipt.idempotency_key, SyncReceipt.record_id)
+            .filter(SyncReceipt.idempotency_key.in_(unresolved))
+            .all()
+        )
+
+    created = {}
+    for index, entry in enumerate(entries):
+        key = entry.idempotency_key
+        if key in known:
+            results[index] = SyncEntryResult(
+                idempotency_key=key, type=entry.type,
+                status=SyncEntryStatusEnum.DUPLICATE, record_id=known[key]
+            )
+            continue
+
+        schema, add_record = HANDLERS[entry.type]
+        try:
+            payload = schema.model_validate(entry.data)
+        except ValidationError as e:
+            results[index] = SyncEntryResult(
+                idempotency_key=key, type=entry.type,
+                status=SyncEntryStatusEnum.INVALID, detail=_validation_detail(e)
+            )
+            continue
+
+        # 2. Apply inside a savepoint so a failure only affects this entry
+        savepoint = db.begin_nested()
+        try:
+            record = add_record(db, payload)
+            db.flush()
+            db.add(SyncReceipt(
+                idempotency_key=key, entry_type=entry.type.value,
+                record_id=record.id, terminal_id=terminal_id
+            ))
+            db.flush()
+            savepoint.commit()
+        except shop_floor.MachineNotFound:
+            savepoint.rollback()
+            results[index] = SyncEntryResult(
+                idempotency_key=key, type=entry.type,
+                status=SyncEntryStatusEnum.FAILED, detail="Machine not found"
+            )
+            continue
+        except IntegrityError as e:
+            savepoint.rollback()
+            if getattr(e.orig, "pgcode", None) == UNIQUE_VIOLATION:
+                # The same key was committed concurrently by another request
+                results[index] = SyncEntryResult(
+                    idempotency_key=key, type=entry.type, status=SyncEntryStatusEnum.DUPLICATE
+                )
+            else:
+                results[index] = SyncEntryResult(
+                    idempotency_key=key, type=entry.type,
+                    status=SyncEntryStatusEnum.FAILED, detail="Referenced record not found"
+                )
+            continue
+
+        known[key] = record.id
+        created.setdefault(entry.type, []).append((key, record, payload))
+        results[index] = SyncEntryResult(
+            idempotency_key=key, type=entry.type,
+            status=SyncEntryStatusEnum.CREATED, record_id=record.id
+        )
+
+    db.commit()
+    for records in created.values():
+        for key, _, _ in records:
+            recent_keys.add(key, known[key])
+
+    statuses = [r.status for r in results]
+    response = SyncBatchResponse(
+        created=statuses.count(SyncEntryStatusEnum.CREATED),
+        duplicates=statuses.count(SyncEntryStatusEnum.DUPLICATE),
+        rejected=statuses.count(SyncEntryStatusEnum.INVALID) + statuses.count(SyncEntryStatusEnum.FAILED),
+        results=results
+    )
+    return response, created
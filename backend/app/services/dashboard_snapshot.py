@@ -0,0 +1,241 @@
+"""
+Precomputed Dashboard Overview Snapshot
+
+The overview is rebuilt in the background every DASHBOARD_SNAPSHOT_INTERVAL
+seconds, shortly after any relevant write (see invalidate()), and just before
+and after each shift change. The result is kept as pre-serialized JSON bytes,
+so serving /dashboard/overview never touches the database. The ETag is a
+hash of those bytes, so it is the same across worker processes.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.http_cache import make_etag
+from app.db.database import SessionLocal
+from app.models import (
+    Alert, AlertSeverity, AlertStatus, Machine, MachineStatus, QualityCheck, Plant, WorkforceRecord
+)
+from app.schemas import (
+    DashboardOverview, MachineOverview, KPIOverview, WorkforceOverview, ScrapOverview
+)
+from app.services import kpi_counters
+from app.services.plant_calendar import current_production_date, next_shift_change
+
+logger = logging.getLogger(__name__)
+
+
+def build_dashboard_overview(db: Session) -> DashboardOverview:
+    """Compute the full dashboard overview from the database."""
+    # Tile counts come from the incrementally maintained counters
+    today_keys = kpi_counters.scrap_keys(current_production_date())
+    counters = kpi_counters.read(db, [
+        kpi_counters.MACHINES_TOTAL,
+        *(kpi_counters.machine_status_key(status) for status in MachineStatus),
+        kpi_counters.WORK_ORDERS_ACTIVE,
+        kpi_counters.MAINTENANCE_OPEN,
+        *today_keys.values()
+    ])
+
+    # Machine statistics
+    machine_overview = MachineOverview(
+        total=int(counters[kpi_counters.MACHINES_TOTAL]),
+        running=int(counters[kpi_counters.machine_status_key(MachineStatus.RUNNING)]),
+        idle=int(counters[kpi_counters.machine_status_key(MachineStatus.IDLE)]),
+        stopped=int(counters[kpi_counters.machine_status_key(MachineStatus.STOPPED)]),
+        maintenance=int(counters[kpi_counters.machine_status_key(MachineStatus.MAINTENANCE)])
+    )
+
+    # Calculate overall OEE
+    overall_oee = db.query(func.avg(Machine.oee)).filter(
+        Machine.status == MachineStatus.RUNNING.value
+    ).scalar() or 0
+
+    # Capacity utilization
+    plants = db.query(Plant).all()
+    if plants:
+        total_design = sum(p.design_capacity_mt for p in plants)
+        total_actual = sum(p.current_capacity_mt for p in plants)
+        capacity_util = (total_actual / total_design) * 100 if total_design > 0 else 0
+    else:
+        capacity_util = 25.0  # Default based on document analysis
+
+    # Quality rate (last 24 hours)
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    quality_checks = db.query(QualityCheck).filter(
+        QualityCheck.timestamp >= yesterday
+    ).all()
+    quality_rate = (len([q for q in quality_checks if q.passed]) / len(quality_checks) * 100) if quality_checks else 98.5
+
+    kpi_overview = KPIOverview(
+        overall_oee=round(overall_oee, 2),
+        capacity_utilization=round(capacity_util, 2),
+        active_work_orders=int(counters[kpi_counters.WORK_ORDERS_ACTIVE]),
+        pending_maintenance=int(counters[kpi_counters.MAINTENANCE_OPEN]),
+        quality_rate=round(quality_rate, 2),
+        scrap_rate=1.5  # Would calculate from actual data
+    )
+
+    # Workforce
+    workforce_records = db.query(WorkforceRecord).order_by(
+        WorkforceRecord.date.desc()
+    ).first()
+
+    if workforce_records:
+        workforce_overview = WorkforceOverview(
+            total_on_shift=workforce_records.filled_positions,
+            total_vacancies=workforce_records.vacancies,
+            vacancy_rate=round((workforce_records.vacancies / workforce_records.total_positions) * 100, 2)
+        )
+    else:
+        # Default based on document analysis
+        workforce_overview = WorkforceOverview(
+            total_on_shift=137,
+            total_vacancies=114,
+            vacancy_rate=45.4
+        )
+
+    # Scrap today
+    scrap_overview = ScrapOverview(
+        weight_kg=counters[today_keys["weight_kg"]],
+        value_usd=counters[today_keys["value_usd"]],
+        value_sar=counters[today_keys["value_sar"]]
+    )
+
+    # Unacknowledged open alerts, errors first (maintained by the alert engine)
+    severity_rank = case(
+        (Alert.severity == AlertSeverity.ERROR.value, 0),
+        (Alert.severity == AlertSeverity.WARNING.value, 1),
+        else_=2
+    )
+    open_alerts = db.query(Alert).filter(
+        Alert.resolved_at.is_(None),
+        Alert.status == AlertStatus.ACTIVE.value
+    ).order_by(severity_rank, Alert.last_seen_at.desc()).limit(10).all()
+    alerts = [
+        {
+            "id": a.id,
+            "type": a.severity,
+            "title": a.title,
+            "message": a.message,
+            "machine_id": a.machine_id,
+            "rule": a.rule,
+            "timestamp": a.first_seen_at.isoformat()
+        }
+        for a in open_alerts
+    ]
+
+    return DashboardOverview(
+        timestamp=datetime.utcnow(),
+        machines=machine_overview,
+        kpis=kpi_overview,
+        workforce=workforce_overview,
+        scrap_today=scrap_overview,
+        alerts=alerts
+    )
+
+
+class DashboardSnapshot:
+    """Holds the latest serialized overview and keeps it fresh."""
+
+    def __init__(self):
+        self.payload: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.version = 0
+        self.generated_at: Optional[datetime] = None
+        self.build_seconds = 0.0
+        self._dirty: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Rebuild the snapshot synchronously (runs in a worker thread)."""
+        started = time.perf_counter()
+        with tracing.job("dashboard.snapshot.refresh"):
+            db = SessionLocal()
+            try:
+                overview = build_dashboard_overview(db)
+            finally:
+                db.close()
+            with tracing.span("dashboard.snapshot.serialize"):
+                payload = overview.model_dump_json().encode()
+            etag = make_etag(payload)
+
+        with self._lock:
+            self.payload = payload
+            self.etag = etag
+            self.version += 1
+            self.generated_at = overview.timestamp
+            self.build_seconds = time.perf_counter() - started
+
+    def get(self):
+        """Return (payload, etag, version, generated_at), building on first use."""
+        tracing.add_event("cache.miss" if self.payload is None else "cache.hit", cache="dashboard.snapshot")
+        if self.payload is None:
+            self.refresh()
+        with self._lock:
+            return self.payload, self.etag, self.version, self.generated_at
+
+    def invalidate(self):
+        """Ask the refresher to rebuild soon. Safe to call from any thread."""
+        if self._loop is None or self._dirty is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._dirty.set)
+        except RuntimeError:
+            pass  # Event loop already closed during shutdown
+
+    async def _run(self):
+        while True:
+            now = datetime.now(ZoneInfo(settings.PLANT_TIMEZONE))
+            shift_change = next_shift_change(now)
+            warmup_at = shift_change - timedelta(seconds=settings.DASHBOARD_SNAPSHOT_WARMUP_SECONDS)
+            # Wake up before the shift change, then again right after it
+            wake_at = warmup_at if warmup_at > now else shift_change + timedelta(seconds=1)
+            timeout = min(settings.DASHBOARD_SNAPSHOT_INTERVAL, (wake_at - now).total_seconds())
+
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=max(timeout, 0.0))
+                # Coalesce a burst of writes into one rebuild
+                await asyncio.sleep(settings.DASHBOARD_SNAPSHOT_DEBOUNCE)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+
+            try:
+                await run_in_threadpool(self.refresh)
+            except Exception:
+                logger.exception("Dashboard snapshot refresh failed")
+
+    async def start(self):
+        """Build the first snapshot and start the background refresher."""
+        self._loop = asyncio.get_running_loop()
+        self._dirty = asyncio.Event()
+        try:
+            await run_in_threadpool(self.refresh)
+        except Exception:
+            logger.exception("Initial dashboard snapshot failed")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+dashboard_snapshot = DashboardSnapshot()
@@ -0,0 +1,104 @@
+"""
+Time-Series Downsampling for Charts
+
+A chart needs a few thousand points whatever range it shows. Time-series
+endpoints accept ?max_points=N and pick at most N readings with
+Largest-Triangle-Three-Buckets (LTTB): the series is cut into N - 2 buckets
+and from each one the point forming the largest triangle with the previous
+pick and the next bucket's average is kept. Peaks and dips survive, unlike
+with plain decimation or averaging.
+
+Readings are fetched as NumPy columns through a server-side cursor
+(stream_columns), so only the numeric columns of the range are held in
+memory, never the ORM rows.
+"""
+import uuid
+from typing import List, Sequence
+
+import numpy as np
+from sqlalchemy import Float, cast, func
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+
+
+def epoch_ms(column):
+    """SQL expression: a timestamp column as float Unix epoch milliseconds."""
+    return cast(func.extract("epoch", column), Float) * 1000
+
+
+def stream_columns(db: Session, stmt: Select, chunk_size: int = settings.CHART_FETCH_CHUNK) -> List[np.ndarray]:
+    """
+    Run stmt through a server-side cursor and return one float64 array per
+    selected column (NULL becomes NaN).
+
+    Reads the DBAPI cursor directly: building SQLAlchemy rows for a range of
+    readings costs more than the query and the array conversion together.
+    Parameters still go through their types' bind processors, so e.g. an
+    Enum filter sends the stored label.
+    """
+    dialect = db.get_bind().dialect
+    compiled = stmt.compile(dialect=dialect)
+    params = compiled.construct_params()
+    for name, bind in compiled.binds.items():
+        process = bind.type.dialect_impl(dialect).bind_processor(dialect)
+        if process is not None and name in params:
+            params[name] = process(params[name])
+    # A named psycopg2 cursor fetches chunk_size rows per round trip
+    cursor = db.connection().connection.cursor(name=f"series_{uuid.uuid4().hex}")
+    try:
+        cursor.execute(str(compiled), params)
+        chunks = []
+        while rows := cursor.fetchmany(chunk_size):
+            chunks.append(np.array(rows, dtype=np.float64))
+    finally:
+        cursor.close()
+    data = np.concatenate(chunks) if chunks else np.empty((0, len(stmt.selected_columns)))
+    return list(data.T)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the n points LTTB keeps from (x, y), x ascending; all of them when n >= len(x)."""
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+
+    # n - 2 buckets over the inner points; the first and last points are always kept
+    inner_x, inner_y = x[1:-1], y[1:-1]
+    edges = np.linspace(0, size - 2, n - 1).astype(np.int64)
+    lengths = np.diff(edges)
+    average_x = np.add.reduceat(inner_x, edges[:-1]) / lengths
+    average_y = np.add.reduceat(inner_y, edges[:-1]) / lengths
+    next_x = np.append(average_x[1:], x[-1])
+    next_y = np.append(average_y[1:], y[-1])
+
+    selected = np.empty(n, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    a = 0
+    for bucket in range(n - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[a], y[a]
+        # Twice the triangle area, for every point of the bucket at once
+        area = np.abs((ax - next_x[bucket]) * (inner_y[lo:hi] - ay) - (ax - inner_x[lo:hi]) * (next_y[bucket] - ay))
+        a = lo + int(area.argmax()) + 1
+        selected[bucket + 1] = a
+    return selected
+
+
+def downsample_indices(x: np.ndarray, series: Sequence[np.ndarray], max_points: int) -> np.ndarray:
+    """
+    Sorted indices of at most max_points readings keeping the shape of every
+    series, x ascending: the points are shared equally between the series
+    with at least 3 readings (NaN ones are skipped). Without any such series
+    the readings are picked evenly.
+    """
+    if len(x) <= max_points:
+        return np.arange(len(x))
+    valid = [np.flatnonzero(~np.isnan(y)) for y in series]
+    usable = [(y, indices) for y, indices in zip(series, valid) if len(indices) >= 3]
+    if not usable:
+        return np.unique(np.linspace(0, len(x) - 1, max_points).astype(np.int64))
+    share = max(max_points // len(usable), 3)
+    picks = [indices[lttb_indices(x[indices], y[indices], share)] for y, indices in usable]
+    return np.unique(np.concatenate(picks))
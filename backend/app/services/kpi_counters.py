@@ -0,0 +1,236 @@
+"""
+Incrementally Maintained KPI Counters
+
+Dashboard tiles (machines by status, active work orders, open maintenance,
+scrap per day) are kept in the kpi_counters table. Every router write that
+changes one of them adjusts the counter with an upsert in the same
+transaction, so readers get them with a single primary-key lookup.
+
+`python -m app.services.kpi_counters reconcile` rebuilds every counter from
+the source tables and reports any drift; pass --dry-run to only report.
+"""
+import argparse
+import sys
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import (
+    KPICounter, Machine, MachineStatus, WorkOrder, WorkOrderStatus,
+    MaintenanceTask, MaintenanceStatus, ScrapEntry, ProductionCalendar
+)
+from app.services import plant_calendar
+
+MACHINES_TOTAL = "machines.total"
+WORK_ORDERS_ACTIVE = "work_orders.in_progress"
+MAINTENANCE_OPEN = "maintenance_tasks.open"
+
+OPEN_MAINTENANCE = (MaintenanceStatus.PENDING.value, MaintenanceStatus.IN_PROGRESS.value)
+
+# Per-day scrap counters older than this are dropped on reconcile
+SCRAP_RETENTION_DAYS = 31
+
+
+def machine_status_key(status) -> str:
+    return f"machines.status.{_value(status)}"
+
+
+def scrap_keys(day: date) -> Dict[str, str]:
+    """Counter keys for the scrap totals of one production date."""
+    return {
+        "weight_kg": f"scrap.weight_kg:{day.isoformat()}",
+        "value_usd": f"scrap.value_usd:{day.isoformat()}",
+        "value_sar": f"scrap.value_sar:{day.isoformat()}",
+    }
+
+
+def _value(status) -> Optional[str]:
+    return getattr(status, "value", status)
+
+
+# ============== Adjusting ==============
+
+def adjust(db: Session, deltas: Dict[str, float]):
+    """Add deltas to counters inside the caller's transaction (upsert)."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    stmt = insert(KPICounter).values([
+        {"key": key, "value": delta} for key, delta in sorted(deltas.items())  # sorted: stable lock order
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[KPICounter.key],
+        set_={"value": KPICounter.value + stmt.excluded.value, "updated_at": func.now()}
+    )
+    db.execute(stmt)
+
+
+def _transition(old_key: Optional[str], new_key: Optional[str]) -> Dict[str, float]:
+    if old_key == new_key:
+        return {}
+    deltas = {}
+    if old_key:
+        deltas[old_key] = -1
+    if new_key:
+        deltas[new_key] = deltas.get(new_key, 0) + 1
+    return deltas
+
+
+def machine_status_changed(db: Session, old_status, new_status):
+    """Record a machine status change; None means created / deleted."""
+    deltas = _transition(
+        machine_status_key(old_status) if old_status is not None else None,
+        machine_status_key(new_status) if new_status is not None else None
+    )
+    if old_status is None:
+        deltas[MACHINES_TOTAL] = 1
+    elif new_status is None:
+        deltas[MACHINES_TOTAL] = -1
+    adjust(db, deltas)
+
+
+def work_order_status_changed(db: Session, old_status, new_status):
+    """Record a work order status change; None means created / deleted."""
+    active = WorkOrderStatus.IN_PROGRESS.value
+    adjust(db, _transition(
+        WORK_ORDERS_ACTIVE if _value(old_status) == active else None,
+        WORK_ORDERS_ACTIVE if _value(new_status) == active else None
+    ))
+
+
+def maintenance_status_changed(db: Session, old_status, new_status):
+    """Record a maintenance task status change; None means created / deleted."""
+    adjust(db, _transition(
+        MAINTENANCE_OPEN if _value(old_status) in OPEN_MAINTENANCE else None,
+        MAINTENANCE_OPEN if _value(new_status) in OPEN_MAINTENANCE else None
+    ))
+
+
+def scrap_entry_added(db: Session, entry: ScrapEntry):
+    """Add a new scrap entry to its day's totals."""
+    keys = scrap_keys(plant_calendar.production_date_of(entry.timestamp))
+    adjust(db, {
+        keys["weight_kg"]: entry.weight_kg,
+        keys["value_usd"]: entry.financial_value_usd or 0,
+        keys["value_sar"]: entry.financial_value_sar or 0,
+    })
+
+
+# ============== Reading ==============
+
+def read(db: Session, keys: Iterable[str]) -> Dict[str, float]:
+    """Fetch counters by key; missing counters read as 0."""
+    keys = list(keys)
+    values = dict(db.query(KPICounter.key, KPICounter.value).filter(KPICounter.key.in_(keys)).all())
+    return {key: values.get(key, 0.0) for key in keys}
+
+
+# ============== Reconciliation ==============
+
+def compute_expected(db: Session) -> Dict[str, float]:
+    """Recompute every counter from the source tables."""
+    expected = {MACHINES_TOTAL: 0.0}
+    for status in MachineStatus:
+        expected[machine_status_key(status)] = 0.0
+    for status, count in db.query(Machine.status, func.count(Machine.id)).group_by(Machine.status):
+        expected[machine_status_key(status)] = float(count)
+        expected[MACHINES_TOTAL] += count
+
+    expected[WORK_ORDERS_ACTIVE] = float(db.query(func.count(WorkOrder.id)).filter(
+        WorkOrder.status == WorkOrderStatus.IN_PROGRESS.value
+    ).scalar())
+    expected[MAINTENANCE_OPEN] = float(db.query(func.count(MaintenanceTask.id)).filter(
+        MaintenanceTask.status.in_(OPEN_MAINTENANCE)
+    ).scalar())
+
+    since = plant_calendar.current_production_date() - timedelta(days=SCRAP_RETENTION_DAYS)
+    scrap_day = ProductionCalendar.production_date
+    rows = db.query(
+        scrap_day,
+        func.sum(ScrapEntry.weight_kg),
+        func.sum(func.coalesce(ScrapEntry.financial_value_usd, 0)),
+        func.sum(func.coalesce(ScrapEntry.financial_value_sar, 0))
+    ).join(ProductionCalendar, plant_calendar.calendar_bucket(ScrapEntry.timestamp)).filter(
+        scrap_day >= since
+    ).group_by(scrap_day)
+    for day, weight, usd, sar in rows:
+        keys = scrap_keys(day)
+        expected[keys["weight_kg"]] = float(weight or 0)
+        expected[keys["value_usd"]] = float(usd or 0)
+        expected[keys["value_sar"]] = float(sar or 0)
+
+    return expected
+
+
+def reconcile(db: Session, apply: bool = True) -> List[Dict]:
+    """
+    Rebuild all counters from scratch and return the drift that was found.
+
+    Locks kpi_counters for the duration so concurrent writers wait at their
+    counter upsert; their base-table changes and deltas land after the rebuild.
+    """
+    db.execute(text("LOCK TABLE kpi_counters IN EXCLUSIVE MODE"))
+    stored = dict(db.query(KPICounter.key, KPICounter.value).all())
+    expected = compute_expected(db)
+
+    drift = []
+    for key in sorted(set(stored) | set(expected)):
+        actual = stored.get(key)
+        wanted = expected.get(key, 0.0)
+        if actual is None or abs(actual - wanted) > 1e-6 * max(1.0, abs(wanted)):
+            drift.append({"key": key, "stored": actual, "expected": wanted})
+
+    if apply:
+        stale = set(stored) - set(expected)
+        if stale:
+            db.query(KPICounter).filter(KPICounter.key.in_(stale)).delete(synchronize_session=False)
+        stmt = insert(KPICounter).values([{"key": k, "value": v} for k, v in expected.items()])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[KPICounter.key],
+            set_={"value": stmt.excluded.value, "updated_at": func.now()}
+        ))
+        db.commit()
+    else:
+        db.rollback()
+
+    return drift
+
+
+def ensure_initialized(db: Session):
+    """Build the counters on first start, when the table is still empty."""
+    if db.query(KPICounter.key).first() is None:
+        reconcile(db)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain dashboard KPI counters")
+    parser.add_argument("command", choices=["reconcile"])
+    parser.add_argument("--dry-run", action="store_true", help="Report drift without fixing it")
+    args = parser.parse_args(argv)
+
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        drift = reconcile(db, apply=not args.dry_run)
+    finally:
+        db.close()
+
+    if not drift:
+        print("✅ All KPI counters match the source tables")
+        return 0
+
+    print(f"{'Key':<40} {'Stored':>14} {'Expected':>14}")
+    for row in drift:
+        stored = "missing" if row["stored"] is None else f"{row['stored']:.2f}"
+        print(f"{row['key']:<40} {stored:>14} {row['expected']:>14.2f}")
+    action = "found (dry run, nothing changed)" if args.dry_run else "fixed"
+    print(f"⚠️  {len(drift)} counter(s) drifted, {action}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
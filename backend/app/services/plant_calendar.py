@@ -0,0 +1,214 @@
+"""
+Plant Calendar
+
+Production time follows the plant's local clock (PLANT_TIMEZONE):
+
+- shifts start at SHIFT_START_HOURS (06:00 morning, 14:00 evening, 22:00 night);
+- a production date begins with its first shift, so 00:00-06:00 still
+  belongs to the previous date's night shift;
+- weeks start on WEEK_START_DAY (Saturday); WEEKEND_DAYS (Friday) are not
+  working days and have no planned time.
+
+The rules are applied in one place, _attributes(), over a vector of UTC
+timestamps. It fills the production_calendar table (one row per UTC hour,
+which SQL aggregations join through calendar_bucket()) and backs
+bucketize() for NumPy / pandas data in process. The scalar helpers
+(production_date_of, shift_at, day_bounds) give single values by the same
+rules for request handling and the ingest path.
+
+Hour buckets assume shifts start on whole local hours and the plant's UTC
+offset is a whole number of hours, as for Asia/Riyadh.
+
+`python -m app.services.plant_calendar fill --start 2024-01-01 --end 2028-01-01`
+(re)writes a range, e.g. after changing the shift hours; the server keeps
+CALENDAR_PAST_DAYS .. CALENDAR_FUTURE_DAYS around today filled on startup.
+"""
+import argparse
+import sys
+from bisect import bisect_right
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import ProductionCalendar, Shift
+
+# In the order of SHIFT_START_HOURS
+SHIFTS = [Shift.MORNING, Shift.EVENING, Shift.NIGHT]
+
+FILL_BATCH = 5000
+
+
+def _start_hours():
+    return sorted(settings.SHIFT_START_HOURS)
+
+
+def _local(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)  # Naive timestamps are UTC throughout the app
+    return timestamp.astimezone(ZoneInfo(settings.PLANT_TIMEZONE))
+
+
+# ============== Vectorized ==============
+
+def _attributes(utc: pd.DatetimeIndex) -> pd.DataFrame:
+    """Calendar attributes of tz-aware timestamps, indexed by them."""
+    starts = _start_hours()
+    wall = utc.tz_convert(settings.PLANT_TIMEZONE).tz_localize(None)  # Local wall-clock time
+
+    # Last shift started at or before the hour; before the first start it is still the last one
+    shift_index = (np.searchsorted(starts, wall.hour, side="right") - 1) % len(starts)
+    shift_index = np.minimum(shift_index, len(SHIFTS) - 1)
+
+    production_date = (wall - pd.Timedelta(hours=starts[0])).normalize()
+    weekday = production_date.dayofweek.to_numpy()
+    week_start = production_date - pd.to_timedelta((weekday - settings.WEEK_START_DAY) % 7, unit="D")
+
+    return pd.DataFrame({
+        "production_date": production_date,
+        "shift": np.array([shift.value for shift in SHIFTS])[shift_index],
+        "week_start": week_start,
+        "working_day": ~np.isin(weekday, settings.WEEKEND_DAYS),
+    }, index=utc)
+
+
+def bucketize(timestamps) -> pd.DataFrame:
+    """
+    Calendar attributes (production_date, shift, week_start, working_day) of
+    many timestamps at once. Accepts datetimes (naive ones are UTC) or Unix
+    epoch milliseconds, e.g. the telemetry ring buffers.
+    """
+    values = np.asarray(timestamps)
+    unit = "ms" if np.issubdtype(values.dtype, np.number) else None
+    return _attributes(pd.DatetimeIndex(pd.to_datetime(values, unit=unit, utc=True)))
+
+
+def calendar_frame(start: date, end: date) -> pd.DataFrame:
+    """production_calendar rows for the production dates start .. end (exclusive)."""
+    first, _ = day_bounds(start)
+    last, _ = day_bounds(end)
+    frame = _attributes(pd.date_range(first, last, freq="h", inclusive="left"))
+    frame["planned_minutes"] = np.where(frame["working_day"], 60, 0)
+    return frame
+
+
+# ============== Single values ==============
+
+def production_date_of(timestamp: datetime) -> date:
+    local = _local(timestamp).replace(tzinfo=None)
+    return (local - timedelta(hours=_start_hours()[0])).date()
+
+
+def current_production_date() -> date:
+    return production_date_of(datetime.now(timezone.utc))
+
+
+def week_start_of(day: date) -> date:
+    return day - timedelta(days=(day.weekday() - settings.WEEK_START_DAY) % 7)
+
+
+def shift_at(timestamp: datetime) -> Shift:
+    starts = _start_hours()
+    index = (bisect_right(starts, _local(timestamp).hour) - 1) % len(starts)
+    return SHIFTS[min(index, len(SHIFTS) - 1)]
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """UTC start and end of a production date (first shift to first shift)."""
+    tz = ZoneInfo(settings.PLANT_TIMEZONE)
+    first = time(_start_hours()[0])
+    start = datetime.combine(day, first, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), first, tzinfo=tz)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+
+def day_bounds_of(day: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Bounds for a `date` query parameter: its calendar day, or the current production date."""
+    return day_bounds(day.date() if day else current_production_date())
+
+
+def next_shift_change(now: datetime) -> datetime:
+    """Next shift start (06:00 / 14:00 / 22:00 plant time) after `now`."""
+    tz = ZoneInfo(settings.PLANT_TIMEZONE)
+    local = now.astimezone(tz)
+    for day_offset in (0, 1):
+        day = local.date() + timedelta(days=day_offset)
+        for hour in _start_hours():
+            candidate = datetime(day.year, day.month, day.day, hour, tzinfo=tz)
+            if candidate > local:
+                return candidate
+    raise AssertionError("SHIFT_START_HOURS must not be empty")
+
+
+# ============== Table ==============
+
+def calendar_bucket(column):
+    """Join condition from a timestamptz column to its production_calendar row."""
+    return ProductionCalendar.bucket_start == func.date_trunc("hour", column, "UTC")
+
+
+def fill(db: Session, start: date, end: date, replace: bool = False) -> int:
+    """Write the calendar rows of start .. end; existing rows are kept unless replace."""
+    frame = calendar_frame(start, end)
+    rows = [
+        {
+            "bucket_start": bucket_start, "production_date": production_date, "shift": Shift(shift),
+            "week_start": week_start, "working_day": bool(working_day), "planned_minutes": int(planned)
+        }
+        for bucket_start, production_date, shift, week_start, working_day, planned in zip(
+            frame.index.to_pydatetime(), frame["production_date"].dt.date, frame["shift"],
+            frame["week_start"].dt.date, frame["working_day"], frame["planned_minutes"]
+        )
+    ]
+    for i in range(0, len(rows), FILL_BATCH):
+        stmt = insert(ProductionCalendar).values(rows[i:i + FILL_BATCH])
+        if replace:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProductionCalendar.bucket_start],
+                set_={name: stmt.excluded[name] for name in rows[0] if name != "bucket_start"}
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[ProductionCalendar.bucket_start])
+        db.execute(stmt)
+    db.commit()
+    return len(rows)
+
+
+def ensure_filled(db: Session):
+    """Fill the configured range around today if the table does not cover it yet."""
+    today = current_production_date()
+    start = today - timedelta(days=settings.CALENDAR_PAST_DAYS)
+    end = today + timedelta(days=settings.CALENDAR_FUTURE_DAYS)
+    first, last = db.query(
+        func.min(ProductionCalendar.production_date), func.max(ProductionCalendar.production_date)
+    ).one()
+    if first is None or first > start or last < end - timedelta(days=1):
+        fill(db, start, end)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the production calendar table")
+    parser.add_argument("command", choices=["fill"])
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First production date")
+    parser.add_argument("--end", type=date.fromisoformat, required=True, help="Production date after the last one")
+    args = parser.parse_args(argv)
+
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = fill(db, args.start, args.end, replace=True)
+    finally:
+        db.close()
+    print(f"Wrote {count} calendar hours")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Unified Search
+
+Searches work orders, maintenance tasks, downtime logs, machines, employees
+and plants in one query. Each source matches on its search columns
+(app.models.search):
+
+- word prefixes through search_vector ("bear" finds "bearing");
+- substrings and near misses through the pg_trgm index on search_document
+  (ILIKE '%...%' and word similarity) for queries of 3+ characters, when the
+  extension is installed.
+
+The rank is ts_rank_cd plus the trigram word similarity, and an exact id
+match always comes first. Every source is limited and ordered by rank on its
+own, then the branches are merged with UNION ALL, so one round trip returns
+the best matches overall.
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from sqlalchemy import String, case, cast, func, literal, null, or_, select, text, union_all
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+
+from app.models import Machine, Employee, WorkOrder, DowntimeLog, MaintenanceTask, Plant
+from app.models.search import ARABIC_ARTICLE, ARABIC_FROM, ARABIC_TO
+from app.schemas import SearchEntityEnum, SearchHit
+
+_ARABIC = str.maketrans(ARABIC_FROM[:len(ARABIC_TO)], ARABIC_TO, ARABIC_FROM[len(ARABIC_TO):])
+_ARABIC_ARTICLE = re.compile(ARABIC_ARTICLE)
+SIMPLE = cast(literal("simple"), REGCONFIG)
+MAX_TERMS = 8
+TRIGRAM_MIN_LENGTH = 3  # Shorter patterns cannot use a trigram index
+
+_trigram_available: Optional[bool] = None
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    model: Any
+    id: Any
+    title: Any
+    subtitle: Any = None
+    machine_id: Any = None
+
+
+SOURCES = {
+    SearchEntityEnum.WORK_ORDER: SearchSource(
+        WorkOrder, WorkOrder.id, WorkOrder.product, WorkOrder.customer, WorkOrder.machine_id
+    ),
+    SearchEntityEnum.MAINTENANCE_TASK: SearchSource(
+        MaintenanceTask, MaintenanceTask.id, MaintenanceTask.title, MaintenanceTask.assignee,
+        MaintenanceTask.machine_id
+    ),
+    SearchEntityEnum.DOWNTIME_LOG: SearchSource(
+        DowntimeLog, cast(DowntimeLog.id, String), DowntimeLog.reason, DowntimeLog.resolution,
+        DowntimeLog.machine_id
+    ),
+    SearchEntityEnum.MACHINE: SearchSource(Machine, Machine.id, Machine.name, Machine.area, Machine.id),
+    SearchEntityEnum.EMPLOYEE: SearchSource(Employee, cast(Employee.id, String), Employee.name, Employee.name_ar),
+    SearchEntityEnum.PLANT: SearchSource(Plant, Plant.id, Plant.name, Plant.name_ar),
+}
+
+
+def normalize_arabic(value: str) -> str:
+    """Python twin of the normalize_arabic() SQL function."""
+    return _ARABIC_ARTICLE.sub(r"\1\2", value.translate(_ARABIC))
+
+
+def trigram_available(db: Session) -> bool:
+    """Whether pg_trgm is installed (checked once per process)."""
+    global _trigram_available
+    if _trigram_available is None:
+        _trigram_available = bool(db.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        ).scalar())
+    return _trigram_available
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def _prefix_query(db: Session, normalized: str) -> Optional[str]:
+    """
+    to_tsquery() text matching every word of the query as a prefix.
+
+    The words come from PostgreSQL's own parser, so they split the same way
+    as the stored documents ("BENCH-01" is "bench" and "-01").
+    """
+    lexemes = db.execute(
+        select(func.tsvector_to_array(func.to_tsvector(SIMPLE, normalized)))
+    ).scalar() or []
+    quoted = ("'" + lexeme.replace("\\", "\\\\").replace("'", "''") + "'" for lexeme in lexemes[:MAX_TERMS])
+    return " & ".join(f"{lexeme}:*" for lexeme in quoted) or None
+
+
+def search(db: Session, query: str, entities: List[SearchEntityEnum], limit: int) -> List[SearchHit]:
+    normalized = normalize_arabic(query).strip()
+    prefix_query = _prefix_query(db, normalized)
+    if prefix_query is None:
+        return []
+
+    tsquery = func.to_tsquery(SIMPLE, prefix_query)
+    trigram = len(normalized) >= TRIGRAM_MIN_LENGTH and trigram_available(db)
+
+    branches = []
+    for entity in entities:
+        source = SOURCES[entity]
+        document = source.model.search_document
+        vector = source.model.search_vector
+
+        matches = [vector.op("@@")(tsquery)]
+        rank = func.ts_rank_cd(vector, tsquery)
+        if trigram:
+            matches.append(document.ilike(f"%{_escape_like(normalized)}%", escape="!"))
+            matches.append(literal(normalized).op("<%")(document))
+            rank = rank + func.word_similarity(normalized, document)
+        rank = rank + case((func.lower(source.id) == query.strip().lower(), 10.0), else_=0.0)
+
+        branch = select(
+            literal(entity.value).label("type"),
+            source.id.label("id"),
+            source.title.label("title"),
+            (source.subtitle if source.subtitle is not None else null()).label("subtitle"),
+            (source.machine_id if source.machine_id is not None else null()).label("machine_id"),
+            rank.label("rank")
+        ).where(or_(*matches)).order_by(rank.desc()).limit(limit)
+        branches.append(select(branch.subquery()))
+
+    merged = union_all(*branches).subquery()
+    rows = db.execute(select(merged).order_by(merged.c.rank.desc()).limit(limit)).all()
+    return [SearchHit(**row._mapping) for row in rows]
@@ -0,0 +1,143 @@
+"""
+Shop-Floor Entry Recording
+
+Adds production logs, downtime logs, quality checks and scrap entries to the
+session without committing, so the single-entry endpoints and the offline
+batch sync (app.services.batch_sync) share the same rules and side effects.
+The caller commits and runs post-commit work (snapshot invalidation, live
+ring buffers).
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Machine, Employee, ProductionLog, DowntimeLog, QualityCheck, ScrapEntry
+from app.schemas import ProductionLogCreate, DowntimeLogCreate, QualityCheckCreate, ScrapEntryCreate
+from app.services import kpi_counters
+
+
+class MachineNotFound(LookupError):
+    """The entry references a machine that does not exist."""
+
+
+def _get_machine(db: Session, machine_id: str) -> Machine:
+    machine = db.query(Machine).filter(Machine.id == machine_id).first()
+    if not machine:
+        raise MachineNotFound(machine_id)
+    return machine
+
+
+def _operator_id(db: Session, operator_name: Optional[str]) -> Optional[int]:
+    if not operator_name:
+        return None
+    operator = db.query(Employee).filter(Employee.name == operator_name).first()
+    return operator.id if operator else None
+
+
+def add_production_log(db: Session, log: ProductionLogCreate) -> ProductionLog:
+    """Add a production log and update the machine's current speed / temperature."""
+    machine = _get_machine(db, log.machine_id)
+
+    db_log = ProductionLog(
+        machine_id=log.machine_id,
+        operator_id=_operator_id(db, log.operator_name),
+        shift=log.shift.value,
+        timestamp=log.timestamp or datetime.utcnow(),
+        speed=log.speed,
+        target_speed=machine.target_speed,
+        temperature=log.temperature,
+        pressure=log.pressure,
+        output_length=log.output_length,
+        output_weight=log.output_weight,
+        notes=log.notes
+    )
+
+    # Update machine status
+    machine.speed = log.speed
+    if log.temperature:
+        machine.temperature = log.temperature
+    machine.updated_at = datetime.utcnow()
+
+    db.add(db_log)
+    return db_log
+
+
+def add_downtime_log(db: Session, log: DowntimeLogCreate) -> DowntimeLog:
+    """Add a downtime log."""
+    _get_machine(db, log.machine_id)
+
+    db_log = DowntimeLog(
+        machine_id=log.machine_id,
+        shift=log.shift.value,
+        timestamp=log.timestamp or datetime.utcnow(),
+        downtime_type=log.downtime_type.value,
+        duration_minutes=log.duration_minutes,
+        reason=log.reason,
+        resolution=log.resolution,
+        is_planned=log.is_planned
+    )
+
+    db.add(db_log)
+    return db_log
+
+
+def add_quality_check(db: Session, check: QualityCheckCreate) -> QualityCheck:
+    """Add a quality check; it passes only if every test passed."""
+    _get_machine(db, check.machine_id)
+
+    passed = (
+        check.spark_test_passed and
+        check.tensile_test_passed and
+        check.visual_inspection_passed
+    )
+
+    db_check = QualityCheck(
+        machine_id=check.machine_id,
+        shift=check.shift.value,
+        timestamp=check.timestamp or datetime.utcnow(),
+        diameter=check.diameter,
+        diameter_tolerance=check.diameter_tolerance,
+        thickness=check.thickness,
+        concentricity=check.concentricity,
+        spark_test_passed=check.spark_test_passed,
+        spark_test_voltage=check.spark_test_voltage,
+        tensile_test_passed=check.tensile_test_passed,
+        tensile_strength=check.tensile_strength,
+        elongation=check.elongation,
+        visual_inspection_passed=check.visual_inspection_passed,
+        defect_type=check.defect_type,
+        defect_location=check.defect_location,
+        passed=passed,
+        notes=check.notes
+    )
+
+    db.add(db_check)
+    return db_check
+
+
+def add_scrap_entry(db: Session, entry: ScrapEntryCreate) -> ScrapEntry:
+    """Add a scrap entry valued at the configured LME copper price."""
+    _get_machine(db, entry.machine_id)
+
+    db_entry = ScrapEntry(
+        machine_id=entry.machine_id,
+        shift=entry.shift.value,
+        timestamp=entry.timestamp or datetime.utcnow(),
+        scrap_type=entry.scrap_type.value,
+        scrap_code=entry.scrap_code,
+        weight_kg=entry.weight_kg,
+        copper_content_percent=entry.copper_content_percent,
+        aluminum_content_percent=entry.aluminum_content_percent,
+        reason=entry.reason,
+        work_order_id=entry.work_order_id,
+        notes=entry.notes
+    )
+
+    # Calculate financial value
+    db_entry.calculate_financial_value(settings.LME_COPPER_PRICE)
+
+    db.add(db_entry)
+    kpi_counters.scrap_entry_added(db, db_entry)
+    return db_entry
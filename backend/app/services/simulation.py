@@ -0,0 +1,472 @@
+"""
+Discrete-Event Simulation of the Cable Production Route
+
+Models the plant as a flow line of stages (drawing -> stranding -> insulation
+-> armoring -> jacketing -> rewinding). Each stage is a pool of parallel
+machines with a finite WIP buffer in front of it. A job is one reel of
+finished cable; each stage processes `length_ratio` meters per finished meter
+(e.g. a 3-core cable needs 3 insulated cores per meter of cable).
+
+Machines fail at random (exponential time between stops) and are repaired
+after a lognormal delay, both fitted from DowntimeLog. A machine whose
+downstream buffer is full holds its reel and stays blocked until space frees
+up. The clock only covers on-shift time: every stage shares the shift
+pattern, so WIP simply freezes overnight and off-shift time can be dropped.
+
+Replications are independent and run in parallel on a process pool. Each
+scenario reuses the same seeds (common random numbers), so differences
+between scenarios reflect the what-if change rather than sampling noise.
+"""
+import heapq
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import (
+    Machine, MachineStatus, MachineType, DowntimeLog, ProductionLog,
+    Plant, WorkforceRecord
+)
+
+
+# Product route: (stage, machine types, meters processed per meter of finished cable)
+# Ratios describe a typical 3-core armored LV cable with 7-wire conductors.
+ROUTE = [
+    ("drawing", (MachineType.DRAWING,), 21.0),
+    ("stranding", (MachineType.BUNCHING, MachineType.STRANDING), 3.0),
+    ("insulation", (MachineType.EXTRUSION, MachineType.CV_LINE), 3.0),
+    ("armoring", (MachineType.ARMORING,), 1.0),
+    ("jacketing", (MachineType.JACKETING,), 1.0),
+    ("rewinding", (MachineType.REWINDING,), 1.0),
+]
+
+SHIFT_MINUTES = 8 * 60
+WORKING_DAYS_PER_YEAR = 300  # Six-day week (Friday off) less public holidays
+WORKING_DAY_FRACTION = 6 / 7
+
+# Fallbacks when DowntimeLog has too little history for a machine type
+MIN_EVENTS_FOR_FIT = 3
+DEFAULT_MTBF_MINUTES = 40 * 60
+DEFAULT_REPAIR_MEDIAN_MINUTES = 45.0
+DEFAULT_REPAIR_SIGMA = 0.8
+DEFAULT_PLANNED_LOSS = 0.10
+DEFAULT_KG_PER_METER = 0.5
+DEFAULT_BUFFER_REELS = 10
+
+# Machine states
+_IDLE, _BUSY, _BLOCKED, _DOWN = 0, 1, 2, 3
+
+# Event kinds
+_COMPLETE, _FAIL, _REPAIR = 0, 1, 2
+
+
+@dataclass
+class MachineSpec:
+    """Simulation parameters for one machine"""
+    id: str
+    speed_m_per_min: float
+    mtbf_minutes: float
+    repair_mu: float  # lognormal parameters of repair time in minutes
+    repair_sigma: float
+    planned_loss: float  # fraction of on-shift time lost to setups and breaks
+
+
+@dataclass
+class StageSpec:
+    """One step of the route: parallel machines fed by a WIP buffer"""
+    name: str
+    length_ratio: float
+    machines: List[MachineSpec]
+    crewed: int  # machines that have an operator; the rest stay parked
+    buffer_reels: int = DEFAULT_BUFFER_REELS
+
+
+@dataclass
+class LineModel:
+    """Route, machines and plant figures fitted from the database"""
+    area: Optional[str]
+    stages: List[StageSpec]
+    kg_per_meter: float
+    staffing_ratio: float
+    design_capacity_mt: float
+    current_capacity_mt: float
+    stopped_machines: List[MachineSpec] = field(default_factory=list)
+    stopped_stage: Dict[str, str] = field(default_factory=dict)
+
+
+# ============== Engine ==============
+
+def simulate_line(stages: List[StageSpec], horizon_minutes: float, reel_length_m: float,
+                  rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """
+    Run one replication and return finished reels plus per-stage time shares.
+
+    Shares are fractions of crewed machine-time spent busy, blocked, down and
+    starved (idle while up).
+    """
+    n_stages = len(stages)
+    machines = []  # (stage index, spec) for crewed machines only
+    for s, stage in enumerate(stages):
+        ranked = sorted(stage.machines, key=lambda m: m.speed_m_per_min, reverse=True)
+        machines.extend((s, spec) for spec in ranked[:stage.crewed])
+
+    n = len(machines)
+    stage_of = [s for s, _ in machines]
+    by_stage = [[i for i in range(n) if stage_of[i] == s] for s in range(n_stages)]
+    proc_time = [
+        reel_length_m * stages[s].length_ratio / spec.speed_m_per_min / (1.0 - spec.planned_loss)
+        for s, spec in machines
+    ]
+    capacity = [stage.buffer_reels for stage in stages]
+    buffer = [0] + [cap // 2 for cap in capacity[1:]]  # start with a half-full line
+
+    state = [_IDLE] * n
+    since = [0.0] * n
+    busy_until = [0.0] * n
+    remaining = [0.0] * n  # work left on a reel interrupted by a breakdown
+    version = [0] * n
+    acc = [[0.0] * 4 for _ in range(n)]  # time per state, plain lists are faster here
+    finished = 0
+    events = []
+    seq = 0
+    now = 0.0
+
+    def set_state(i, new_state):
+        acc[i][state[i]] += now - since[i]
+        state[i] = new_state
+        since[i] = now
+
+    def push(t, kind, i):
+        nonlocal seq
+        seq += 1
+        heapq.heappush(events, (t, seq, kind, i, version[i]))
+
+    def try_start(i):
+        s = stage_of[i]
+        if state[i] != _IDLE or (s > 0 and buffer[s] == 0):
+            return
+        if s > 0:
+            buffer[s] -= 1
+        set_state(i, _BUSY)
+        busy_until[i] = now + proc_time[i]
+        push(busy_until[i], _COMPLETE, i)
+        if s > 0:
+            release_blocked(s - 1)
+
+    def release_blocked(s):
+        # Space opened in front of stage s + 1: hand over reels held on stage s
+        for i in by_stage[s]:
+            if buffer[s + 1] >= capacity[s + 1]:
+                break
+            if state[i] == _BLOCKED:
+                buffer[s + 1] += 1
+                set_state(i, _IDLE)
+                try_start(i)
+        for j in by_stage[s + 1]:
+            try_start(j)
+
+    def finish(i):
+        nonlocal finished
+        s = stage_of[i]
+        if s == n_stages - 1:
+            finished += 1
+        elif buffer[s + 1] < capacity[s + 1]:
+            buffer[s + 1] += 1
+        else:
+            set_state(i, _BLOCKED)
+            return
+        set_state(i, _IDLE)
+        if s < n_stages - 1:
+            for j in by_stage[s + 1]:
+                try_start(j)
+        try_start(i)
+
+    for i, (_, spec) in enumerate(machines):
+        push(rng.exponential(spec.mtbf_minutes), _FAIL, i)
+    for i in range(n):
+        try_start(i)
+
+    while events:
+        t, _, kind, i, ver = heapq.heappop(events)
+        if t > horizon_minutes:
+            break
+        now = t
+        spec = machines[i][1]
+
+        if kind == _COMPLETE:
+            if ver != version[i] or state[i] != _BUSY:
+                continue
+            finish(i)
+        elif kind == _FAIL:
+            if state[i] == _BUSY:
+                remaining[i] = busy_until[i] - now
+                version[i] += 1  # invalidate the pending completion
+            else:
+                remaining[i] = -1.0 if state[i] == _BLOCKED else 0.0
+            set_state(i, _DOWN)
+            push(now + rng.lognormal(spec.repair_mu, spec.repair_sigma), _REPAIR, i)
+        elif kind == _REPAIR:
+            if remaining[i] > 0:
+                set_state(i, _BUSY)
+                busy_until[i] = now + remaining[i]
+                push(busy_until[i], _COMPLETE, i)
+            elif remaining[i] < 0:
+                set_state(i, _BLOCKED)
+                release_blocked(stage_of[i])
+            else:
+                set_state(i, _IDLE)
+                try_start(i)
+            remaining[i] = 0.0
+            push(now + rng.exponential(spec.mtbf_minutes), _FAIL, i)
+
+    now = horizon_minutes
+    for i in range(n):
+        set_state(i, state[i])
+
+    acc = np.array(acc).reshape(n, 4)
+    shares = np.zeros((n_stages, 4))
+    for s in range(n_stages):
+        if by_stage[s]:
+            shares[s] = acc[by_stage[s]].sum(axis=0) / (len(by_stage[s]) * horizon_minutes)
+
+    return {"finished_reels": finished, "stage_shares": shares}
+
+
+def _run_replications(stages: List[StageSpec], horizon_minutes: float, reel_length_m: float,
+                      seeds: List[int]) -> Dict[str, np.ndarray]:
+    """Worker entry point: run a chunk of replications, one seed each."""
+    reels = np.empty(len(seeds))
+    shares = np.empty((len(seeds), len(stages), 4))
+    for k, seed in enumerate(seeds):
+        result = simulate_line(stages, horizon_minutes, reel_length_m, np.random.default_rng(seed))
+        reels[k] = result["finished_reels"]
+        shares[k] = result["stage_shares"]
+    return {"finished_reels": reels, "stage_shares": shares}
+
+
+# ============== Process Pool ==============
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _worker_count() -> int:
+    return settings.SIMULATION_MAX_WORKERS or os.cpu_count() or 1
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Lazily start the shared process pool for replications."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=_worker_count())
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the process pool (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def run_replications(stages: List[StageSpec], horizon_minutes: float, reel_length_m: float,
+                     replications: int, seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Spread replications over the process pool and gather the results."""
+    seeds = [
+        int(s.generate_state(1)[0])
+        for s in np.random.SeedSequence(seed).spawn(replications)
+    ]
+    executor = get_executor()
+    n_chunks = min(replications, _worker_count() * 4)
+    chunks = [seeds[k::n_chunks] for k in range(n_chunks)]
+
+    futures = [
+        executor.submit(_run_replications, stages, horizon_minutes, reel_length_m, chunk)
+        for chunk in chunks
+    ]
+    results = [f.result() for f in futures]
+
+    return {
+        "finished_reels": np.concatenate([r["finished_reels"] for r in results]),
+        "stage_shares": np.concatenate([r["stage_shares"] for r in results]),
+    }
+
+
+# ============== Scenarios ==============
+
+def apply_scenario(model: LineModel, shifts_per_day: int, staffing_ratio: Optional[float],
+                   fixed_machine_ids: List[str], extra_machines: Dict[str, int],
+                   speed_factor: float = 1.0, downtime_reduction: float = 0.0,
+                   setup_reduction: float = 0.0, buffer_reels: Optional[int] = None) -> List[StageSpec]:
+    """Derive the stage list for a what-if scenario from the fitted model."""
+    ratio = staffing_ratio if staffing_ratio is not None else model.staffing_ratio
+    fixed = set(fixed_machine_ids)
+    median_mtbf = {
+        stage.name: float(np.median([m.mtbf_minutes for m in stage.machines]))
+        for stage in model.stages if stage.machines
+    }
+
+    stages = []
+    for stage in model.stages:
+        specs = list(stage.machines)
+
+        # Repaired machines rejoin the line with the stage's typical reliability
+        for spec in model.stopped_machines:
+            if spec.id in fixed and model.stopped_stage.get(spec.id) == stage.name:
+                specs.append(spec)
+        specs = [
+            replace(
+                spec,
+                mtbf_minutes=max(spec.mtbf_minutes, median_mtbf.get(stage.name, spec.mtbf_minutes))
+            ) if spec.id in fixed else spec
+            for spec in specs
+        ]
+
+        if specs and extra_machines.get(stage.name):
+            template = sorted(specs, key=lambda m: m.speed_m_per_min)[len(specs) // 2]
+            specs += [
+                replace(template, id=f"{stage.name}-new-{k + 1}")
+                for k in range(extra_machines[stage.name])
+            ]
+        if not specs:
+            continue
+
+        specs = [
+            replace(
+                spec,
+                speed_m_per_min=spec.speed_m_per_min * speed_factor,
+                mtbf_minutes=spec.mtbf_minutes / (1.0 - downtime_reduction),
+                planned_loss=spec.planned_loss * (1.0 - setup_reduction)
+            )
+            for spec in specs
+        ]
+        stages.append(StageSpec(
+            name=stage.name,
+            length_ratio=stage.length_ratio,
+            machines=specs,
+            crewed=max(1, min(len(specs), round(len(specs) * ratio))),
+            buffer_reels=buffer_reels or stage.buffer_reels
+        ))
+
+    return stages
+
+
+def horizon_for(working_days: int, shifts_per_day: int) -> float:
+    """On-shift minutes covered by a run."""
+    return working_days * shifts_per_day * SHIFT_MINUTES
+
+
+# ============== Fitting ==============
+
+def fit_line_model(db: Session, area: Optional[str] = None, lookback_days: int = 90,
+                   shifts_per_day: int = 2) -> LineModel:
+    """
+    Build a LineModel from machines, downtime history and workforce records.
+
+    Downtime is pooled per machine type: unplanned stops give the failure rate
+    and the lognormal repair distribution, planned stops the setup/break loss.
+    """
+    since = datetime.utcnow() - timedelta(days=lookback_days)
+    exposure_per_machine = lookback_days * WORKING_DAY_FRACTION * shifts_per_day * SHIFT_MINUTES
+
+    query = db.query(Machine)
+    if area:
+        query = query.filter(Machine.area == area)
+    machines = query.all()
+
+    type_counts = {}
+    for m in machines:
+        type_counts[m.type] = type_counts.get(m.type, 0) + 1
+
+    downtime_query = db.query(
+        Machine.type,
+        DowntimeLog.is_planned,
+        func.count(DowntimeLog.id),
+        func.sum(DowntimeLog.duration_minutes),
+        func.avg(func.ln(DowntimeLog.duration_minutes)),
+        func.stddev_samp(func.ln(DowntimeLog.duration_minutes))
+    ).join(Machine, Machine.id == DowntimeLog.machine_id).filter(
+        DowntimeLog.timestamp >= since,
+        DowntimeLog.duration_minutes > 0
+    )
+    if area:
+        downtime_query = downtime_query.filter(Machine.area == area)
+    downtime = downtime_query.group_by(Machine.type, DowntimeLog.is_planned).all()
+
+    profiles = {}
+    for machine_type, is_planned, count, total_minutes, log_mean, log_std in downtime:
+        profile = profiles.setdefault(machine_type, {})
+        exposure = exposure_per_machine * type_counts.get(machine_type, 1)
+        if is_planned:
+            profile["planned_loss"] = min(0.5, (total_minutes or 0) / exposure)
+        elif count >= MIN_EVENTS_FOR_FIT:
+            profile["mtbf_minutes"] = exposure / count
+            profile["repair_mu"] = float(log_mean)
+            profile["repair_sigma"] = float(log_std or DEFAULT_REPAIR_SIGMA)
+
+    def spec_for(machine: Machine) -> MachineSpec:
+        profile = profiles.get(machine.type, {})
+        return MachineSpec(
+            id=machine.id,
+            speed_m_per_min=machine.target_speed,
+            mtbf_minutes=profile.get("mtbf_minutes", DEFAULT_MTBF_MINUTES),
+            repair_mu=profile.get("repair_mu", math.log(DEFAULT_REPAIR_MEDIAN_MINUTES)),
+            repair_sigma=profile.get("repair_sigma", DEFAULT_REPAIR_SIGMA),
+            planned_loss=profile.get("planned_loss", DEFAULT_PLANNED_LOSS)
+        )
+
+    stages, stopped, stopped_stage = [], [], {}
+    for name, types, ratio in ROUTE:
+        specs = []
+        for machine in machines:
+            if machine.type not in types or not machine.target_speed:
+                continue
+            if machine.status in (MachineStatus.STOPPED, MachineStatus.MAINTENANCE):
+                stopped.append(spec_for(machine))
+                stopped_stage[machine.id] = name
+            else:
+                specs.append(spec_for(machine))
+        stages.append(StageSpec(name=name, length_ratio=ratio, machines=specs, crewed=len(specs)))
+
+    # Finished cable weight per meter from the last stages of the route
+    weight = db.query(
+        func.sum(ProductionLog.output_weight), func.sum(ProductionLog.output_length)
+    ).join(Machine, Machine.id == ProductionLog.machine_id).filter(
+        ProductionLog.timestamp >= since,
+        Machine.type.in_([MachineType.JACKETING, MachineType.REWINDING]),
+        ProductionLog.output_weight > 0,
+        ProductionLog.output_length > 0
+    ).first()
+    kg_per_meter = weight[0] / weight[1] if weight and weight[1] else DEFAULT_KG_PER_METER
+
+    workforce_query = db.query(WorkforceRecord)
+    if area:
+        workforce_query = workforce_query.filter(WorkforceRecord.plant_id == area)
+    latest = workforce_query.order_by(WorkforceRecord.date.desc()).first()
+    staffing_ratio = (
+        latest.filled_positions / latest.total_positions
+        if latest and latest.total_positions else 1.0
+    )
+
+    plant_query = db.query(Plant)
+    if area:
+        plant_query = plant_query.filter(Plant.id == area)
+    plants = plant_query.all()
+
+    return LineModel(
+        area=area,
+        stages=stages,
+        kg_per_meter=kg_per_meter,
+        staffing_ratio=min(1.0, max(0.05, staffing_ratio)),
+        design_capacity_mt=sum(p.design_capacity_mt for p in plants),
+        current_capacity_mt=sum(p.current_capacity_mt or 0 for p in plants),
+        stopped_machines=stopped,
+        stopped_stage=stopped_stage
+    )
@@ -0,0 +1,295 @@
+"""
+Group-Commit Telemetry Ingest Buffer
+
+High-frequency machine readings are queued in memory and written in groups:
+every TELEMETRY_FLUSH_INTERVAL_MS, or as soon as TELEMETRY_FLUSH_MAX_ROWS are
+waiting, one multi-row INSERT into production_logs plus one batched UPDATE of
+the latest speed / temperature per machine, in a single transaction.
+
+The queue is bounded: offer() refuses a batch that does not fit, and the
+router turns that into 503 + Retry-After so senders back off. Accepted
+readings also go straight into the live-chart ring buffers; written ones are
+passed to the alert engine. On graceful shutdown intake stops and everything
+still queued is flushed.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, func, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core import tracing
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models import Employee, Machine, ProductionLog
+from app.services.alert_engine import alert_engine
+from app.services.telemetry_ring import telemetry_rings
+
+logger = logging.getLogger(__name__)
+
+# Window of the rows-per-second figure (seconds)
+RATE_WINDOW = 60.0
+
+# How often an unknown machine id may trigger a reload of the known ids
+MACHINE_CACHE_TTL = 5.0
+
+
+def write_readings(readings: List[Dict]):
+    """Insert readings and update each machine's latest values in one transaction."""
+    db = SessionLocal()
+    try:
+        names = {r["operator_name"] for r in readings if r["operator_name"]}
+        operators = dict(
+            db.query(Employee.name, Employee.id).filter(Employee.name.in_(names)).all()
+        ) if names else {}
+        # Each log keeps the target speed current when it was written, as in shop_floor.add_production_log
+        target_speeds = dict(
+            db.query(Machine.id, Machine.target_speed).filter(Machine.id.in_({r["machine_id"] for r in readings})).all()
+        )
+
+        db.execute(insert(ProductionLog), [
+            {
+                "machine_id": r["machine_id"],
+                "operator_id": operators.get(r["operator_name"]),
+                "shift": r["shift"],
+                "timestamp": r["timestamp"],
+                "speed": r["speed"],
+                "target_speed": target_speeds.get(r["machine_id"]),
+                "temperature": r["temperature"],
+                "pressure": r["pressure"],
+                "output_length": r["output_length"],
+                "output_weight": r["output_weight"],
+                "notes": r["notes"],
+            }
+            for r in readings
+        ])
+
+        latest: Dict[str, Dict] = {}
+        for r in readings:
+            current = latest.get(r["machine_id"])
+            if current is None or r["timestamp"] >= current["timestamp"]:
+                latest[r["machine_id"]] = r
+
+        machines = Machine.__table__
+        db.execute(
+            update(machines)
+            .where(machines.c.id == bindparam("b_id"))
+            .values(
+                speed=bindparam("b_speed"),
+                temperature=func.coalesce(bindparam("b_temperature"), machines.c.temperature),
+                updated_at=func.now()
+            ),
+            [
+                # Sorted so concurrent flushes always lock machines in the same order
+                {"b_id": machine_id, "b_speed": r["speed"], "b_temperature": r["temperature"]}
+                for machine_id, r in sorted(latest.items())
+            ]
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class IngestBuffer:
+    """Bounded in-memory queue of readings with a background group-commit flusher."""
+
+    def __init__(self):
+        self.capacity = settings.TELEMETRY_QUEUE_SIZE
+        self.max_rows = settings.TELEMETRY_FLUSH_MAX_ROWS
+        self.interval = settings.TELEMETRY_FLUSH_INTERVAL_MS / 1000
+        self._pending: Deque[Dict] = deque()
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._machine_ids: Set[str] = set()
+        self._machine_ids_loaded_at = 0.0
+        self.stats = {
+            "accepted": 0, "rejected": 0, "flushes": 0, "rows_written": 0,
+            "rows_dropped": 0, "flush_errors": 0, "last_flush_rows": 0, "last_flush_ms": 0.0
+        }
+        self._recent_flushes: Deque = deque()  # (monotonic time, rows) within RATE_WINDOW
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    # ============== Intake ==============
+
+    async def unknown_machines(self, machine_ids: Iterable[str]) -> Set[str]:
+        """Machine ids not in the database (known ids are cached)."""
+        missing = set(machine_ids) - self._machine_ids
+        tracing.add_event("cache.miss" if missing else "cache.hit", cache="machine_ids")
+        if missing:
+            await self.refresh_machines(max_age=MACHINE_CACHE_TTL)
+            missing -= self._machine_ids
+        return missing
+
+    async def refresh_machines(self, max_age: float = 0.0):
+        """Reload the known machine ids unless they were loaded less than max_age seconds ago."""
+        if max_age and time.monotonic() - self._machine_ids_loaded_at < max_age:
+            return
+        self._machine_ids = await run_in_threadpool(self._load_machine_ids)
+        self._machine_ids_loaded_at = time.monotonic()
+
+    def knows(self, machine_id: str) -> bool:
+        """Cache-only check for callers that cannot await (e.g. the UDP listener)."""
+        return machine_id in self._machine_ids
+
+    @staticmethod
+    def _load_machine_ids() -> Set[str]:
+        db = SessionLocal()
+        try:
+            return {machine_id for (machine_id,) in db.query(Machine.id).all()}
+        finally:
+            db.close()
+
+    def offer(self, readings: List[Dict]) -> bool:
+        """Queue all readings, or none of them if they do not fit."""
+        if self._closing or len(self._pending) + len(readings) > self.capacity:
+            self.stats["rejected"] += len(readings)
+            return False
+
+        self._pending.extend(readings)
+        self.stats["accepted"] += len(readings)
+        telemetry_rings.record(readings)
+        if self._full is not None and len(self._pending) >= self.max_rows:
+            self._full.set()
+        return True
+
+    # ============== Flushing ==============
+
+    async def flush(self) -> int:
+        """Write up to max_rows queued readings; returns the number written."""
+        count = min(len(self._pending), self.max_rows)
+        if not count:
+            return 0
+        batch = [self._pending.popleft() for _ in range(count)]
+        with tracing.job("ingest.flush", rows=count):
+            return await self._write(batch)
+
+    async def _write(self, batch: List[Dict]) -> int:
+        started = time.perf_counter()
+        try:
+            try:
+                await run_in_threadpool(write_readings, batch)
+            except IntegrityError:
+                # A machine was deleted after its readings were accepted
+                await self.refresh_machines()
+                kept = [r for r in batch if r["machine_id"] in self._machine_ids]
+                self.stats["rows_dropped"] += len(batch) - len(kept)
+                logger.warning("Dropped %d readings for unknown machines", len(batch) - len(kept))
+                batch = kept
+                if kept:
+                    await run_in_threadpool(write_readings, kept)
+        except Exception:
+            # Database unavailable, also when retrying without unknown machines:
+            # put the batch back in front and retry next tick
+            self.stats["flush_errors"] += 1
+            self._pending.extendleft(reversed(batch))
+            raise
+
+        try:
+            await run_in_threadpool(alert_engine.readings, batch)
+        except Exception:
+            logger.exception("Alert evaluation failed for %d readings", len(batch))
+
+        self.stats["flushes"] += 1
+        self.stats["rows_written"] += len(batch)
+        self.stats["last_flush_rows"] = len(batch)
+        self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self._recent_flushes.append((time.monotonic(), len(batch)))
+        self._expire_flushes()
+        return len(batch)
+
+    def _expire_flushes(self):
+        cutoff = time.monotonic() - RATE_WINDOW
+        while self._recent_flushes and self._recent_flushes[0][0] < cutoff:
+            self._recent_flushes.popleft()
+
+    def rows_per_second(self) -> float:
+        """Rows written per second over the last RATE_WINDOW seconds."""
+        self._expire_flushes()
+        return sum(rows for _, rows in self._recent_flushes) / RATE_WINDOW
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+
+            try:
+                # Keep going while full batches are waiting
+                while await self.flush() == self.max_rows:
+                    pass
+            except Exception:
+                logger.exception("Telemetry flush failed, %d readings queued", len(self._pending))
+                await asyncio.sleep(min(self.interval * 5, 5.0))
+
+    async def start(self):
+        self._closing = False
+        self._full = asyncio.Event()
+        try:
+            await self.refresh_machines()
+        except Exception:
+            logger.exception("Could not preload machine ids")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop intake and flush everything still queued."""
+        self._closing = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        try:
+            while self._pending:
+                await self.flush()
+        except Exception:
+            logger.exception("Final telemetry flush failed, %d readings lost", len(self._pending))
+
+    def snapshot(self) -> Dict:
+        return {
+            **self.stats,
+            "rows_per_second": round(self.rows_per_second(), 1),
+            "queue_depth": len(self._pending),
+            "queue_capacity": self.capacity,
+            "flush_interval_ms": settings.TELEMETRY_FLUSH_INTERVAL_MS,
+            "flush_max_rows": self.max_rows,
+            "accepting": not self._closing
+        }
+
+
+def reading_row(reading, received_at: datetime) -> Dict:
+    """Flatten a ProductionLogCreate into a queue entry (timestamps as naive UTC)."""
+    timestamp = reading.timestamp or received_at
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return {
+        "machine_id": reading.machine_id,
+        "operator_name": reading.operator_name,
+        "shift": reading.shift.value,
+        "timestamp": timestamp,
+        "speed": reading.speed,
+        "temperature": reading.temperature,
+        "pressure": reading.pressure,
+        "output_length": reading.output_length,
+        "output_weight": reading.output_weight,
+        "notes": reading.notes,
+    }
+
+
+ingest_buffer = IngestBuffer()
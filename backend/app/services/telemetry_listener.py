@@ -0,0 +1,186 @@
+"""
+UDP Line-Protocol Telemetry Listener
+
+PLC gateways send readings as plain-text lines, one or more per datagram:
+
+    <machine_id> speed=<float>[,temp=<float>][,pressure=<float>][,length=<float>][,weight=<float>] [<timestamp>]
+
+The timestamp is Unix epoch time; its precision (s, ms, us or ns) is taken
+from its magnitude, and it defaults to the arrival time. Lines are parsed
+with plain string operations and handed to the same ingest buffer as
+POST /production/logs/ingest, so they end up in production_logs, the machine
+row and the live ring buffers. Bad lines are counted per reason and dropped.
+"""
+import asyncio
+import logging
+import math
+import socket
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.plant_calendar import shift_at
+from app.services.telemetry_ingest import MACHINE_CACHE_TTL, ingest_buffer
+
+logger = logging.getLogger(__name__)
+
+# Line protocol field name -> ingest row key
+FIELDS = {
+    "speed": "speed",
+    "temp": "temperature",
+    "pressure": "pressure",
+    "length": "output_length",
+    "weight": "output_weight",
+}
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class LineError(ValueError):
+    """A line that cannot be parsed; args[0] is the counter it is tallied under."""
+
+
+def parse_timestamp(raw: str) -> datetime:
+    value = float(raw)
+    if value > 1e17:
+        value /= 1e9
+    elif value > 1e14:
+        value /= 1e6
+    elif value > 1e11:
+        value /= 1e3
+    return EPOCH + timedelta(seconds=value)  # Naive UTC, like the rest of the ingest path
+
+
+def parse_line(line: str, received_at: datetime) -> Dict:
+    """Turn one protocol line into an ingest row (see telemetry_ingest.reading_row)."""
+    parts = line.split()
+    if len(parts) not in (2, 3):
+        raise LineError("malformed")
+
+    row = {
+        "machine_id": parts[0],
+        "operator_name": None,
+        "speed": None,
+        "temperature": None,
+        "pressure": None,
+        "output_length": None,
+        "output_weight": None,
+        "notes": None,
+    }
+    for field in parts[1].split(","):
+        name, sep, raw = field.partition("=")
+        key = FIELDS.get(name)
+        if not sep or key is None:
+            raise LineError("bad_field")
+        try:
+            value = float(raw)
+        except ValueError:
+            raise LineError("bad_field")
+        if not math.isfinite(value):
+            raise LineError("bad_field")
+        row[key] = value
+
+    if row["speed"] is None or row["speed"] < 0:
+        raise LineError("bad_field")
+
+    if len(parts) == 3:
+        try:
+            row["timestamp"] = parse_timestamp(parts[2])
+        except (ValueError, OverflowError):
+            raise LineError("bad_timestamp")
+    else:
+        row["timestamp"] = received_at
+    row["shift"] = shift_at(row["timestamp"]).value
+    return row
+
+
+class TelemetryListener(asyncio.DatagramProtocol):
+    """Parses datagrams and offers the readings to the ingest buffer."""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.stats = {
+            "datagrams": 0, "lines": 0, "accepted": 0,
+            "malformed": 0, "bad_field": 0, "bad_timestamp": 0,
+            "unknown_machine": 0, "backpressure": 0
+        }
+        self._refreshing: Optional[asyncio.Future] = None
+
+    def datagram_received(self, data: bytes, addr):
+        self.stats["datagrams"] += 1
+        received_at = datetime.utcnow()
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            self.stats["malformed"] += 1
+            return
+
+        rows = []
+        unknown = False
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            self.stats["lines"] += 1
+            try:
+                row = parse_line(line, received_at)
+            except LineError as e:
+                self.stats[e.args[0]] += 1
+                continue
+            if not ingest_buffer.knows(row["machine_id"]):
+                self.stats["unknown_machine"] += 1
+                unknown = True
+                continue
+            rows.append(row)
+
+        if unknown and (self._refreshing is None or self._refreshing.done()):
+            # Pick up newly created machines, at most once per cache TTL
+            self._refreshing = asyncio.ensure_future(ingest_buffer.refresh_machines(max_age=MACHINE_CACHE_TTL))
+
+        if rows:
+            if ingest_buffer.offer(rows):
+                self.stats["accepted"] += len(rows)
+            else:
+                self.stats["backpressure"] += len(rows)
+
+    def error_received(self, exc):
+        logger.warning("Telemetry listener socket error: %s", exc)
+
+    async def start(self):
+        """
+        Bind the UDP port. With several workers each one binds it with
+        SO_REUSEPORT and the kernel spreads the datagrams across them; a
+        worker that cannot bind logs it and runs without listening.
+        """
+        loop = asyncio.get_running_loop()
+        reuse_port = settings.WEB_CONCURRENCY > 1 and hasattr(socket, "SO_REUSEPORT")
+        try:
+            self.transport, _ = await loop.create_datagram_endpoint(
+                lambda: self, local_addr=(settings.TELEMETRY_UDP_HOST, settings.TELEMETRY_UDP_PORT),
+                reuse_port=reuse_port or None
+            )
+        except OSError as exc:
+            logger.error(
+                "Telemetry listener could not bind udp://%s:%d, this worker is not listening: %s",
+                settings.TELEMETRY_UDP_HOST, settings.TELEMETRY_UDP_PORT, exc
+            )
+            return
+        # A larger kernel buffer absorbs bursts while the loop is busy flushing
+        sock = self.transport.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, settings.TELEMETRY_UDP_RECEIVE_BUFFER)
+        logger.info("Telemetry listener on udp://%s:%d", settings.TELEMETRY_UDP_HOST, settings.TELEMETRY_UDP_PORT)
+
+    async def stop(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    def snapshot(self) -> Dict:
+        return {
+            **self.stats,
+            "listening": self.transport is not None,
+            "port": settings.TELEMETRY_UDP_PORT,
+            "parse_errors": self.stats["malformed"] + self.stats["bad_field"] + self.stats["bad_timestamp"]
+        }
+
+
+telemetry_listener = TelemetryListener()
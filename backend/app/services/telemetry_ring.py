@@ -0,0 +1,116 @@
+"""
+Per-Machine Telemetry Ring Buffers
+
+The last TELEMETRY_RING_SIZE readings of every machine are kept in
+preallocated NumPy arrays (timestamp, speed, temperature), filled from the
+ingest path, so live charts are served straight from memory. Each ring's
+size is fixed when it is created: memory per machine is constant no matter
+how fast readings arrive.
+
+Rings are only touched from the event loop (ingest handlers, UDP listener,
+live endpoint), so no locking is needed.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class MachineRing:
+    """Fixed-size circular buffer of one machine's readings."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)  # Unix epoch milliseconds
+        self.speed = np.full(capacity, np.nan, dtype=np.float32)
+        self.temperature = np.full(capacity, np.nan, dtype=np.float32)
+        self.head = 0  # Next slot to write
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.speed.nbytes + self.temperature.nbytes
+
+    def extend(self, timestamps: np.ndarray, speed: np.ndarray, temperature: np.ndarray):
+        """Append readings in arrival order, overwriting the oldest ones."""
+        n = len(timestamps)
+        if n >= self.capacity:
+            timestamps, speed, temperature = timestamps[-self.capacity:], speed[-self.capacity:], temperature[-self.capacity:]
+            n = self.capacity
+
+        first = min(n, self.capacity - self.head)
+        for target, values in ((self.timestamps, timestamps), (self.speed, speed), (self.temperature, temperature)):
+            target[self.head:self.head + first] = values[:first]
+            target[:n - first] = values[first:]
+
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+
+    def window(self, since_ms: Optional[float] = None):
+        """(timestamps, speed, temperature) in arrival order, optionally from since_ms on."""
+        start = (self.head - self.count) % self.capacity
+        order = (np.arange(self.count) + start) % self.capacity
+        timestamps = self.timestamps[order]
+        speed = self.speed[order]
+        temperature = self.temperature[order]
+        if since_ms is not None:
+            keep = timestamps >= since_ms
+            timestamps, speed, temperature = timestamps[keep], speed[keep], temperature[keep]
+        return timestamps, speed, temperature
+
+
+def _epoch_ms(timestamp: datetime) -> float:
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)  # Readings are stored as naive UTC
+    return timestamp.timestamp() * 1000
+
+
+class TelemetryRings:
+    """Ring buffers keyed by machine id, created on first reading."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.rings: Dict[str, MachineRing] = {}
+
+    def record(self, readings: Iterable[Dict]):
+        """Add ingest queue entries (see telemetry_ingest.reading_row)."""
+        by_machine: Dict[str, list] = {}
+        for r in readings:
+            by_machine.setdefault(r["machine_id"], []).append(r)
+
+        for machine_id, rows in by_machine.items():
+            ring = self.rings.get(machine_id)
+            if ring is None:
+                ring = self.rings[machine_id] = MachineRing(self.capacity)
+            ring.extend(
+                np.fromiter((_epoch_ms(r["timestamp"]) for r in rows), dtype=np.float64, count=len(rows)),
+                np.fromiter((r["speed"] for r in rows), dtype=np.float32, count=len(rows)),
+                np.fromiter(
+                    (np.nan if r["temperature"] is None else r["temperature"] for r in rows),
+                    dtype=np.float32, count=len(rows)
+                )
+            )
+
+    def get(self, machine_id: str) -> Optional[MachineRing]:
+        return self.rings.get(machine_id)
+
+    def drop(self, machine_id: str):
+        self.rings.pop(machine_id, None)
+
+    @property
+    def bytes_per_machine(self) -> int:
+        return MachineRing(1).nbytes * self.capacity
+
+    def memory(self) -> Dict:
+        return {
+            "machines": len(self.rings),
+            "capacity": self.capacity,
+            "bytes_per_machine": self.bytes_per_machine,
+            "total_bytes": sum(ring.nbytes for ring in self.rings.values()),
+            "readings": {machine_id: ring.count for machine_id, ring in sorted(self.rings.items())}
+        }
+
+
+telemetry_rings = TelemetryRings(settings.TELEMETRY_RING_SIZE)
@@ -0,0 +1,248 @@
+"""
+Benchmark dataset
+
+Fills a dedicated benchmark database at a given scale: the number of
+production_logs rows. The other event tables grow along with it (quality
+checks 1/10, downtime and scrap 1/100, work orders and maintenance tasks
+1/1000, at least MIN_ROWS each), spread over MACHINES machines and the last
+DAYS days. Rows are generated inside PostgreSQL with generate_series, so
+even 10M rows need no client-side work.
+
+Every table the loader fills is truncated first, so it refuses databases
+whose name does not contain "bench". From the backend directory:
+
+    python -m benchmarks.dataset --database-url postgresql://localhost/scc_bench --scale 100k
+"""
+import argparse
+import time
+from typing import Dict, Type
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection, Engine, make_url
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.database import Base
+from app.models import (
+    DowntimeType, MachineStatus, MachineType, MaintenanceStatus, MaintenanceType,
+    Priority, ScrapType, Shift, UserRole, WorkOrderStatus
+)
+
+MACHINES = 40
+EMPLOYEES = 60
+DAYS = 30
+MIN_ROWS = 20
+PLANTS = ("PCP-1", "PCP-2", "CV-LINE", "EXT-1")
+
+# Fixed ids the endpoint benchmark addresses
+MACHINE_ID = "BM-001"
+WORK_ORDER_ID = "WO-B00001"
+TASK_ID = "MT-B00001"
+USERNAME = "bench"
+PASSWORD = "bench-password"
+
+TRUNCATED = (
+    "production_logs", "downtime_logs", "quality_checks", "scrap_entries", "emulsion_logs",
+    "maintenance_tasks", "work_orders", "workforce_records", "alerts", "kpi_counters",
+    "machines", "employees", "plants", "users"
+)
+
+SCALE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_scale(value: str) -> int:
+    """Row count of a scale written as 5000, 100k or 10M."""
+    suffix = value[-1:].lower()
+    if suffix in SCALE_SUFFIXES:
+        return int(float(value[:-1]) * SCALE_SUFFIXES[suffix])
+    return int(value)
+
+
+def _labels(conn: Connection, table: str, column: str, enum: Type) -> str:
+    """SQL array of an enum's stored labels, cast to the column's type (PG enum or varchar)."""
+    column_type = conn.execute(text(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute WHERE attrelid = CAST(:table AS regclass) "
+        "AND attname = :column"
+    ), {"table": table, "column": column}).scalar_one()
+    labels = ", ".join(f"'{member.name}'" for member in enum)
+    return f"(ARRAY[{labels}]::{column_type.split('(')[0]}[])"
+
+
+def _pick(labels: str, count: int, expr: str) -> str:
+    return f"{labels}[1 + ({expr}) % {count}]"
+
+
+def _sql(conn: Connection, rows: int) -> Dict[str, str]:
+    """INSERT ... SELECT statements per table, in dependency order."""
+    first_shift = min(settings.SHIFT_START_HOURS)
+    span = DAYS * 86400
+    quality_rows = max(MIN_ROWS, rows // 10)
+    event_rows = max(MIN_ROWS, rows // 100)
+    order_rows = max(MIN_ROWS, rows // 1000)
+
+    def shift_of(ts: str, table: str) -> str:
+        labels = _labels(conn, table, "shift", Shift)
+        hour = f"extract(hour FROM {ts} AT TIME ZONE '{settings.PLANT_TIMEZONE}')::int"
+        return f"{labels}[1 + (({hour} - {first_shift} + 24) % 24) / 8]"
+
+    def spread(count: int) -> str:
+        """Timestamp of row i, newest first, evenly over the last DAYS days."""
+        return f"now() - make_interval(secs => i::float8 * {span} / {count})"
+
+    return {
+        "plants": f"""
+            INSERT INTO plants (id, name, description, design_capacity_mt, current_capacity_mt, is_active)
+            SELECT p, 'Benchmark plant ' || p, 'Benchmark data', 40000, 10000 + random() * 20000, true
+            FROM unnest(ARRAY[{", ".join(f"'{plant}'" for plant in PLANTS)}]) AS p
+        """,
+        "employees": f"""
+            INSERT INTO employees (employee_number, name, department, position, shift, is_active, skill_level)
+            SELECT 'BE-' || lpad(i::text, 4, '0'), 'Benchmark operator ' || i, 'Production', 'Operator',
+                   (ARRAY['morning', 'evening', 'night'])[1 + i % 3], true, 1 + i % 5
+            FROM generate_series(1, {EMPLOYEES}) AS i
+        """,
+        "machines": f"""
+            INSERT INTO machines (id, name, area, type, status, speed, target_speed, temperature, oee, operator_id)
+            SELECT 'BM-' || lpad(i::text, 3, '0'), 'Benchmark machine ' || i,
+                   (ARRAY[{", ".join(f"'{plant}'" for plant in PLANTS)}])[1 + i % {len(PLANTS)}],
+                   {_pick(_labels(conn, "machines", "type", MachineType), len(MachineType), "i")},
+                   {_pick(_labels(conn, "machines", "status", MachineStatus), len(MachineStatus), "i / 3")},
+                   80 + random() * 40, 100, 180 + random() * 40, 60 + random() * 30, 1 + i % {EMPLOYEES}
+            FROM generate_series(1, {MACHINES}) AS i
+        """,
+        "users": """
+            INSERT INTO users (email, username, hashed_password, full_name, role, is_active)
+            VALUES (:email, :username, :password, 'Benchmark user', :role, true)
+        """,
+        "work_orders": f"""
+            INSERT INTO work_orders (id, customer, product, machine_id, priority, status, progress,
+                                     quantity_ordered, quantity_produced, due_date, start_date)
+            SELECT 'WO-B' || lpad(i::text, 5, '0'), 'Customer ' || (i % 50), 'Cable ' || (i % 200),
+                   'BM-' || lpad((1 + i % {MACHINES})::text, 3, '0'),
+                   {_pick(_labels(conn, "work_orders", "priority", Priority), len(Priority), "i")},
+                   {_pick(_labels(conn, "work_orders", "status", WorkOrderStatus), len(WorkOrderStatus), "i")},
+                   random() * 100, 1000 + random() * 9000, random() * 1000,
+                   now() + make_interval(days => i % 60), now() - make_interval(days => i % 30)
+            FROM generate_series(1, {order_rows}) AS i
+        """,
+        "maintenance_tasks": f"""
+            INSERT INTO maintenance_tasks (id, machine_id, type, status, title, priority, assignee,
+                                           scheduled_start, scheduled_end, estimated_duration_hours,
+                                           downtime_minutes, labor_cost, parts_cost, total_cost)
+            SELECT 'MT-B' || lpad(i::text, 5, '0'), 'BM-' || lpad((1 + i % {MACHINES})::text, 3, '0'),
+                   {_pick(_labels(conn, "maintenance_tasks", "type", MaintenanceType), len(MaintenanceType), "i")},
+                   {_pick(_labels(conn, "maintenance_tasks", "status", MaintenanceStatus), len(MaintenanceStatus), "i")},
+                   'Benchmark task ' || i, 1 + i % 5, 'Technician ' || (i % 20),
+                   ts, ts + interval '4 hours', 4, 0, 200, 300, 500
+            FROM generate_series(1, {order_rows}) AS i,
+                 LATERAL (SELECT now() + make_interval(hours => i % 720 - 360) AS ts) AS t
+        """,
+        "workforce_records": f"""
+            INSERT INTO workforce_records (plant_id, date, total_positions, filled_positions, vacancies,
+                                           morning_shift, evening_shift, night_shift, operators, technicians,
+                                           supervisors, engineers, support_staff, in_training, certified)
+            SELECT p, now() - make_interval(days => d), 60, 40 + d % 10, 20 - d % 10, 15, 15, 10,
+                   30, 5, 3, 2, 0, 2, 35
+            FROM unnest(ARRAY[{", ".join(f"'{plant}'" for plant in PLANTS)}]) AS p, generate_series(0, {DAYS - 1}) AS d
+        """,
+        "production_logs": f"""
+            INSERT INTO production_logs (machine_id, operator_id, shift, timestamp, speed, target_speed,
+                                         temperature, pressure, output_length, output_weight, created_at)
+            SELECT 'BM-' || lpad((1 + i % {MACHINES})::text, 3, '0'), 1 + i % {EMPLOYEES},
+                   {shift_of("ts", "production_logs")}, ts, 80 + random() * 40, 100,
+                   180 + random() * 40, 2 + random() * 4, random() * 50, random() * 30, ts
+            FROM generate_series(0, {rows - 1}) AS i, LATERAL (SELECT {spread(rows)} AS ts) AS t
+        """,
+        "quality_checks": f"""
+            INSERT INTO quality_checks (machine_id, operator_id, shift, timestamp, diameter, diameter_tolerance,
+                                        thickness, spark_test_passed, tensile_test_passed,
+                                        visual_inspection_passed, passed, created_at)
+            SELECT 'BM-' || lpad((1 + i % {MACHINES})::text, 3, '0'), 1 + i % {EMPLOYEES},
+                   {shift_of("ts", "quality_checks")}, ts, 2.5 + random() * 0.1, 0.05, 0.8 + random() * 0.2,
+                   ok, true, true, ok, ts
+            FROM generate_series(0, {quality_rows - 1}) AS i,
+                 LATERAL (SELECT {spread(quality_rows)} AS ts, random() > 0.03 AS ok) AS t
+        """,
+        "downtime_logs": f"""
+            INSERT INTO downtime_logs (machine_id, operator_id, shift, timestamp, downtime_type,
+                                       duration_minutes, reason, is_planned, created_at)
+            SELECT 'BM-' || lpad((1 + i % {MACHINES})::text, 3, '0'), 1 + i % {EMPLOYEES},
+                   {shift_of("ts", "downtime_logs")}, ts,
+                   {_pick(_labels(conn, "downtime_logs", "downtime_type", DowntimeType), len(DowntimeType), "i")},
+                   5 + (random() * 235)::int, 'Benchmark stop', i % 5 = 0, ts
+            FROM generate_series(0, {event_rows - 1}) AS i, LATERAL (SELECT {spread(event_rows)} AS ts) AS t
+        """,
+        "scrap_entries": f"""
+            INSERT INTO scrap_entries (machine_id, operator_id, shift, timestamp, scrap_type, scrap_code,
+                                       weight_kg, copper_content_percent, aluminum_content_percent, lme_price_used,
+                                       financial_value_usd, financial_value_sar, reason, created_at)
+            SELECT 'BM-' || lpad((1 + i % {MACHINES})::text, 3, '0'), 1 + i % {EMPLOYEES},
+                   {shift_of("ts", "scrap_entries")}, ts,
+                   {_pick(_labels(conn, "scrap_entries", "scrap_type", ScrapType), len(ScrapType), "i")},
+                   'SC-' || lpad((1 + i % 76)::text, 2, '0'), kg, 60, 0, {settings.LME_COPPER_PRICE},
+                   kg * 0.6 * {settings.LME_COPPER_PRICE} / 1000, kg * 0.6 * {settings.LME_COPPER_PRICE} / 1000 * 3.75,
+                   'Benchmark scrap', ts
+            FROM generate_series(0, {event_rows - 1}) AS i,
+                 LATERAL (SELECT {spread(event_rows)} AS ts, 1 + random() * 50 AS kg) AS t
+        """,
+    }
+
+
+def check_database(engine: Engine):
+    name = make_url(str(engine.url)).database or ""
+    if "bench" not in name:
+        raise SystemExit(f"Refusing to load benchmark data into '{name}': the database name must contain 'bench'")
+
+
+def loaded_rows(engine: Engine) -> int:
+    """Scale of the dataset currently loaded, 0 if none."""
+    with engine.connect() as conn:
+        exists = conn.execute(text("SELECT to_regclass('benchmark_dataset')")).scalar()
+        if exists is None:
+            return 0
+        return conn.execute(text("SELECT rows FROM benchmark_dataset")).scalar() or 0
+
+
+def load(engine: Engine, rows: int, seed: float = 0.42):
+    """(Re)create the benchmark dataset with `rows` production logs."""
+    check_database(engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join(TRUNCATED)} RESTART IDENTITY CASCADE"))
+        conn.execute(text("SELECT setseed(:seed)"), {"seed": seed})
+        for table, statement in _sql(conn, rows).items():
+            started = time.perf_counter()
+            params = {}
+            if table == "users":
+                params = {
+                    "email": "bench@example.com", "username": USERNAME,
+                    "password": get_password_hash(PASSWORD), "role": UserRole.ADMIN.name
+                }
+            result = conn.execute(text(statement), params)
+            print(f"  {table:<18} {result.rowcount:>12,} rows  {time.perf_counter() - started:6.1f}s")
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS benchmark_dataset (rows bigint NOT NULL, loaded_at timestamptz NOT NULL)"
+        ))
+        conn.execute(text("TRUNCATE benchmark_dataset"))
+        conn.execute(text("INSERT INTO benchmark_dataset VALUES (:rows, now())"), {"rows": rows})
+
+    # Fresh statistics, as autovacuum would eventually provide
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def main(args):
+    engine = create_engine(args.database_url)
+    rows = parse_scale(args.scale)
+    print(f"Loading {rows:,} production logs into {engine.url.render_as_string(hide_password=True)}")
+    started = time.perf_counter()
+    load(engine, rows)
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the endpoint benchmark dataset")
+    parser.add_argument("--database-url", required=True, help="Benchmark database (its name must contain 'bench')")
+    parser.add_argument("--scale", default="100k", help="Production log rows, e.g. 1k, 100k, 10M")
+    main(parser.parse_args())
@@ -0,0 +1,313 @@
+"""
+Endpoint benchmark
+
+Starts the app (one uvicorn worker) against the benchmark database, loaded by
+benchmarks.dataset at each requested scale, and measures every case below:
+p50/p95/p99 latency and throughput of `--requests` calls from `--concurrency`
+concurrent clients, after `--warmup` calls that are not counted. Cases cover
+the machines, production, quality, maintenance, dashboard and auth routers,
+reads and writes.
+
+Results are written as JSON (`--out`) and compared with a baseline: a case
+regresses when its p95 grew by more than `--threshold` (relative) and more
+than `--min-delta-ms`, or when it returned errors the baseline did not. Any
+regression makes the command exit with status 1, so it can gate CI.
+
+From the backend directory:
+
+    python -m benchmarks.endpoints run --database-url postgresql://localhost/scc_bench \\
+        --scales 1k 100k --baseline benchmarks/baselines/endpoints.json
+    python -m benchmarks.endpoints compare results.json benchmarks/baselines/endpoints.json
+
+To refresh the committed baseline, run on a quiet machine with
+`--out benchmarks/baselines/endpoints.json`. Latencies depend on the
+hardware, so compare runs from the same machine.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+import httpx
+import numpy as np
+from sqlalchemy import create_engine
+
+from benchmarks.dataset import (
+    MACHINE_ID, PASSWORD, PLANTS, TASK_ID, USERNAME, WORK_ORDER_ID, load, loaded_rows, parse_scale
+)
+
+HEALTH_PATH = "/api/dashboard/health"
+STARTUP_TIMEOUT = 60
+
+
+class Case(NamedTuple):
+    name: str
+    method: str
+    path: str
+    params: Optional[Dict] = None
+    json: Optional[Dict] = None
+    data: Optional[Dict] = None
+
+
+CASES = [
+    # Machines
+    Case("machines.list", "GET", "/api/machines"),
+    Case("machines.stats", "GET", "/api/machines/stats"),
+    Case("machines.oee", "GET", f"/api/machines/oee/{PLANTS[0]}"),
+    Case("machines.detail", "GET", f"/api/machines/{MACHINE_ID}"),
+    Case("machines.live", "GET", f"/api/machines/{MACHINE_ID}/live", params={"seconds": 300}),
+    # Production
+    Case("production.work_orders", "GET", "/api/production/work-orders", params={"limit": 100}),
+    Case("production.work_order", "GET", f"/api/production/work-orders/{WORK_ORDER_ID}"),
+    Case("production.logs", "GET", "/api/production/logs", params={"machine_id": MACHINE_ID, "limit": 100}),
+    Case("production.logs_chart", "GET", "/api/production/logs",
+         params={"machine_id": MACHINE_ID, "limit": 1000, "max_points": 200}),
+    Case("production.logs_chart_shift", "GET", "/api/production/logs",
+         params={"machine_id": MACHINE_ID, "shift": "morning", "max_points": 200}),
+    Case("production.logs_summary", "GET", "/api/production/logs/summary"),
+    Case("production.downtime", "GET", "/api/production/downtime", params={"limit": 100}),
+    Case("production.downtime_summary", "GET", "/api/production/downtime/summary"),
+    Case("production.create_log", "POST", "/api/production/logs", json={
+        "machine_id": MACHINE_ID, "shift": "morning", "speed": 95.0, "temperature": 195.0,
+        "output_length": 12.5, "output_weight": 6.0
+    }),
+    # Quality
+    Case("quality.checks", "GET", "/api/quality/checks", params={"machine_id": MACHINE_ID, "limit": 100}),
+    Case("quality.checks_summary", "GET", "/api/quality/checks/summary"),
+    Case("quality.scrap", "GET", "/api/quality/scrap", params={"limit": 100}),
+    Case("quality.scrap_summary", "GET", "/api/quality/scrap/summary"),
+    Case("quality.scrap_codes", "GET", "/api/quality/scrap/codes"),
+    Case("quality.create_check", "POST", "/api/quality/checks", json={
+        "machine_id": MACHINE_ID, "shift": "morning", "diameter": 2.55, "diameter_tolerance": 0.05,
+        "thickness": 0.9
+    }),
+    # Maintenance
+    Case("maintenance.tasks", "GET", "/api/maintenance/tasks", params={"limit": 100}),
+    Case("maintenance.task", "GET", f"/api/maintenance/tasks/{TASK_ID}"),
+    Case("maintenance.summary", "GET", "/api/maintenance/summary"),
+    Case("maintenance.emulsion", "GET", "/api/maintenance/emulsion", params={"limit": 100}),
+    Case("maintenance.update_task", "PUT", f"/api/maintenance/tasks/{TASK_ID}", json={"notes": "Benchmark"}),
+    # Dashboard
+    Case("dashboard.overview", "GET", "/api/dashboard/overview"),
+    Case("dashboard.capacity", "GET", "/api/dashboard/capacity"),
+    Case("dashboard.workforce", "GET", "/api/dashboard/workforce"),
+    Case("dashboard.trends_hourly", "GET", "/api/dashboard/trends/hourly"),
+    Case("dashboard.trends_weekly", "GET", "/api/dashboard/trends/weekly"),
+    Case("dashboard.bundle", "GET", "/api/dashboard/bundle"),
+    # Auth
+    Case("auth.login", "POST", "/api/auth/login", data={"username": USERNAME, "password": PASSWORD}),
+]
+
+
+# ============== Server ==============
+
+def start_server(database_url: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--workers", "1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"Server exited with status {server.returncode} during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}{HEALTH_PATH}", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise SystemExit(f"Server did not answer {HEALTH_PATH} within {STARTUP_TIMEOUT}s")
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+# ============== Measurement ==============
+
+async def _call(client: httpx.AsyncClient, case: Case) -> bool:
+    try:
+        response = await client.request(case.method, case.path, params=case.params, json=case.json, data=case.data)
+        await response.aread()
+    except httpx.HTTPError:
+        return False
+    return response.status_code < 400
+
+
+async def measure(client: httpx.AsyncClient, case: Case, requests: int, concurrency: int, warmup: int) -> Dict:
+    for _ in range(warmup):
+        await _call(client, case)
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            ok = await _call(client, case)
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "mean_ms": round(float(np.mean(latencies)), 2),
+        "rps": round(len(latencies) / elapsed, 1)
+    }
+
+
+async def run_cases(base_url: str, cases: List[Case], args) -> Dict[str, Dict]:
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        for case in cases:
+            stats = await measure(client, case, args.requests, args.concurrency, args.warmup)
+            results[case.name] = stats
+            print(f"  {case.name:<30} p50 {stats['p50_ms']:8.1f}  p95 {stats['p95_ms']:8.1f}  "
+                  f"p99 {stats['p99_ms']:8.1f} ms  {stats['rps']:8.1f} req/s  {stats['errors']} errors")
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> int:
+    cases = [case for case in CASES if not args.cases or any(case.name.startswith(prefix) for prefix in args.cases)]
+    if not cases:
+        raise SystemExit(f"No case matches {args.cases}")
+
+    engine = create_engine(args.database_url)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup
+        },
+        "scales": {}
+    }
+
+    for scale in args.scales:
+        rows = parse_scale(scale)
+        if args.reload or loaded_rows(engine) != rows:
+            print(f"Loading {rows:,} production logs")
+            load(engine, rows)
+        print(f"Scale {scale} ({rows:,} production logs)")
+        server = start_server(args.database_url, args.port)
+        try:
+            results = asyncio.run(run_cases(f"http://127.0.0.1:{args.port}", cases, args))
+        finally:
+            stop_server(server)
+        report["scales"][scale] = {"rows": rows, "cases": results}
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        return compare(report, baseline, args.threshold, args.min_delta_ms)
+    return 0
+
+
+# ============== Regression gate ==============
+
+def compare(current: Dict, baseline: Dict, threshold: float, min_delta_ms: float) -> int:
+    """Print current p95s against the baseline's; 1 if any case regressed, else 0."""
+    regressions = 0
+    for scale, measured in current["scales"].items():
+        expected = baseline["scales"].get(scale, {}).get("cases", {})
+        print(f"Scale {scale} against baseline {baseline['meta'].get('commit') or '?'}")
+        for name, stats in measured["cases"].items():
+            before = expected.get(name)
+            if before is None:
+                print(f"  {name:<30} p95 {stats['p95_ms']:8.1f} ms  (not in baseline)")
+                continue
+            delta = stats["p95_ms"] - before["p95_ms"]
+            slower = delta > min_delta_ms and stats["p95_ms"] > before["p95_ms"] * (1 + threshold)
+            failing = stats["errors"] > before["errors"]
+            verdict = "REGRESSED" if slower else "ERRORS" if failing else "ok"
+            regressions += slower or failing
+            print(f"  {name:<30} p95 {stats['p95_ms']:8.1f} ms  baseline {before['p95_ms']:8.1f} ms  "
+                  f"{delta:+8.1f} ms  {verdict}")
+    print(f"{regressions} regression(s)" if regressions else "No regressions")
+    return 1 if regressions else 0
+
+
+def compare_files(args) -> int:
+    with open(args.results) as f:
+        current = json.load(f)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    return compare(current, baseline, args.threshold, args.min_delta_ms)
+
+
+def _gate_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative p95 growth that counts as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0,
+                        help="Ignore p95 growth smaller than this, whatever the ratio")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Endpoint latency benchmark and regression gate")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Benchmark the endpoints at one or more data scales")
+    run_parser.add_argument("--database-url", required=True, help="Benchmark database (its name must contain 'bench')")
+    run_parser.add_argument("--scales", nargs="+", default=["1k", "100k"], help="Production log rows, e.g. 1k 100k 10M")
+    run_parser.add_argument("--cases", nargs="*", help="Only cases whose name starts with one of these")
+    run_parser.add_argument("--requests", type=int, default=200, help="Measured requests per case")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per case")
+    run_parser.add_argument("--port", type=int, default=8123)
+    run_parser.add_argument("--reload", action="store_true", help="Reload the dataset even if the scale matches")
+    run_parser.add_argument("--out", help="Write the results as JSON to this file")
+    run_parser.add_argument("--baseline", help="Compare with this results file and fail on regressions")
+    _gate_options(run_parser)
+
+    compare_parser = commands.add_parser("compare", help="Compare a results file with a baseline")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("baseline")
+    _gate_options(compare_parser)
+
+    args = parser.parse_args()
+    sys.exit(run(args) if args.command == "run" else compare_files(args))
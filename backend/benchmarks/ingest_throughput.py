@@ -0,0 +1,100 @@
+"""
+Telemetry ingest throughput benchmark
+
+Drives POST /api/production/logs/ingest against a running server with several
+concurrent senders and reports the sustained rate of readings committed to
+the database (taken from /api/system/ingest, so it includes the flush time).
+
+Start a single worker first, then run from the backend directory:
+
+    uvicorn app.main:app --workers 1 --port 8000
+    python -m benchmarks.ingest_throughput --duration 30 --senders 8 --batch 200
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+MACHINE_PREFIX = "BENCH-"
+
+
+async def ensure_machines(client: httpx.AsyncClient, count: int):
+    ids = [f"{MACHINE_PREFIX}{i:02d}" for i in range(1, count + 1)]
+    existing = {m["id"] for m in (await client.get("/api/machines")).json()}
+    for machine_id in ids:
+        if machine_id not in existing:
+            response = await client.post("/api/machines", json={
+                "id": machine_id, "name": f"Benchmark line {machine_id}", "area": "BENCH",
+                "type": "extrusion", "status": "running", "target_speed": 100
+            })
+            response.raise_for_status()
+    return ids
+
+
+def make_batch(machine_ids, size: int):
+    return {"readings": [
+        {
+            "machine_id": random.choice(machine_ids),
+            "shift": "morning",
+            "speed": round(random.uniform(80, 120), 2),
+            "temperature": round(random.uniform(180, 220), 1),
+            "output_length": round(random.uniform(0, 50), 1)
+        }
+        for _ in range(size)
+    ]}
+
+
+async def sender(client, machine_ids, batch_size, deadline, totals):
+    while time.monotonic() < deadline:
+        response = await client.post("/api/production/logs/ingest", json=make_batch(machine_ids, batch_size))
+        if response.status_code == 202:
+            totals["accepted"] += batch_size
+            totals["requests"] += 1
+        elif response.status_code == 503:
+            totals["backpressure"] += 1
+            await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+        else:
+            response.raise_for_status()
+
+
+async def main(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+        machine_ids = await ensure_machines(client, args.machines)
+        before = (await client.get("/api/system/ingest")).json()
+
+        totals = {"accepted": 0, "requests": 0, "backpressure": 0}
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            sender(client, machine_ids, args.batch, deadline, totals) for _ in range(args.senders)
+        ))
+        sent_for = time.monotonic() - started
+
+        # Wait until every accepted reading is flushed so the rate covers committed rows
+        while True:
+            stats = (await client.get("/api/system/ingest")).json()
+            done = stats["rows_written"] + stats["rows_dropped"] - before["rows_written"] - before["rows_dropped"]
+            if done >= totals["accepted"]:
+                break
+            await asyncio.sleep(0.05)
+        elapsed = time.monotonic() - started
+
+    written = stats["rows_written"] - before["rows_written"]
+    flushes = stats["flushes"] - before["flushes"]
+    print(f"Senders x batch        : {args.senders} x {args.batch}")
+    print(f"Requests accepted      : {totals['requests']} ({totals['backpressure']} backpressure responses)")
+    print(f"Readings accepted      : {totals['accepted']} in {sent_for:.1f}s ({totals['accepted'] / sent_for:,.0f}/s)")
+    print(f"Readings committed     : {written} in {elapsed:.1f}s ({written / elapsed:,.0f}/s sustained)")
+    print(f"Flushes                : {flushes} (avg {written / max(flushes, 1):,.0f} rows, last {stats['last_flush_ms']} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telemetry ingest throughput benchmark")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to send for")
+    parser.add_argument("--senders", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--batch", type=int, default=200, help="Readings per request")
+    parser.add_argument("--machines", type=int, default=20, help="Benchmark machines to spread readings over")
+    asyncio.run(main(parser.parse_args()))
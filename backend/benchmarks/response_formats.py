@@ -0,0 +1,113 @@
+"""
+Chart response format benchmark
+
+Encodes the same synthetic data the way the time-series endpoints do and
+compares payload size and encode time of:
+
+- json: the current path, the row dicts validated against the response
+  model and dumped by FastAPI (GET /production/logs);
+- columnar: application/vnd.columnar+json;
+- arrow: application/vnd.apache.arrow.stream.
+
+Two datasets: production log rows (Python objects, as read from the
+database) and a live telemetry window (NumPy arrays from the ring buffer,
+GET /machines/{id}/live). Runs offline, from the backend directory:
+
+    python -m benchmarks.response_formats --rows 1000 10000 --repeat 20
+"""
+import argparse
+import gzip
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+import orjson
+from pydantic import TypeAdapter
+
+from app.core.formats import arrow_ipc, columnar_json, to_columns
+from app.schemas import ProductionLogResponse, ShiftEnum
+
+LOG_FIELDS = list(ProductionLogResponse.model_fields)
+
+
+def make_logs(count: int) -> List[dict]:
+    start = datetime(2026, 1, 1, 6)
+    shifts = list(ShiftEnum)
+    return [
+        {
+            "id": i,
+            "machine_id": f"PCP-{i % 12 + 1:02d}",
+            "shift": random.choice(shifts).value,
+            "operator_name": random.choice([None, "Ahmed Hassan", "Mona Adel", "Omar Farouk"]),
+            "timestamp": start + timedelta(seconds=5 * i),
+            "speed": round(random.uniform(80, 120), 2),
+            "target_speed": 100.0,
+            "temperature": round(random.uniform(180, 220), 1),
+            "pressure": round(random.uniform(2, 6), 2),
+            "output_length": round(random.uniform(0, 50), 1),
+            "output_weight": None,
+            "notes": None,
+            "created_at": start + timedelta(seconds=5 * i)
+        }
+        for i in range(count)
+    ]
+
+
+def make_window(count: int):
+    timestamps = time.time() * 1000 - np.arange(count, 0, -1, dtype=np.float64) * 100
+    speed = np.random.uniform(80, 120, count)
+    temperature = np.random.uniform(180, 220, count)
+    return {"timestamps": timestamps, "speed": speed, "temperature": temperature}
+
+
+def timed(encode, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        content = encode()
+        best = min(best, time.perf_counter() - started)
+    return content, best * 1000
+
+
+def report(title: str, encoders, repeat: int):
+    print(f"\n{title}")
+    print(f"  {'format':<10} {'bytes':>12} {'gzip':>12} {'encode ms':>10}")
+    baseline = None
+    for name, encode in encoders:
+        content, ms = timed(encode, repeat)
+        baseline = baseline or len(content)
+        print(
+            f"  {name:<10} {len(content):>12,} {len(gzip.compress(content)):>12,} {ms:>10.2f}"
+            f"   ({len(content) / baseline:.0%} of json)"
+        )
+
+
+def main(args):
+    random.seed(1)
+    adapter = TypeAdapter(List[ProductionLogResponse])
+
+    for count in args.rows:
+        logs = make_logs(count)
+        report(f"Production logs, {count:,} rows", [
+            ("json", lambda: adapter.dump_json(adapter.validate_python(logs))),
+            ("columnar", lambda: columnar_json(to_columns(logs, LOG_FIELDS))),
+            ("arrow", lambda: arrow_ipc(to_columns(logs, LOG_FIELDS))),
+        ], args.repeat)
+
+        window = make_window(count)
+        report(f"Live window, {count:,} readings", [
+            ("json", lambda: orjson.dumps(
+                {"machine_id": "PCP-01", "count": count, **window}, option=orjson.OPT_SERIALIZE_NUMPY
+            )),
+            ("columnar", lambda: columnar_json(window, {"machine_id": "PCP-01"})),
+            ("arrow", lambda: arrow_ipc(window, {"machine_id": "PCP-01"})),
+        ], args.repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chart response format benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="Dataset sizes")
+    parser.add_argument("--repeat", type=int, default=20, help="Encodes per format (best time is reported)")
+    main(parser.parse_args())
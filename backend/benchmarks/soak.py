@@ -0,0 +1,451 @@
+"""
+Mixed-workload soak test
+
+Replays a production shift against the API for minutes or hours and checks
+the result against service level objectives. Every actor is one client on a
+fixed schedule, waiting for its own responses like the real device does:
+
+- terminal: shop-floor terminal of one machine, posting a production log,
+  a quality check or a scrap entry (TERMINAL_MIX) every few seconds;
+- dashboard: wall dashboard polling /api/dashboard/overview;
+- planner: planner opening one of the summary reports (PLANNER_REPORTS).
+
+`--actor NAME=COUNT[@SECONDS]` changes the number of clients of a kind and
+their interval, e.g. `--actor terminal=500@3 --actor planner=0`. Latency is
+measured from each request's scheduled time, so a server that falls behind
+shows up as latency rather than as fewer requests.
+
+Every `--sample-interval` the simulator reads GET /api/system/db-pool (pool
+saturation: connections checked out over pool size + max overflow, and
+checkout timeouts) and the resident memory of the worker from /metrics.
+Memory growth is the slope of a line fitted to the samples, in MB per hour,
+measured once they span MEMORY_MIN_SPAN. Run the server with one worker, or
+these figures describe whichever worker answered.
+
+Requests and samples from the first `--warmup` are not counted. Progress is
+printed every `--report-interval`; the final report lists latency
+percentiles and error rates per actor and route, pool saturation and memory
+growth, checks them against SLOS (or a JSON file given with `--slo`, merged
+over them; null drops an objective) and exits with status 1 when any
+objective was breached or could not be measured, e.g. memory growth on a
+run shorter than MEMORY_MIN_SPAN after the warmup. Objectives of actor
+kinds left out of the mix are not checked.
+
+From the backend directory, against a running server or one started on a
+database (seeded first, e.g. with `python -m app.db.seed`):
+
+    python -m benchmarks.soak --base-url http://127.0.0.1:8000 --duration 4h --out soak.json
+    python -m benchmarks.soak --database-url postgresql://localhost/scc_bench --duration 15m \\
+        --actor terminal=100@5 --actor dashboard=20@10
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import httpx
+import numpy as np
+
+from app.services.plant_calendar import shift_at
+from benchmarks.endpoints import start_server, stop_server
+
+REQUEST_TIMEOUT = 30
+MEMORY_MIN_SPAN = 300  # Seconds of samples needed before memory growth is measured; shorter runs extrapolate noise
+
+
+class Request(NamedTuple):
+    route: str  # Name in the report
+    method: str
+    path: str
+    params: Optional[Dict] = None
+    json: Optional[Dict] = None
+
+
+class ActorKind(NamedTuple):
+    count: int
+    interval: float  # Seconds between the requests of one actor
+    next_request: Callable[[random.Random, str], Request]  # (rng, machine id) -> request
+
+
+# ============== Actors ==============
+
+TERMINAL_MIX = {"log": 0.8, "check": 0.15, "scrap": 0.05}
+
+SCRAP = [("copper-wire", "SC-001", 93.0), ("copper-wire", "SC-002", 85.0), ("pvc-compound", "SC-010", 0.0),
+         ("mixed-cable", "SC-020", 45.0), ("insulated-copper", "SC-030", 70.0)]
+
+PLANNER_REPORTS = [
+    Request("production.logs_summary", "GET", "/api/production/logs/summary"),
+    Request("production.downtime_summary", "GET", "/api/production/downtime/summary"),
+    Request("production.work_orders", "GET", "/api/production/work-orders", params={"limit": 100}),
+    Request("quality.checks_summary", "GET", "/api/quality/checks/summary"),
+    Request("quality.scrap_summary", "GET", "/api/quality/scrap/summary"),
+    Request("maintenance.summary", "GET", "/api/maintenance/summary"),
+    Request("dashboard.capacity", "GET", "/api/dashboard/capacity"),
+    Request("dashboard.trends_weekly", "GET", "/api/dashboard/trends/weekly"),
+]
+
+
+def terminal_request(rng: random.Random, machine_id: str) -> Request:
+    shift = shift_at(datetime.now(timezone.utc)).value
+    kind = rng.choices(list(TERMINAL_MIX), weights=list(TERMINAL_MIX.values()))[0]
+    if kind == "log":
+        speed = round(rng.uniform(80, 120), 2)
+        return Request("production.create_log", "POST", "/api/production/logs", json={
+            "machine_id": machine_id, "shift": shift, "speed": speed, "temperature": round(rng.gauss(190, 5), 1),
+            "output_length": round(speed / 12, 2), "output_weight": round(speed / 25, 3)
+        })
+    if kind == "check":
+        diameter = round(rng.gauss(2.55, 0.02), 3)
+        return Request("quality.create_check", "POST", "/api/quality/checks", json={
+            "machine_id": machine_id, "shift": shift, "diameter": diameter, "diameter_tolerance": 0.05,
+            "thickness": round(rng.gauss(0.9, 0.02), 3), "passed": abs(diameter - 2.55) <= 0.05
+        })
+    scrap_type, code, copper = rng.choice(SCRAP)
+    return Request("quality.create_scrap", "POST", "/api/quality/scrap", json={
+        "machine_id": machine_id, "shift": shift, "scrap_type": scrap_type, "scrap_code": code,
+        "weight_kg": round(rng.uniform(1, 40), 2), "copper_content_percent": copper, "reason": "Soak test"
+    })
+
+
+def dashboard_request(rng: random.Random, machine_id: str) -> Request:
+    return Request("dashboard.overview", "GET", "/api/dashboard/overview")
+
+
+def planner_request(rng: random.Random, machine_id: str) -> Request:
+    return rng.choice(PLANNER_REPORTS)
+
+
+ACTORS = {
+    "terminal": ActorKind(300, 5.0, terminal_request),
+    "dashboard": ActorKind(50, 10.0, dashboard_request),
+    "planner": ActorKind(5, 60.0, planner_request),
+}
+
+# Per actor: latency percentiles (ms) and error rate; pool saturation p95 (0-1), pool timeouts, memory growth
+SLOS = {
+    "actors": {
+        "terminal": {"p95_ms": 300, "p99_ms": 1000, "error_rate": 0.001},
+        "dashboard": {"p95_ms": 500, "p99_ms": 1500, "error_rate": 0.001},
+        "planner": {"p95_ms": 2000, "p99_ms": 5000, "error_rate": 0.01},
+    },
+    "pool_saturation_p95": 0.8,
+    "pool_timeouts": 0,
+    "memory_growth_mb_per_hour": 50,
+}
+
+
+# ============== Recording ==============
+
+class Recorder:
+    """Latencies and errors per (actor, route), for the whole run and the current progress window."""
+
+    def __init__(self, counted_from: float):
+        self.counted_from = counted_from
+        self.latencies: Dict[tuple, List[float]] = defaultdict(list)
+        self.errors: Dict[tuple, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.window: Dict[str, List] = defaultdict(lambda: [[], 0])
+        self.samples: List[Dict] = []
+
+    def record(self, actor: str, route: str, scheduled: float, latency_ms: float, error: Optional[str]):
+        window = self.window[actor]
+        window[0].append(latency_ms)
+        window[1] += error is not None
+        if scheduled < self.counted_from:
+            return
+        self.latencies[actor, route].append(latency_ms)
+        if error is not None:
+            self.errors[actor, route][error] += 1
+
+    def take_window(self) -> Dict[str, List]:
+        window, self.window = self.window, defaultdict(lambda: [[], 0])
+        return window
+
+
+async def _send(client: httpx.AsyncClient, request: Request) -> Optional[str]:
+    """None on success, else the status code or exception name."""
+    try:
+        response = await client.request(request.method, request.path, params=request.params, json=request.json)
+        await response.aread()
+    except httpx.HTTPError as exc:
+        return type(exc).__name__
+    return str(response.status_code) if response.status_code >= 400 else None
+
+
+async def run_actor(client: httpx.AsyncClient, name: str, kind: ActorKind, machine_id: str, rng: random.Random,
+                    recorder: Recorder, started: float, deadline: float):
+    scheduled = started + rng.uniform(0, kind.interval)  # Spread the actors over one interval
+    while scheduled < deadline:
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        request = kind.next_request(rng, machine_id)
+        error = await _send(client, request)
+        recorder.record(name, request.route, scheduled, (time.monotonic() - scheduled) * 1000, error)
+        scheduled += kind.interval
+
+
+_RSS = re.compile(r"^process_resident_memory_bytes (\S+)$", re.MULTILINE)
+
+
+async def sample(client: httpx.AsyncClient, recorder: Recorder, started: float, interval: float, deadline: float):
+    """Pool and memory readings every interval until the deadline."""
+    while True:
+        entry = {"t": round(time.monotonic() - started, 1), "counted": time.monotonic() >= recorder.counted_from}
+        try:
+            pool = (await client.get("/api/system/db-pool")).json()
+            entry["checked_out"] = pool["checked_out"]
+            entry["saturation"] = pool["checked_out"] / max(pool["pool_size"] + max(pool["max_overflow"], 0), 1)
+            entry["timeouts"] = pool.get("timeouts", 0)
+            match = _RSS.search((await client.get("/metrics")).text)
+            entry["rss_mb"] = float(match.group(1)) / 2 ** 20 if match else None
+        except (httpx.HTTPError, ValueError, KeyError) as exc:
+            entry["error"] = type(exc).__name__
+        recorder.samples.append(entry)
+        if time.monotonic() + interval >= deadline:
+            return
+        await asyncio.sleep(interval)
+
+
+async def report_progress(recorder: Recorder, started: float, interval: float, deadline: float):
+    while time.monotonic() + interval < deadline:
+        await asyncio.sleep(interval)
+        window = recorder.take_window()
+        last = recorder.samples[-1] if recorder.samples else {}
+        parts = [f"{time.monotonic() - started:>7.0f}s"]
+        for actor, (latencies, errors) in sorted(window.items()):
+            p95 = np.percentile(latencies, 95) if latencies else 0.0
+            parts.append(f"{actor} {len(latencies) / interval:6.1f} req/s p95 {p95:7.1f} ms {errors} err")
+        if "checked_out" in last:
+            parts.append(f"pool {last['checked_out']} out")
+        if last.get("rss_mb") is not None:
+            parts.append(f"rss {last['rss_mb']:.0f} MB")
+        print("  ".join(parts), flush=True)
+
+
+async def simulate(base_url: str, actors: Dict[str, ActorKind], args) -> Recorder:
+    total = sum(kind.count for kind in actors.values())
+    limits = httpx.Limits(max_connections=total + 2, max_keepalive_connections=total + 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=REQUEST_TIMEOUT) as client:
+        machines = [machine["id"] for machine in (await client.get("/api/machines")).json()]
+        if not machines:
+            raise SystemExit("The server has no machines; seed the database first (python -m app.db.seed)")
+
+        started = time.monotonic()
+        deadline = started + args.duration
+        recorder = Recorder(started + args.warmup)
+        seeds = random.Random(args.seed)
+        tasks = [
+            run_actor(client, name, kind, machines[i % len(machines)], random.Random(seeds.random()), recorder,
+                      started, deadline)
+            for name, kind in actors.items() for i in range(kind.count)
+        ]
+        await asyncio.gather(
+            *tasks, sample(client, recorder, started, args.sample_interval, deadline),
+            report_progress(recorder, started, args.report_interval, deadline)
+        )
+    return recorder
+
+
+# ============== Report ==============
+
+def _latency_stats(latencies: List[float], errors: Dict[str, int]) -> Dict:
+    count = len(latencies)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if count else (0.0, 0.0, 0.0)
+    failed = sum(errors.values())
+    return {
+        "requests": count,
+        "errors": failed,
+        "error_rate": round(failed / count, 5) if count else 0.0,
+        "errors_by_kind": dict(errors),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(max(latencies, default=0.0)), 2)
+    }
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict:
+    actors: Dict[str, Dict] = {}
+    for actor in sorted({actor for actor, _ in recorder.latencies}):
+        keys = sorted(key for key in recorder.latencies if key[0] == actor)
+        merged_errors: Dict[str, int] = defaultdict(int)
+        for key in keys:
+            for kind, count in recorder.errors[key].items():
+                merged_errors[kind] += count
+        actors[actor] = {
+            **_latency_stats([latency for key in keys for latency in recorder.latencies[key]], merged_errors),
+            "routes": {route: _latency_stats(recorder.latencies[actor, route], recorder.errors[actor, route])
+                       for _, route in keys}
+        }
+        actors[actor]["rps"] = round(actors[actor]["requests"] / duration, 2) if duration > 0 else 0.0
+
+    counted = [entry for entry in recorder.samples if entry["counted"] and "saturation" in entry]
+    saturation = [entry["saturation"] for entry in counted]
+    pool = {
+        "samples": len(counted),
+        "checked_out_max": max((entry["checked_out"] for entry in counted), default=None),
+        "saturation_p95": round(float(np.percentile(saturation, 95)), 3) if saturation else None,
+        "saturation_max": round(max(saturation), 3) if saturation else None,
+        "timeouts": counted[-1]["timeouts"] - counted[0]["timeouts"] if counted else None,
+    }
+
+    rss = [(entry["t"], entry["rss_mb"]) for entry in counted if entry.get("rss_mb") is not None]
+    memory = {"samples": len(rss), "start_mb": None, "end_mb": None, "growth_mb_per_hour": None}
+    if rss:
+        memory["start_mb"], memory["end_mb"] = round(rss[0][1], 1), round(rss[-1][1], 1)
+    if len(rss) >= 3 and rss[-1][0] - rss[0][0] >= MEMORY_MIN_SPAN:
+        hours, megabytes = np.array(rss).T
+        memory["growth_mb_per_hour"] = round(float(np.polyfit(hours / 3600, megabytes, 1)[0]), 2)
+
+    return {"actors": actors, "pool": pool, "memory": memory}
+
+
+def check_slos(summary: Dict, slos: Dict, actors: Iterable[str]) -> List[Dict]:
+    """
+    One entry per declared objective of the actors run: the measured value and
+    its status, "ok", "breached" or "not measured". Only "ok" counts as met.
+    """
+    checks = []
+
+    def check(name: str, value, limit):
+        status = "not measured" if value is None else "ok" if value <= limit else "breached"
+        checks.append({"slo": name, "value": value, "limit": limit, "status": status, "ok": status == "ok"})
+
+    for actor, objectives in slos.get("actors", {}).items():
+        if actor not in actors:
+            continue
+        stats = summary["actors"].get(actor)
+        for metric, limit in objectives.items():
+            check(f"{actor}.{metric}", stats[metric] if stats else None, limit)
+    if "pool_saturation_p95" in slos:
+        check("pool.saturation_p95", summary["pool"]["saturation_p95"], slos["pool_saturation_p95"])
+    if "pool_timeouts" in slos:
+        check("pool.timeouts", summary["pool"]["timeouts"], slos["pool_timeouts"])
+    if "memory_growth_mb_per_hour" in slos:
+        check("memory.growth_mb_per_hour", summary["memory"]["growth_mb_per_hour"], slos["memory_growth_mb_per_hour"])
+    return checks
+
+
+def print_report(summary: Dict, checks: List[Dict]):
+    print(f"\n{'actor / route':<34} {'requests':>9} {'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} ms")
+    for actor, stats in summary["actors"].items():
+        rows = [(actor, stats)] + [(f"  {route}", route_stats) for route, route_stats in stats["routes"].items()]
+        for label, row in rows:
+            print(f"{label:<34} {row['requests']:>9} {row['errors']:>7} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+                  f"{row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    pool, memory = summary["pool"], summary["memory"]
+    print(f"\npool: max {pool['checked_out_max']} checked out, saturation p95 {pool['saturation_p95']} "
+          f"max {pool['saturation_max']}, {pool['timeouts']} timeouts ({pool['samples']} samples)")
+    print(f"memory: {memory['start_mb']} -> {memory['end_mb']} MB, {memory['growth_mb_per_hour']} MB/h "
+          f"({memory['samples']} samples)")
+    print()
+    for entry in checks:
+        verdict = "ok" if entry["ok"] else entry["status"].upper()
+        value = "-" if entry["value"] is None else entry["value"]
+        print(f"  {entry['slo']:<34} {value!s:>14}  limit {entry['limit']!s:>8}  {verdict}")
+    breaches = sum(entry["status"] == "breached" for entry in checks)
+    unmeasured = sum(entry["status"] == "not measured" for entry in checks)
+    if breaches or unmeasured:
+        print(f"{breaches} SLO breach(es), {unmeasured} not measured")
+    else:
+        print("All SLOs met")
+
+
+# ============== CLI ==============
+
+def parse_duration(value: str) -> float:
+    """Seconds of "90", "90s", "30m" or "4h"."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smh]?)", value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Invalid duration {value!r}, expected e.g. 90s, 30m or 4h")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def parse_actors(specs: List[str]) -> Dict[str, ActorKind]:
+    """ACTORS with the NAME=COUNT[@SECONDS] overrides applied; kinds with no actors are left out."""
+    actors = dict(ACTORS)
+    for spec in specs:
+        match = re.fullmatch(r"(\w+)=(\d+)(?:@(\d+(?:\.\d+)?))?", spec)
+        if not match or match.group(1) not in ACTORS:
+            raise SystemExit(f"Invalid --actor {spec!r}: expected NAME=COUNT[@SECONDS], NAME one of {', '.join(ACTORS)}")
+        name, count, interval = match.groups()
+        actors[name] = actors[name]._replace(count=int(count), interval=float(interval or actors[name].interval))
+    return {name: kind for name, kind in actors.items() if kind.count > 0}
+
+
+def load_slos(path: Optional[str]) -> Dict:
+    slos = json.loads(json.dumps(SLOS))
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        for actor, objectives in overrides.pop("actors", {}).items():
+            slos["actors"].setdefault(actor, {}).update(objectives)
+        slos.update(overrides)
+    slos["actors"] = {
+        actor: {metric: limit for metric, limit in objectives.items() if limit is not None}
+        for actor, objectives in slos["actors"].items()
+    }
+    return {name: limit for name, limit in slos.items() if limit is not None}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mixed-workload soak test with an SLO report")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="Running server, e.g. http://127.0.0.1:8000")
+    target.add_argument("--database-url", help="Start a one-worker server on this database for the run")
+    parser.add_argument("--port", type=int, default=8124, help="Port of the server started with --database-url")
+    parser.add_argument("--duration", type=parse_duration, default="10m", help="e.g. 90s, 30m, 4h")
+    parser.add_argument("--warmup", type=parse_duration, default="60s", help="Not counted in the report")
+    parser.add_argument("--actor", action="append", default=[], metavar="NAME=COUNT[@SECONDS]",
+                        help=f"Actors and interval of one kind ({', '.join(ACTORS)}); repeatable")
+    parser.add_argument("--sample-interval", type=parse_duration, default="15s", help="Pool and memory sampling")
+    parser.add_argument("--report-interval", type=parse_duration, default="60s", help="Progress lines")
+    parser.add_argument("--slo", help="JSON file of objectives, merged over the defaults")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the summary and SLO checks as JSON to this file")
+    args = parser.parse_args(argv)
+
+    actors = parse_actors(args.actor)
+    slos = load_slos(args.slo)
+    if args.warmup >= args.duration:
+        raise SystemExit("--warmup must be shorter than --duration")
+    if "memory_growth_mb_per_hour" in slos and args.duration - args.warmup < MEMORY_MIN_SPAN + args.sample_interval:
+        print(f"Warning: memory growth needs {MEMORY_MIN_SPAN}s of samples after the warmup; this run will report "
+              f"it as not measured and fail")
+    mix = ", ".join(f"{kind.count} {name} every {kind.interval:g}s" for name, kind in actors.items())
+    print(f"Soak test for {args.duration:g}s ({args.warmup:g}s warmup): {mix}")
+
+    server = start_server(args.database_url, args.port) if args.database_url else None
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    try:
+        recorder = asyncio.run(simulate(base_url, actors, args))
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    summary = summarize(recorder, args.duration - args.warmup)
+    checks = check_slos(summary, slos, actors)
+    print_report(summary, checks)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "meta": {"date": datetime.now(timezone.utc).isoformat(timespec="seconds"), "duration_s": args.duration,
+                         "warmup_s": args.warmup, "actors": {name: {"count": kind.count, "interval_s": kind.interval}
+                                                            for name, kind in actors.items()}},
+                **summary, "slos": checks, "samples": recorder.samples
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Results written to {args.out}")
+    return 0 if all(entry["ok"] for entry in checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+UDP line-protocol load generator
+
+Sends readings for the benchmark machines to the telemetry listener at a
+target rate, then reports how many the server accepted and committed (from
+/api/system/telemetry-listener and /api/system/ingest). A share of
+deliberately broken lines can be mixed in to exercise the parse-error
+counters.
+
+Run the server with the listener enabled, create the benchmark machines once
+(python -m benchmarks.ingest_throughput --duration 1 does that), then:
+
+    TELEMETRY_UDP_ENABLED=true uvicorn app.main:app --workers 1 --port 8000
+    python -m benchmarks.udp_load --rate 20000 --duration 30
+"""
+import argparse
+import random
+import socket
+import time
+
+import httpx
+
+from benchmarks.ingest_throughput import MACHINE_PREFIX
+
+BROKEN_LINES = [
+    "no-fields-here",
+    "{machine} speed=fast",
+    "{machine} speed=10,colour=red",
+    "{machine} speed=10 yesterday",
+]
+
+
+def make_line(machine_id: str, bad_ratio: float) -> str:
+    if bad_ratio and random.random() < bad_ratio:
+        return random.choice(BROKEN_LINES).format(machine=machine_id)
+    return (
+        f"{machine_id} speed={random.uniform(80, 120):.2f},temp={random.uniform(180, 220):.1f},"
+        f"pressure={random.uniform(1, 3):.2f} {time.time_ns()}"
+    )
+
+
+def fetch_stats(url: str):
+    with httpx.Client(base_url=url, timeout=10) as client:
+        return client.get("/api/system/telemetry-listener").json(), client.get("/api/system/ingest").json()
+
+
+def main(args):
+    machine_ids = [f"{MACHINE_PREFIX}{i:02d}" for i in range(1, args.machines + 1)]
+    listener_before, ingest_before = fetch_stats(args.url)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    target = (args.host, args.port)
+    interval = args.lines_per_datagram / args.rate
+    sent = 0
+    started = time.perf_counter()
+    next_send = started
+    while time.perf_counter() - started < args.duration:
+        lines = [make_line(random.choice(machine_ids), args.bad_ratio) for _ in range(args.lines_per_datagram)]
+        sock.sendto("\n".join(lines).encode(), target)
+        sent += len(lines)
+        next_send += interval
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.perf_counter() - started
+
+    time.sleep(1.0)  # Let the last flush land
+    listener, ingest = fetch_stats(args.url)
+    received = listener["lines"] - listener_before["lines"]
+    accepted = listener["accepted"] - listener_before["accepted"]
+    errors = listener["parse_errors"] - listener_before["parse_errors"]
+    committed = ingest["rows_written"] - ingest_before["rows_written"]
+
+    print(f"Lines sent             : {sent} in {elapsed:.1f}s ({sent / elapsed:,.0f}/s)")
+    print(f"Lines received         : {received} ({sent - received} lost in transit)")
+    print(f"Accepted / parse errors: {accepted} / {errors}")
+    print(f"Unknown machine lines  : {listener['unknown_machine'] - listener_before['unknown_machine']}")
+    print(f"Rows committed         : {committed} ({committed / (elapsed + 1.0):,.0f}/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UDP line-protocol load generator")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL for the counters")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8094)
+    parser.add_argument("--rate", type=float, default=10000, help="Target lines per second")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--lines-per-datagram", type=int, default=20)
+    parser.add_argument("--machines", type=int, default=20)
+    parser.add_argument("--bad-ratio", type=float, default=0.0, help="Share of deliberately broken lines")
+    main(parser.parse_args())
@@ -3,6 +3,7 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { useLanguage } from '../../context/LanguageContext';
 import { useData } from '../../context/DataContext';
 import { useTheme } from '../../context/ThemeContext';
+import syncService from '../../services/syncService';
 import {
   X,
   Save,
@@ -129,8 +130,12 @@ const ManualEntryForm = ({ type = 'production', machine, onClose, onSubmit }) =>
     setIsSubmitting(true);
 
     try {
-      // Simulate API call
-      await new Promise(resolve => setTimeout(resolve, 1000));
+      // Queued locally first, so the entry survives a dropped connection
+      const { result } = await syncService.submit(...toSyncEntry());
+      if (result && (result.status === 'invalid' || result.status === 'failed')) {
+        setErrors({ submit: result.detail || (language === 'ar' ? 'فشل في الحفظ. حاول مرة أخرى.' : 'Failed to save entry. Please try again.') });
+        return;
+      }
 
       if (type === 'production') {
         addProductionLog({
@@ -161,6 +166,45 @@ const ManualEntryForm = ({ type = 'production', machine, onClose, onSubmit }) =>
     }
   };
 
+  const toSyncEntry = () => {
+    const common = {
+      machine_id: formData.machineId,
+      shift: formData.shift,
+      timestamp: new Date(formData.timestamp).toISOString(),
+    };
+    switch (type) {
+      case 'downtime':
+        return ['downtime_log', {
+          ...common,
+          downtime_type: formData.downtimeType,
+          duration_minutes: Number(formData.duration),
+          reason: formData.downtimeReason,
+        }];
+      case 'quality':
+        return ['quality_check', {
+          ...common,
+          diameter: Number(formData.diameter) || null,
+          spark_test_passed: formData.sparkTestPassed,
+          tensile_test_passed: formData.tensileTestPassed,
+        }];
+      case 'scrap':
+        return ['scrap_entry', {
+          ...common,
+          scrap_type: formData.scrapType,
+          weight_kg: Number(formData.scrapWeight),
+          copper_content_percent: Number(formData.copperContent),
+        }];
+      default:
+        return ['production_log', {
+          ...common,
+          operator_name: formData.operator || null,
+          speed: Number(formData.speed),
+          temperature: Number(formData.temperature) || null,
+          output_length: Number(formData.output),
+        }];
+    }
+  };
+
   const calculateScrapValue = () => {
     const lmePrice = 8500; // USD per ton
     const copperWeight = (formData.scrapWeight * formData.copperContent) / 100;
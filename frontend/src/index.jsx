@@ -2,6 +2,10 @@ import React from 'react';
 import ReactDOM from 'react-dom/client';
 import './index.css';
 import App from './App';
+import syncService from './services/syncService';
+
+// Send entries queued on this terminal while it was offline
+syncService.startAutoSync();
 
 const root = ReactDOM.createRoot(document.getElementById('root'));
 root.render(
@@ -1,10 +1,11 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { useLanguage } from '../context/LanguageContext';
 import { useData } from '../context/DataContext';
 import { useTheme } from '../context/ThemeContext';
 import OEEGauge from '../components/Dashboard/OEEGauge';
 import ProductionChart from '../components/Charts/ProductionChart';
+import { dashboardService } from '../services';
 import {
   Factory,
   TrendingUp,
@@ -24,6 +25,33 @@ const CapacityPlanning = () => {
   const { capacityData, workforceData, calculateAreaOEE, getMachinesByArea } = useData();
   const { isDark, colors } = useTheme();
   const [selectedPeriod, setSelectedPeriod] = useState('monthly');
+  const [simulation, setSimulation] = useState(null);
+
+  // What-if scenarios behind the recommendation cards
+  useEffect(() => {
+    dashboardService.runCapacitySimulation({
+      working_days: 30,
+      replications: 500,
+      scenarios: [
+        { name: 'baseline' },
+        { name: 'fill-vacancies', staffing_ratio: 1.0 },
+        { name: 'reduce-downtime', downtime_reduction: 0.5 },
+        { name: 'faster-changeover', setup_reduction: 0.5 },
+      ],
+    })
+      .then(setSimulation)
+      .catch(() => setSimulation(null));
+  }, []);
+
+  // Simulated gain over baseline, or the static estimate when the API is unavailable
+  const simulatedImpact = (scenario, fallback) => {
+    const results = simulation?.results || [];
+    const baseline = results.find(r => r.scenario === 'baseline');
+    const result = results.find(r => r.scenario === scenario);
+    if (!baseline || !result) return fallback;
+    const gain = Math.round(result.throughput_mt_per_year - baseline.throughput_mt_per_year);
+    return `${gain >= 0 ? '+' : ''}${gain.toLocaleString()} MT/Year`;
+  };
 
   const periods = [
     { id: 'daily', label: 'Daily' },
@@ -309,21 +337,21 @@ const CapacityPlanning = () => {
             priority="high"
             title="Address Workforce Shortage"
             description="Fill critical vacancies in PCP-1 and PCP-2 to increase operational capacity by up to 20%."
-            impact="+7,200 MT/Year"
+            impact={simulatedImpact('fill-vacancies', '+7,200 MT/Year')}
             colors={colors}
           />
           <RecommendationCard
             priority="medium"
             title="Reduce Unplanned Downtime"
             description="Implement predictive maintenance to reduce equipment failures and improve availability."
-            impact="+4,380 MT/Year"
+            impact={simulatedImpact('reduce-downtime', '+4,380 MT/Year')}
             colors={colors}
           />
           <RecommendationCard
             priority="low"
             title="Optimize Changeover Time"
             description="Apply SMED methodology to reduce setup times and increase productive hours."
-            impact="+2,190 MT/Year"
+            impact={simulatedImpact('faster-changeover', '+2,190 MT/Year')}
             colors={colors}
           />
         </div>
@@ -0,0 +1,30 @@
+/**
+ * Alert Service
+ * API calls for alerts raised by the backend alert engine
+ */
+
+import api from './api';
+
+const alertService = {
+  /**
+   * Get alerts, newest first (open alerts by default)
+   * @param {Object} params - Filter parameters
+   * @param {string} params.status - active, acknowledged or resolved
+   * @param {string} params.machine_id - Filter by machine
+   * @param {string} params.severity - error, warning or info
+   */
+  getAll: async (params = {}) => {
+    return api.get('/alerts', params);
+  },
+
+  /**
+   * Acknowledge an open alert (hides it from the dashboard until it clears)
+   * @param {number} alertId - Alert ID
+   * @param {string} acknowledgedBy - Name of the person acknowledging
+   */
+  acknowledge: async (alertId, acknowledgedBy) => {
+    return api.post(`/alerts/${alertId}/acknowledge`, { acknowledged_by: acknowledgedBy || null });
+  },
+};
+
+export default alertService;
@@ -48,7 +48,7 @@ async function fetchApi(endpoint, options = {}) {
     const contentType = response.headers.get('content-type');
     let data;
 
-    if (contentType && contentType.includes('application/json')) {
+    if (contentType && contentType.includes('json')) {
       data = await response.json();
     } else {
       data = await response.text();
@@ -81,10 +81,10 @@ async function fetchApi(endpoint, options = {}) {
  * HTTP method helpers
  */
 export const api = {
-  get: (endpoint, params = {}) => {
+  get: (endpoint, params = {}, headers = {}) => {
     const queryString = new URLSearchParams(params).toString();
     const url = queryString ? `${endpoint}?${queryString}` : endpoint;
-    return fetchApi(url, { method: 'GET' });
+    return fetchApi(url, { method: 'GET', headers });
   },
 
   post: (endpoint, data) => {
@@ -16,6 +16,14 @@ const dashboardService = {
     return api.get('/dashboard/overview');
   },
 
+  /**
+   * Get several dashboard sections in one request
+   * sections: any of 'overview', 'capacity', 'workforce', 'hourly', 'machines' (all by default)
+   */
+  getDashboardBundle: async (sections = []) => {
+    return api.get('/dashboard/bundle', sections.map((section) => ['sections', section]));
+  },
+
   /**
    * Get plant capacity information
    */
@@ -38,6 +46,14 @@ const dashboardService = {
     return api.post('/dashboard/plants', plantData);
   },
 
+  /**
+   * Run the production line simulation for what-if scenarios
+   * Returns predicted throughput and the bottleneck stage per scenario
+   */
+  runCapacitySimulation: async (simulationRequest) => {
+    return api.post('/dashboard/capacity/simulate', simulationRequest);
+  },
+
   // ============== Workforce ==============
 
   /**
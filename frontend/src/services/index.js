@@ -9,6 +9,8 @@ import productionService from './productionService';
 import qualityService from './qualityService';
 import maintenanceService from './maintenanceService';
 import dashboardService from './dashboardService';
+import syncService from './syncService';
+import alertService from './alertService';
 
 export {
   api,
@@ -17,6 +19,8 @@ export {
   qualityService,
   maintenanceService,
   dashboardService,
+  syncService,
+  alertService,
 };
 
 export default {
@@ -26,4 +30,6 @@ export default {
   quality: qualityService,
   maintenance: maintenanceService,
   dashboard: dashboardService,
+  sync: syncService,
+  alerts: alertService,
 };
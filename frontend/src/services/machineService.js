@@ -25,6 +25,16 @@ const machineService = {
     return api.get(`/machines/${machineId}`);
   },
 
+  /**
+   * Get the latest in-memory speed/temperature readings for live charts
+   * @param {string} machineId - Machine ID
+   * @param {number} seconds - Only readings from the last N seconds (optional)
+   */
+  getLive: async (machineId, seconds) => {
+    const query = seconds ? `?seconds=${seconds}` : '';
+    return api.get(`/machines/${machineId}/live${query}`);
+  },
+
   /**
    * Get machine statistics
    */
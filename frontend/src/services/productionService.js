@@ -45,6 +45,14 @@ const productionService = {
     return api.get('/production/logs', params);
   },
 
+  /**
+   * Get production logs as one array per field, for charts
+   * Returns { count, columns: { speed: [...], timestamp: [...], ... } }
+   */
+  getProductionLogColumns: async (params = {}) => {
+    return api.get('/production/logs', params, { Accept: 'application/vnd.columnar+json' });
+  },
+
   /**
    * Create a new production log entry
    */
@@ -81,6 +89,18 @@ const productionService = {
   getDowntimeSummary: async (params = {}) => {
     return api.get('/production/downtime/summary', params);
   },
+
+  // ============== Scheduling ==============
+
+  /**
+   * Get work orders and maintenance tasks overlapping a Gantt window
+   * Returns the bars plus detected overlaps/conflicts
+   */
+  getTimeline: async (start, end, machineIds = []) => {
+    const params = new URLSearchParams({ start, end });
+    machineIds.forEach(id => params.append('machine_ids', id));
+    return api.get(`/scheduling/timeline?${params.toString()}`);
+  },
 };
 
 export default productionService;
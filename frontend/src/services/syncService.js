@@ -0,0 +1,107 @@
+/**
+ * Offline Sync Service
+ * Queues shop-floor entries in localStorage and sends them in batches to
+ * /sync/batch. Each entry gets an idempotency key when it is queued, so a
+ * batch can be resent safely after a dropped connection.
+ */
+
+import api from './api';
+
+const QUEUE_KEY = 'scc.syncQueue';
+const TERMINAL_KEY = 'scc.terminalId';
+const BATCH_SIZE = 500;
+const RETRY_INTERVAL_MS = 30000;
+
+const newKey = () =>
+  (window.crypto?.randomUUID?.() || `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`)
+    .replace(/-/g, '');
+
+const loadQueue = () => {
+  try {
+    return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+  } catch {
+    return [];
+  }
+};
+
+const saveQueue = (queue) => localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+
+const terminalId = () => {
+  let id = localStorage.getItem(TERMINAL_KEY);
+  if (!id) {
+    id = `T-${newKey().slice(0, 12)}`;
+    localStorage.setItem(TERMINAL_KEY, id);
+  }
+  return id;
+};
+
+let inFlight = null;
+let started = false;
+
+const syncService = {
+  /**
+   * Number of entries waiting to be sent
+   */
+  pending: () => loadQueue().length,
+
+  /**
+   * Queue an entry and try to send it right away
+   * @param {string} type - production_log, downtime_log, quality_check or scrap_entry
+   * @param {Object} data - Payload matching the backend *Create schema
+   * @returns {Promise<{queued: boolean, result: Object|null}>} result is null while offline
+   */
+  submit: async (type, data) => {
+    const entry = { idempotency_key: newKey(), type, data };
+    saveQueue([...loadQueue(), entry]);
+
+    try {
+      const results = await syncService.flush();
+      return { queued: false, result: results[entry.idempotency_key] || null };
+    } catch {
+      return { queued: true, result: null };
+    }
+  },
+
+  /**
+   * Send queued entries. Entries with a final result (created, duplicate,
+   * invalid, failed) leave the queue; network errors keep everything queued.
+   * @returns {Promise<Object>} Results keyed by idempotency key
+   */
+  flush: () => {
+    if (inFlight) return inFlight;
+
+    inFlight = (async () => {
+      const results = {};
+      try {
+        let queue = loadQueue();
+        while (queue.length) {
+          const batch = queue.slice(0, BATCH_SIZE);
+          const response = await api.post('/sync/batch', { terminal_id: terminalId(), entries: batch });
+          response.results.forEach(r => { results[r.idempotency_key] = r; });
+
+          // Re-read: entries may have been queued while the request was out
+          queue = loadQueue().filter(e => !results[e.idempotency_key]);
+          saveQueue(queue);
+        }
+        return results;
+      } finally {
+        inFlight = null;
+      }
+    })();
+    return inFlight;
+  },
+
+  /**
+   * Retry automatically when the browser comes back online and periodically
+   */
+  startAutoSync: () => {
+    if (started) return;
+    started = true;
+    const retry = () => syncService.flush().catch(() => {});
+    window.addEventListener('online', retry);
+    setInterval(retry, RETRY_INTERVAL_MS);
+    retry();
+  },
+};
+
+export default syncService;